@@ -22,6 +22,10 @@ unsigned long lastMPUSampleTime = 0;
 unsigned long lastLCDUpdateTime = 0;
 
 bool bufferSensorSending = false;
+bool protocolV2 = false; // Set once a sequenced sensor request (0x05) is received
+uint8_t pendingSequences[8]; // Sequence numbers of sensor requests waiting for a reply (protocol v2)
+uint8_t pendingHead = 0;
+uint8_t pendingCount = 0;
 bool motorsEnabled = true;
 int ax, ay, az, gx, gy, gz;
 float lastDistance, tempC;
@@ -92,6 +96,8 @@ uint8_t expected_command_length(uint8_t cmd)
         return 2;
     if (cmd == 0x04)
         return 2;
+    if (cmd == 0x05)
+        return 3;
     return 255; // invalid
 }
 
@@ -184,7 +190,7 @@ uint8_t getBatteryPercent()
     return constrain((uint8_t)percent, 0, 100);
 }
 
-void sendSensorData()
+void sendSensorData(uint8_t sequence)
 {
 
     // Get ultrasonic data
@@ -208,10 +214,18 @@ void sendSensorData()
         storedBatteryPercent = batteryPercent; // Store it for future use
     }
 
-    byte buffer[24];
+    byte buffer[25];
     int i = 0;
 
-    buffer[i++] = 0xAA; // Start byte
+    if (protocolV2)
+    {
+        buffer[i++] = 0xAB; // Start byte for sequenced packets
+        buffer[i++] = sequence; // Echo the request sequence number (0 = unsolicited)
+    }
+    else
+    {
+        buffer[i++] = 0xAA; // Start byte
+    }
     memcpy(&buffer[i], &distance, 4); // Store distance as float
     i += 4; // Store distance as float
     memcpy(&buffer[i], &ax, 2);
@@ -302,6 +316,16 @@ void handleCommand(byte *buffer, size_t length)
     {
         // Command 0x03: Request sensor data
         bufferSensorSending = true; // Set flag to send sensor data next loop
+    }
+    else if (cmd == 0x05 && length == 3)
+    {
+        // Command 0x05: Sequenced sensor data request (protocol v2)
+        protocolV2 = true;
+        if (pendingCount < sizeof(pendingSequences))
+        {
+            pendingSequences[(pendingHead + pendingCount) % sizeof(pendingSequences)] = buffer[1];
+            pendingCount++;
+        }
     } else if (cmd == 0x04 && length == 2){
       // Command 0x04: STOP
         motorsEnabled = false;
@@ -392,9 +416,17 @@ void loop()
        lastLCDUpdateTime = millis();  
     }
     
-    if (bufferSensorSending)
+    if (pendingCount > 0)
+    {
+        // Answer sequenced requests in order, the reply also covers any unsolicited send
+        uint8_t sequence = pendingSequences[pendingHead];
+        pendingHead = (pendingHead + 1) % sizeof(pendingSequences);
+        pendingCount--;
+        sendSensorData(sequence);
+    }
+    else if (bufferSensorSending)
     {
-        sendSensorData();
+        sendSensorData(0);
     }
 }
 
@@ -1,6 +1,12 @@
-import time, struct
+import sys, time
+from pathlib import Path
 import serial
 
+# Share the packet codec with the Raspberry Pi code: import it through the rpi package root, like
+# rpi/main.py does (needs rpi/requirements.txt, which also provides pyserial)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "rpi"))
+from src.models import PacketCodec
+
 # Open serial port
 arduino = serial.Serial('/dev/cu.usbserial-120', 115200, timeout=1)
 print("Connected to Arduino")
@@ -17,26 +23,24 @@ while True:
             speed_left, speed_right = map(lambda x: int(x), input("Enter left and right speeds (e.g., 100 -100): ").split())
             # Send command to request sensor data
             if abs(speed_left) > 0 or abs(speed_right) > 0:
-                cmd_packet = struct.pack("<Bhh", 0x01, speed_left, speed_right)
+                cmd_packet = PacketCodec.encode_motor(speed_left, speed_right)
             else:
-                cmd_packet = struct.pack("<B", 0x04)  # Stop command
+                cmd_packet = PacketCodec.STOP_PACKET  # Stop command
         elif command == 's':
             # Send command to stop motors
-            cmd_packet = struct.pack("<B", 0x04)
+            cmd_packet = PacketCodec.STOP_PACKET
         elif command == 'd':
             # Send command to request sensor data
-            cmd_packet = struct.pack("<B", 0x03)
+            cmd_packet = PacketCodec.SENSOR_REQUEST_PACKET
         elif command == 'l':
-            l1 = input("Enter line 1 (max 16 chars): ")[:16].ljust(16)
-            l2 = input("Enter line 2 (max 16 chars): ")[:16].ljust(16)
-            cmd_packet = struct.pack("<B16s16s", 0x02, l1.encode('utf-8'), l2.encode('utf-8'))
+            l1 = input("Enter line 1 (max 16 chars): ")
+            l2 = input("Enter line 2 (max 16 chars): ")
+            cmd_packet = PacketCodec.encode_lcd(l1, l2)
         else:
             print("Invalid command")
             continue
-    
-        
-        checksum = sum(cmd_packet) & 0xFF
-        arduino.write(cmd_packet + bytes([checksum]))
+
+        arduino.write(cmd_packet)
 
         # Wait for response with timeout
         timeout = 1.0  # seconds
@@ -59,16 +63,12 @@ while True:
                     response_received = True
 
                     print(f"Response received in {response_time*1000:.2f} ms")
-                    fields = struct.unpack('<BfhhhhhhfBBB', data)
-                    start, distance, ax, ay, az, gx, gy, gz, temp, ir_flags, battery, received_checksum = fields
-            
-                    # Calculate checksum (sum of all bytes except start byte and checksum byte)
-                    calculated_checksum = sum(data[1:-1]) & 0xFF
-                    valid = calculated_checksum == received_checksum
-            
-                    if not valid:
-                        print(f"Invalid checksum: calculated={calculated_checksum}, received={received_checksum}")
+                    try:
+                        fields = PacketCodec.decode_sensor(data)
+                    except ValueError as e:
+                        print(e)
                         continue
+                    sequence, distance, ax, ay, az, gx, gy, gz, temp, ir_flags, battery = fields
             
                     # Extract IR flags
                     ir_front = not bool(ir_flags & 0b00000001)
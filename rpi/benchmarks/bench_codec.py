@@ -0,0 +1,68 @@
+"""
+Microbenchmark for PacketCodec: ns/packet for encoding and decoding each packet type,
+next to the hand-written struct.pack + sum() code it replaced.
+
+Usage (from the rpi directory):
+    python -m benchmarks.bench_codec [--number 200000]
+"""
+import argparse
+import struct
+import timeit
+
+from src.models import Command, PacketCodec
+from src.models.LCDCommand import LCDCommand
+from src.models.CommandTypeEnum import CommandType
+
+
+def legacy_motor(left_motor, right_motor):
+    packet = struct.pack("<Bhh", 0x01, left_motor, right_motor)
+    return packet + bytes([sum(packet) & 0xFF])
+
+
+def legacy_lcd(line_1, line_2):
+    packet = struct.pack("<B16s16s", 0x02, line_1.ljust(16)[:16].encode('utf-8'), line_2.ljust(16)[:16].encode('utf-8'))
+    return packet + bytes([sum(packet) & 0xFF])
+
+
+def legacy_decode(data):
+    fields = struct.unpack('<BfhhhhhhfBBB', data)
+    if sum(data[1:-1]) & 0xFF != fields[-1]:
+        raise ValueError("Invalid checksum")
+    return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200000, help="Iterations per case")
+    args = parser.parse_args()
+
+    motor_command = Command.from_joystick(0.6, -0.2)
+    lcd_command = Command(
+        ID="", command_type=CommandType.LCD, command=LCDCommand(line_1="Thinking...", line_2=""),
+        pause_duration=0, duration=0,
+    )
+    sensor_packet = PacketCodec.encode_sensor(42.5, 120, -80, 16384, 5, -3, 1, 25.5, 0, 87)
+    buffer = bytearray(64)
+
+    cases = [
+        ("motor encode (legacy struct + sum)", lambda: legacy_motor(180, -120)),
+        ("motor encode", lambda: PacketCodec.encode_motor(180, -120)),
+        ("motor pack_into", lambda: PacketCodec.pack_motor_into(buffer, 0, 180, -120)),
+        ("motor encode_command", lambda: PacketCodec.encode_command(motor_command)),
+        ("lcd encode (legacy struct + sum)", lambda: legacy_lcd("Thinking...", "")),
+        ("lcd encode (cached)", lambda: PacketCodec.encode_lcd("Thinking...", "")),
+        ("lcd encode_command (cached)", lambda: PacketCodec.encode_command(lcd_command)),
+        ("stop encode", lambda: PacketCodec.encode(PacketCodec.STOP)),
+        ("sensor request v2 encode", lambda: PacketCodec.encode_sensor_request(17)),
+        ("sensor decode (legacy struct + sum)", lambda: legacy_decode(sensor_packet)),
+        ("sensor decode", lambda: PacketCodec.decode_sensor(sensor_packet)),
+        ("sensor decode (pre-verified)", lambda: PacketCodec.decode_sensor(sensor_packet, verify=False)),
+    ]
+
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=args.number, repeat=3))
+        print(f"{name:<40} {best / args.number * 1e9:8.1f} ns/packet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Checks that DriveMixer's vectorized paths are bit-identical to the scalar code and times both.
+
+Every controller mode is run over random axes (plus the exact deadzone/clamp edges) through the
+scalar path (joystick_from_axes_scalar + Command.joystick_to_motor) and the NumPy path
+(joystick_from_axes + mix); any mismatch fails the run. The motor packets built by motor_packets
+are compared with PacketCodec.encode_motor as well.
+
+Usage (from the rpi directory):
+    python -m benchmarks.bench_drive_mixer [--samples 200000]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from src.models import Command, PacketCodec
+from src.models.DriveMixer import DriveMixer
+
+
+def scalar_path(mode, axes, speed, precision):
+    motors = []
+    for i in range(len(axes)):
+        left_y, right_x = DriveMixer.joystick_from_axes_scalar(mode, axes[i], speed[i], precision[i])
+        motors.append(Command.joystick_to_motor(left_y, right_x))
+    return motors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=200000, help="Samples per controller mode")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    mixer = DriveMixer()
+    edges = np.array([-1.0, -0.9, -0.1, -0.0999999, 0.0, 0.0999999, 0.1, 0.5, 0.9, 1.0])
+    failures = 0
+
+    for mode in DriveMixer.MODES:
+        axes = rng.uniform(-1, 1, size=(args.samples, 6))
+        axes[:len(edges) ** 2, 1] = np.repeat(edges, len(edges))
+        axes[:len(edges) ** 2, 2] = np.tile(edges, len(edges))
+        axes[:len(edges) ** 2, 0] = np.tile(edges, len(edges))
+        speed = rng.uniform(0, 1, size=args.samples)
+        precision = rng.random(args.samples) < 0.3
+        if mode == DriveMixer.GESTURE:
+            axes = axes[:, 1:3]
+
+        # Plain Python values, as the scalar code would see them
+        axes_list, speed_list, precision_list = axes.tolist(), speed.tolist(), precision.tolist()
+        start = time.perf_counter()
+        expected = scalar_path(mode, axes_list, speed_list, precision_list)
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        left_y, right_x = mixer.joystick_from_axes(mode, axes, speed, precision)
+        left_motor, right_motor = mixer.mix(left_y, right_x)
+        vector_time = time.perf_counter() - start
+
+        mismatches = int(np.count_nonzero(np.array(expected, dtype=np.int16) != np.stack([left_motor, right_motor], axis=1)))
+        failures += mismatches
+        print(f"{mode:<12} scalar {scalar_time / args.samples * 1e9:8.1f} ns/sample   "
+              f"vector {vector_time / args.samples * 1e9:6.1f} ns/sample   "
+              f"speedup {scalar_time / vector_time:6.1f}x   mismatches {mismatches}")
+
+    packets = DriveMixer.motor_packets(left_motor[:1000], right_motor[:1000])
+    packet_mismatches = sum(bytes(packets[i]) != PacketCodec.encode_motor(int(left_motor[i]), int(right_motor[i])) for i in range(1000))
+    failures += packet_mismatches
+    print(f"motor_packets mismatches: {packet_mismatches}")
+
+    grid = np.arange(-1024, 1025) / 1024
+    lut_mismatches = sum(mixer.mix_lut(y, x) != mixer.mix_scalar(y, x) for y, x in zip(grid.tolist(), grid[::-1].tolist()))
+    failures += lut_mismatches
+    samples = rng.uniform(-1, 1, size=(args.samples, 2)).tolist()
+    for name, func in (("mix_scalar", mixer.mix_scalar), ("mix_lut", mixer.mix_lut)):
+        start = time.perf_counter()
+        for left_y, right_x in samples:
+            func(left_y, right_x)
+        print(f"{name:<12} {(time.perf_counter() - start) / len(samples) * 1e9:8.1f} ns/sample")
+    print(f"mix_lut mismatches on its grid: {lut_mismatches}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Microbenchmark for the per-packet sensor hot path: decoding a packet and running the obstacle and
+cliff checks, with the pydantic SensorData built for every packet (before) versus a SensorRecord
+that is only converted when emitted (after).
+
+The "emit" cases convert one packet in --emit-every, matching the 10 Hz emit throttle at the given
+packet rate (default: 100 Hz sensor stream, so 1 in 10).
+
+Usage (from the rpi directory):
+    python -m benchmarks.bench_sensor_record [--number 100000] [--emit-every 10]
+"""
+import argparse
+import itertools
+import timeit
+
+from src.models import PacketCodec, SensorData, SensorRecord
+
+
+def legacy_record(data):
+    """What Robot.process_sensor_data did per packet before SensorRecord."""
+    sequence, distance, ax, ay, az, gx, gy, gz, temp, ir_flags, battery = PacketCodec.decode_sensor(data)
+    sensor_data = SensorData(
+        ultrasonic={"distance": distance},
+        imu={
+            "acceleration_x": ax / 16384, "acceleration_y": ay / 16384, "acceleration_z": az / 16384,
+            "gyroscope_x": gx / 131, "gyroscope_y": gy / 131, "gyroscope_z": gz / 131,
+            "temperature": temp,
+        },
+        ir_front=not bool(ir_flags & 0b00000001),
+        ir_back=not bool(ir_flags & 0b00000010),
+        battery=battery,
+    )
+    sensor_data.is_obstacle_detected(20)
+    sensor_data.check_cliff()
+    return sensor_data
+
+
+def fast_record(data):
+    record = SensorRecord.from_packet(data, verify=False)
+    record.is_obstacle_detected(20)
+    record.check_cliff()
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100000, help="Packets per case")
+    parser.add_argument("--emit-every", type=int, default=10, help="Serialize one packet in this many")
+    args = parser.parse_args()
+
+    packet = PacketCodec.encode_sensor(42.5, 120, -80, 16384, 5, -3, 1, 25.5, 0, 87)
+    counter = itertools.count()
+    emit_every = args.emit_every
+
+    def legacy_with_emit():
+        sensor_data = legacy_record(packet)
+        if next(counter) % emit_every == 0:
+            sensor_data.model_dump()
+
+    def fast_with_emit():
+        record = fast_record(packet)
+        if next(counter) % emit_every == 0:
+            record.model_dump()
+
+    cases = [
+        ("SensorData per packet (before)", lambda: legacy_record(packet)),
+        ("SensorRecord per packet (after)", lambda: fast_record(packet)),
+        (f"SensorData + emit 1/{emit_every} (before)", legacy_with_emit),
+        (f"SensorRecord + emit 1/{emit_every} (after)", fast_with_emit),
+        ("SensorRecord.to_model", fast_record(packet).to_model),
+    ]
+
+    results = {}
+    for name, func in cases:
+        best = min(timeit.repeat(func, number=args.number, repeat=3))
+        results[name] = best / args.number * 1e9
+        print(f"{name:<40} {results[name]:8.1f} ns/packet")
+
+    before, after = results[cases[2][0]], results[cases[3][0]]
+    print(f"{'speedup with throttled emit':<40} {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compare the thread and asyncio serial transports of SerialManager over a pseudo-terminal.
+
+Measures process CPU while the link is idle and the delay between a sensor packet being
+written to the pty and Robot.process_sensor_data receiving it on the event loop.
+
+Usage (from the rpi directory):
+    python -m benchmarks.bench_transport [--idle 5] [--packets 2000] [--rate 200] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import struct
+import time
+
+from src.models.SerialManager import SerialManager
+
+
+def sensor_packet(sequence: int) -> bytes:
+    # The distance field carries the sequence number so replies can be matched to send times
+    packet = struct.pack('<BfhhhhhhfBB', 0xAA, float(sequence), 0, 0, 16384, 0, 0, 0, 25.0, 0b11, 90)
+    return packet + bytes([sum(packet[1:]) & 0xFF])
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LatencyProbe:
+    """Stands in for Robot: records when each packet reaches process_sensor_data."""
+
+    def __init__(self):
+        self.sent = {}
+        self.latencies = []
+
+    async def start(self):
+        pass
+
+    async def process_sensor_data(self, data: bytes):
+        received = time.perf_counter()
+        sequence = int(struct.unpack_from('<f', data, 1)[0])
+        sent = self.sent.pop(sequence, None)
+        if sent is not None:
+            self.latencies.append(received - sent)
+
+
+async def run_transport(transport: str, idle: float, packets: int, rate: float) -> dict:
+    master, slave = os.openpty()
+    manager = SerialManager(os.ttyname(slave), 115200, transport=transport)
+    probe = LatencyProbe()
+    manager.start(probe, asyncio.get_running_loop())
+    await asyncio.sleep(0.1)
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(idle)
+    idle_cpu = (time.process_time() - cpu_start) / idle
+
+    interval = 1 / rate
+    cpu_start = time.process_time()
+    for sequence in range(packets):
+        probe.sent[sequence] = time.perf_counter()
+        os.write(master, sensor_packet(sequence))
+        await asyncio.sleep(interval)
+    await asyncio.sleep(0.2)
+    load_cpu = time.process_time() - cpu_start
+
+    manager.stop()
+    await asyncio.sleep(0.05)
+    manager.serial.close()
+    os.close(master)
+    os.close(slave)
+
+    latencies = sorted(probe.latencies)
+    return {
+        "transport": manager.transport,
+        "idle_cpu_percent": idle_cpu * 100,
+        "packets_sent": packets,
+        "packets_received": len(latencies),
+        "cpu_ms_under_load": load_cpu * 1000,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+        "framing": manager.framing_stats(),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=float, default=5.0, help="Seconds to measure idle CPU")
+    parser.add_argument("--packets", type=int, default=2000, help="Packets to send for the latency run")
+    parser.add_argument("--rate", type=float, default=200.0, help="Packets per second during the latency run")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for transport in SerialManager.PORT_TRANSPORTS:
+        result = await run_transport(transport, args.idle, args.packets, args.rate)
+        results.append(result)
+        latency = result["latency_ms"]
+        print(
+            f"{result['transport']:>6}: idle CPU {result['idle_cpu_percent']:5.2f}%  "
+            f"latency p50 {latency['p50']:.3f} ms  p95 {latency['p95']:.3f} ms  p99 {latency['p99']:.3f} ms  "
+            f"({result['packets_received']}/{result['packets_sent']} packets)"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Load test for AI query admission control (QueryManager) against a local fake model endpoint.
+
+Starts the mock Responses API (src.ai.mock_server) on a local port in the same event loop, points
+the OpenAI client at it and drives a Robot on a SimulatedArduino in real time. A burst of queries
+arrives with exponential gaps: some repeat the query in flight (deduplicated), some are STOP
+(cancelled), some never get an answer from the model (plan deadline), the rest supersede each
+other. Three final queries run to the end one by one: one that hangs, one whose plan outlasts the
+execution deadline and one that completes. Queries are unique and outside the intent grammar, and
+the plan cache is memory only, so every planned query reaches the fake model.
+
+Usage (from the rpi directory):
+    python -m benchmarks.load_queries [--queries 300] [--interval 0.05] [--stream]
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+
+def motor(left: int, right: int, duration: int, pause: int = 0) -> dict:
+    return {"ID": "", "command_type": "MOTOR", "command": {"left_motor": left, "right_motor": right},
+            "duration": duration, "pause_duration": pause}
+
+
+PLANS = {
+    "marathon": {"commands": [motor(150, 150, 1, 1) for _ in range(5)]},  # 10 s, past the execution deadline
+    "default": {"commands": [motor(150, 150, 1), motor(-150, 150, 1)]},
+}
+
+
+class NullSocketIO:
+    """Stands in for socketio.AsyncServer and counts the emits."""
+
+    def __init__(self):
+        self.emits = 0
+
+    async def emit(self, event, data=None, **kwargs):
+        self.emits += 1
+
+    async def enter_room(self, sid, room):
+        pass
+
+    async def leave_room(self, sid, room):
+        pass
+
+
+def print_stats(stats: dict):
+    for name, value in stats.items():
+        if isinstance(value, dict):
+            print(f"  {name:<19} n={value['count']:<5} p50 {value['p50'] * 1000:8.1f} ms  "
+                  f"p99 {value['p99'] * 1000:8.1f} ms  max {value['max'] * 1000:8.1f} ms")
+        else:
+            print(f"  {name:<19} {value}")
+
+
+async def run(args):
+    # Imported here, after main() pointed the OpenAI client at the mock server
+    import uvicorn
+    from src.ai.get_commands import get_client
+    from src.ai.mock_server import create_app
+    from src.models import Clock, Robot, SerialManager
+    from src.models.ArduinoEmulator import SimulatedArduino
+
+    app = create_app(PLANS, first_token_delay=args.first_token_delay, chunk_size=16, chunk_delay=args.chunk_delay)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    get_client()  # Load the AI stack before the first query's planning deadline starts
+    clock = Clock()
+    arduino = SimulatedArduino(clock, seed=1)
+    serial_manager = SerialManager(connection=arduino, transport="feed", clock=clock)
+    arduino.on_receive = serial_manager.feed
+    robot = Robot(serial_manager, NullSocketIO())
+    robot.stream_queries = args.stream
+    queries = robot.queries
+    queries.plan_timeout = args.plan_timeout
+    queries.execution_timeout = args.execution_timeout
+    arduino.start()
+    serial_manager.start(robot, asyncio.get_running_loop())
+
+    rng = random.Random(args.seed)
+    query = None
+    tasks = set()
+    started = time.perf_counter()
+    for index in range(args.queries):
+        roll = rng.random()
+        if roll < args.stop_rate:
+            robot.emergency_stop()
+        else:
+            if query is None or roll >= args.stop_rate + args.repeat_rate:
+                keyword = "hang" if rng.random() < args.hang_rate else "dance"
+                query = f"{keyword} pattern {index}"
+            tasks.add(await robot.handle_query(query))
+        await asyncio.sleep(rng.expovariate(1 / args.interval))
+    burst = time.perf_counter() - started
+
+    # One query at a time to the end: planning deadline, execution deadline, completion
+    for query in ("hang until the deadline", "marathon drive", "dance to finish"):
+        task = await robot.handle_query(query)
+        tasks.add(task)
+        await asyncio.gather(task, return_exceptions=True)
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+
+    serial_manager.stop()
+    server.should_exit = True
+    await server_task
+
+    print(f"{args.queries} queries in {burst:.1f} s, finished after {elapsed:.1f} s "
+          f"({'streamed' if args.stream else 'whole'} plans)")
+    print_stats(queries.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--interval", type=float, default=0.05, help="Mean seconds between queries")
+    parser.add_argument("--repeat-rate", type=float, default=0.2, help="Share of queries repeating the previous one")
+    parser.add_argument("--stop-rate", type=float, default=0.05, help="Share of STOPs")
+    parser.add_argument("--hang-rate", type=float, default=0.05, help="Share of new queries the model never answers")
+    parser.add_argument("--plan-timeout", type=float, default=1.0)
+    parser.add_argument("--execution-timeout", type=float, default=3.0)
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument("--chunk-delay", type=float, default=0.005)
+    parser.add_argument("--stream", action="store_true", help="Run commands while the plan streams in")
+    parser.add_argument("--port", type=int, default=8093)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "mock")
+    os.environ["PLAN_CACHE_PATH"] = ""
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Non-interactive serial round-trip benchmark.
+
+Drives thousands of sensor request/response cycles through the real SerialManager (framer, pipeline
+and writer included) and reports round-trip latency percentiles, sustained packets/sec, checksum
+failure and resync counts, and host CPU time per packet. Results are written as JSON so runs can be
+compared across commits.
+
+Without --port an ArduinoEmulator is started in a child process, so its CPU time is not counted.
+
+Usage (from the rpi directory):
+    python -m benchmarks.serial_roundtrip --count 5000 --json results.json
+    python -m benchmarks.serial_roundtrip --protocol 2 --in-flight 4 --corrupt-rate 0.01
+    python -m benchmarks.serial_roundtrip --port /dev/ttyUSB0     # real board
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing
+import subprocess
+import time
+
+from src.models.ArduinoEmulator import ArduinoEmulator
+from src.models.PacketCodec import PacketCodec
+from src.models.SerialManager import SerialManager
+
+
+def run_emulator(connection, options: dict):
+    """Child process entry point: run an emulator until the parent closes the pipe."""
+    emulator = ArduinoEmulator(**options)
+    connection.send(emulator.start())
+    try:
+        connection.recv()
+    except EOFError:
+        pass
+    emulator.stop()
+
+
+class RoundTripProbe:
+    """Stands in for Robot as the SerialManager consumer and matches replies to requests."""
+
+    def __init__(self, protocol_version: int):
+        self.protocol_version = protocol_version
+        self.pending = {}  # Sequence number -> (send time, future)
+        self.unmatched = 0
+
+    async def start(self):
+        pass
+
+    async def process_sensor_data(self, data: bytes):
+        received = time.perf_counter()
+        sequence = data[1] if self.protocol_version == 2 else 0
+        entry = self.pending.pop(sequence, None)
+        if entry is None:
+            self.unmatched += 1
+            return
+        sent, future = entry
+        if not future.done():
+            future.set_result(received - sent)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(args, port: str) -> dict:
+    manager = SerialManager(port, args.baudrate, transport=args.transport, protocol_version=args.protocol)
+    probe = RoundTripProbe(args.protocol)
+    loop = asyncio.get_running_loop()
+    manager.start(probe, loop)
+    await asyncio.sleep(0.1)
+
+    # v1 replies can't be matched, so only one request may be outstanding
+    window = args.in_flight if args.protocol == 2 else 1
+    semaphore = asyncio.Semaphore(window)
+    latencies = []
+    timeouts = 0
+    next_sequence = 1
+
+    async def cycle(sequence):
+        nonlocal timeouts
+        future = loop.create_future()
+        probe.pending[sequence] = (time.perf_counter(), future)
+        if args.protocol == 2:
+            manager.send_sensor_request(sequence)
+        else:
+            manager.writer.submit(PacketCodec.SENSOR_REQUEST_PACKET)
+        try:
+            latencies.append(await asyncio.wait_for(future, args.timeout))
+        except asyncio.TimeoutError:
+            probe.pending.pop(sequence, None)
+            timeouts += 1
+        finally:
+            semaphore.release()
+
+    manager._framer.reset_stats()
+    manager.writer.reset_stats()
+    tasks = []
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(args.count):
+        await semaphore.acquire()
+        sequence = next_sequence if args.protocol == 2 else 0
+        next_sequence = next_sequence % 255 + 1
+        tasks.append(asyncio.create_task(cycle(sequence)))
+    await asyncio.gather(*tasks)
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    framing = manager.framing_stats()
+    writer = manager.writer_stats()
+    pipeline = manager.pipeline_stats()
+    manager.stop()
+    manager.serial.close()
+
+    latencies.sort()
+    received = len(latencies)
+    return {
+        "round_trip_ms": {
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "mean": sum(latencies) / received * 1000 if received else 0.0,
+            "max": (latencies[-1] if latencies else 0.0) * 1000,
+        },
+        "requests": args.count,
+        "replies": received,
+        "timeouts": timeouts,
+        "unmatched_replies": probe.unmatched,
+        "packets_per_sec": received / wall_time if wall_time > 0 else 0.0,
+        "cpu_us_per_packet": cpu_time / received * 1e6 if received else 0.0,
+        "checksum_errors": framing["checksum_errors"],
+        "resyncs": framing["resyncs"],
+        "bytes_discarded": framing["bytes_discarded"],
+        "write_latency_ms": {key: value * 1000 for key, value in writer["write_latency"].items() if key != "count"},
+        "pipeline_latency_ms": {key: value * 1000 for key, value in pipeline["latency"].items() if key != "count"},
+        "pipeline_dropped": pipeline["dropped"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", help="Serial device of a real board (default: start an emulator)")
+    parser.add_argument("--baudrate", type=int, default=115200)
+    parser.add_argument("--count", type=int, default=5000, help="Number of request/response cycles")
+    parser.add_argument("--protocol", type=int, choices=SerialManager.PROTOCOL_VERSIONS, default=1)
+    parser.add_argument("--in-flight", type=int, default=4, help="Outstanding requests with protocol 2")
+    parser.add_argument("--transport", choices=SerialManager.PORT_TRANSPORTS, default="async")
+    parser.add_argument("--timeout", type=float, default=0.5, help="Seconds before a request counts as lost")
+    parser.add_argument("--response-delay", type=float, default=0.0, help="Emulator reply delay in seconds")
+    parser.add_argument("--corrupt-rate", type=float, default=0.0, help="Emulator packet corruption probability")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    emulator_process = parent_connection = None
+    port = args.port
+    if port is None:
+        parent_connection, child_connection = multiprocessing.Pipe()
+        options = {"response_delay": args.response_delay, "corrupt_rate": args.corrupt_rate, "seed": 0}
+        emulator_process = multiprocessing.Process(target=run_emulator, args=(child_connection, options), daemon=True)
+        emulator_process.start()
+        port = parent_connection.recv()
+
+    try:
+        results = await run_benchmark(args, port)
+    finally:
+        if emulator_process:
+            parent_connection.close()
+            emulator_process.join(timeout=2)
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "commit": git_commit(),
+        "config": {
+            "port": args.port or "emulator",
+            "count": args.count,
+            "protocol": args.protocol,
+            "in_flight": args.in_flight if args.protocol == 2 else 1,
+            "transport": args.transport,
+            "response_delay": args.response_delay,
+            "corrupt_rate": args.corrupt_rate,
+        },
+        "results": results,
+    }
+
+    round_trip = results["round_trip_ms"]
+    print(
+        f"{results['replies']}/{results['requests']} replies, {results['packets_per_sec']:.0f} packets/s, "
+        f"RTT p50 {round_trip['p50']:.3f} ms  p95 {round_trip['p95']:.3f} ms  p99 {round_trip['p99']:.3f} ms, "
+        f"{results['cpu_us_per_packet']:.1f} us CPU/packet, "
+        f"{results['checksum_errors']} checksum errors, {results['resyncs']} resyncs"
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
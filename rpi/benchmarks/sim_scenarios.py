@@ -0,0 +1,146 @@
+"""
+Runs scripted driving scenarios against the real Robot logic in virtual time.
+
+Each scenario wires Robot -> SerialManager ("feed" transport) -> SimulatedArduino on a VirtualClock,
+so reflex timing, sensor polling and command sequence pacing behave as on the tank but nothing
+waits for the wall clock. A scenario fails if the robot doesn't react as expected; the run exits
+non-zero if any scenario failed. Scenario functions return (failures, simulated seconds).
+
+    wall   drive at a wall with the joystick, the obstacle reflex must back off before contact
+    cliff  drive towards a drop-off, the cliff reflex must stop with the back sensor still on the floor
+    plan   a 30 second AI command sequence in open space must run to completion, every step on time
+
+Usage (from the rpi directory):
+    python -m benchmarks.sim_scenarios [--protocol 1] [--scenario wall]
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from src.models import AICommand, Command, CommandType, MotorCommand, Robot, SafetyReflex, SerialManager, VirtualClock
+from src.models.ArduinoEmulator import EmulatorScenario, SimulatedArduino
+
+
+class RecordingSocketIO:
+    """Stands in for socketio.AsyncServer and keeps the emitted events."""
+
+    def __init__(self):
+        self.events = []
+
+    async def emit(self, event, data=None, **kwargs):
+        self.events.append((event, data))
+
+    async def enter_room(self, sid, room):
+        pass
+
+    async def leave_room(self, sid, room):
+        pass
+
+    def count(self, event: str) -> int:
+        return sum(1 for name, _ in self.events if name == event)
+
+
+async def build(scenario: EmulatorScenario, protocol: int):
+    clock = VirtualClock()
+    arduino = SimulatedArduino(clock, scenario=scenario, noise=0.5, seed=1)
+    serial_manager = SerialManager(connection=arduino, transport="feed", clock=clock, protocol_version=protocol)
+    arduino.on_receive = serial_manager.feed
+    socketio = RecordingSocketIO()
+    robot = Robot(serial_manager, socketio)
+    await robot.telemetry.connect("dashboard")  # A legacy client, so every event is emitted
+
+    arduino.start()
+    serial_manager.start(robot, asyncio.get_running_loop())
+    await clock.advance(1.5)  # Link up and some sensor history before driving
+    return clock, arduino, serial_manager, robot, socketio
+
+
+async def drive(robot, clock, left_y: float, seconds: float):
+    """Hold the stick like the dashboard does, sending it every 50 ms."""
+    for _ in range(int(seconds / 0.05)):
+        await robot.handle_joystick_input({"left_y": left_y, "right_x": 0})
+        await clock.advance(0.05)
+
+
+async def wall(protocol: int) -> tuple:
+    clock, arduino, serial_manager, robot, socketio = await build(EmulatorScenario(wall_distance=100), protocol)
+    await drive(robot, clock, 0.8, 6)
+    serial_manager.stop()
+    failures = []
+    if not robot.safety.triggered[SafetyReflex.OBSTACLE]:
+        failures.append("obstacle reflex never fired")
+    if arduino.x >= 100 - arduino.IR_FRONT_OFFSET:
+        failures.append(f"robot hit the wall (x = {arduino.x:.1f} cm)")
+    if not socketio.count("rumble"):
+        failures.append("no rumble sent")
+    return failures, clock.monotonic()
+
+
+async def cliff(protocol: int) -> tuple:
+    clock, arduino, serial_manager, robot, socketio = await build(EmulatorScenario(cliff_distance=60), protocol)
+    await drive(robot, clock, 0.8, 4)
+    serial_manager.stop()
+    failures = []
+    if not robot.safety.triggered[SafetyReflex.CLIFF]:
+        failures.append("cliff reflex never fired")
+    if arduino.x - arduino.IR_BACK_OFFSET > 60:
+        failures.append(f"robot fell off the cliff (x = {arduino.x:.1f} cm)")
+    return failures, clock.monotonic()
+
+
+async def plan(protocol: int) -> tuple:
+    clock, arduino, serial_manager, robot, socketio = await build(EmulatorScenario(), protocol)
+
+    def motor(left, right, duration, pause=0):
+        return Command(ID="", command_type=CommandType.MOTOR, command=MotorCommand(left_motor=left, right_motor=right),
+                       duration=duration, pause_duration=pause)
+
+    commands = AICommand(commands=[motor(150, 150, 8, 1), motor(-120, 120, 3, 1), motor(150, 150, 8, 1),
+                                   motor(120, -120, 3), motor(-150, -150, 5)])
+    started = clock.monotonic()
+    task = asyncio.create_task(robot._run_command_sequence(commands))
+    while not task.done():
+        await clock.advance(0.5)
+    elapsed = clock.monotonic() - started
+    serial_manager.stop()
+
+    failures = []
+    cleared = [data for event, data in socketio.events if event == "active_command" and data.get("ID") == ""]
+    if not cleared or "error" in cleared[-1]:
+        failures.append(f"sequence did not complete: {cleared[-1] if cleared else 'no final active_command'}")
+    if not 30 <= elapsed < 31:
+        failures.append(f"sequence took {elapsed:.2f} virtual seconds, expected 30")
+    if arduino.left_motor or arduino.right_motor:
+        failures.append("motors still running after the sequence")
+    if (robot.step_lateness.max or 0) > 0.05:
+        failures.append(f"a step started {robot.step_lateness.max * 1000:.0f} ms behind its deadline")
+    return failures, clock.monotonic()
+
+
+SCENARIOS = {"wall": wall, "cliff": cliff, "plan": plan}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--protocol", type=int, choices=SerialManager.PROTOCOL_VERSIONS, default=1)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append", help="Scenario to run (default: all)")
+    args = parser.parse_args()
+
+    failed = 0
+    for name in args.scenario or SCENARIOS:
+        started = time.perf_counter()
+        failures, simulated = asyncio.run(SCENARIOS[name](args.protocol))
+        elapsed = time.perf_counter() - started
+        failed += bool(failures)
+        print(f"{name:<6} {'FAIL' if failures else 'ok':<4} {simulated:6.1f} s simulated in {elapsed:5.2f} s "
+              f"({simulated / elapsed:5.0f}x real time)")
+        for failure in failures:
+            print(f"       {failure}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Run the pseudo-terminal Arduino emulator so the rpi stack can be started without the tank attached.
+
+Usage:
+    python emulator.py --scenario wall --push-rate 50
+    SERIAL_PORT=/dev/pts/N python main.py    # in another terminal, using the printed port
+"""
+import argparse
+import logging
+import time
+
+from src.models.ArduinoEmulator import ArduinoEmulator, EmulatorScenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default="open", choices=("open", "wall", "cliff"), help="Simulated surroundings")
+    parser.add_argument("--response-delay", type=float, default=0.002, help="Seconds before answering a command")
+    parser.add_argument("--push-rate", type=float, default=0.0, help="Unsolicited sensor packets per second")
+    parser.add_argument("--noise", type=float, default=0.0, help="Ultrasonic noise standard deviation in cm")
+    parser.add_argument("--corrupt-rate", type=float, default=0.0, help="Probability of corrupting an outgoing packet")
+    parser.add_argument("--seed", type=int, help="Random seed for noise and corruption")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    emulator = ArduinoEmulator(
+        response_delay=args.response_delay,
+        push_rate=args.push_rate,
+        noise=args.noise,
+        corrupt_rate=args.corrupt_rate,
+        scenario=EmulatorScenario.named(args.scenario),
+        seed=args.seed,
+    )
+    with emulator:
+        print(f"Emulated Arduino on {emulator.port}")
+        try:
+            while True:
+                time.sleep(5)
+                logging.info(emulator.stats())
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
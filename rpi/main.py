@@ -1,20 +1,60 @@
+import time
+STARTED = time.perf_counter()  # Imports are part of the startup time
+
 import asyncio
+import importlib
 import logging
-from src import text_to_command
-from src import Robot, SerialManager, run_socket_server, socketio
+import os
+from src.models import Robot, SerialManager, StartupTimer, TelemetryRecorder
+
+LINK_TIMEOUT = 5  # Seconds to wait for the Arduino before starting the web server anyway
+
+
+def load_ai():
+    """Import the AI stack and create the OpenAI client (runs in a worker thread)."""
+    importlib.import_module("src.ai.get_commands").get_client()
+
+
+def report_startup(startup: StartupTimer, ai: asyncio.Task):
+    logger = logging.getLogger("Startup")
+    if not ai.cancelled() and ai.exception() is not None:
+        logger.error(f"AI stack failed to load, queries will fail: {ai.exception()}")
+    logger.info(startup.report())
+
 
 async def main():
-    port = SerialManager.find_port()
-    if not port:
-        logging.error("No serial port found. Please connect the robot.")
-        return
-    serial_manager = SerialManager(port, 115200)
-    robot = Robot(serial_manager, socketio)
-    
-    loop = asyncio.get_running_loop()
-    serial_manager.start(robot, loop)  # Start background serial read thread
-
-    await run_socket_server(robot)
+    # Staged startup: serial link and safety reflexes first, then the web server, then the AI stack.
+    # The slow imports run in a worker thread so the event loop keeps serving the Arduino meanwhile.
+    startup = StartupTimer(STARTED)
+    startup.mark("imports")
+
+    with startup.phase("serial"):
+        port = os.environ.get("SERIAL_PORT") or SerialManager.find_port()  # SERIAL_PORT can point at emulator.py
+        if not port:
+            logging.error("No serial port found. Please connect the robot.")
+            return
+        serial_manager = SerialManager(port, 115200)
+        if os.environ.get("TELEMETRY_LOG_DIR"):  # Capture raw packets for offline analysis, see TelemetryLog
+            recorder = TelemetryRecorder(os.environ["TELEMETRY_LOG_DIR"])
+            recorder.start()
+            serial_manager.attach_recorder(recorder)
+        robot = Robot(serial_manager)
+        robot.stream_queries = os.environ.get("STREAM_QUERIES", "") not in ("", "0")  # Run AI plans while they are generated
+        serial_manager.start(robot, asyncio.get_running_loop())  # Start reading serial packets on the event loop
+
+    web = asyncio.create_task(startup.timed("web_import", asyncio.to_thread(importlib.import_module, "src.server")))
+    with startup.phase("link"):  # First sensor packet through the safety reflexes
+        try:
+            await asyncio.wait_for(serial_manager.ready.wait(), LINK_TIMEOUT)
+        except TimeoutError:
+            logging.warning(f"No sensor data from the Arduino after {LINK_TIMEOUT} s, starting anyway")
+
+    server = await web
+    robot.attach_socketio(server.sio)
+    ai = asyncio.create_task(startup.timed("ai_import", asyncio.to_thread(load_ai)))
+    ai.add_done_callback(lambda task: report_startup(startup, task))
+    await server.run_socket_server(robot, startup)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     asyncio.run(main())
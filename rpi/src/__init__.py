@@ -1,3 +1,28 @@
+import importlib
+
 from .models import *
-from .ai import *
-from .server import sio as socketio, run_socket_server
\ No newline at end of file
+
+# The AI stack (openai) and the web server (FastAPI, python-socketio, uvicorn) take seconds to import
+# on the Pi, so they load on first use (PEP 562) and the serial link can come up first
+_EXPORTS = {
+    "text_to_command": (".ai", "text_to_command"),
+    "plan_cache": (".ai", "plan_cache"),
+    "intent_compiler": (".ai", "intent_compiler"),
+    "IntentCompiler": (".ai", "IntentCompiler"),
+    "PlanCache": (".ai", "PlanCache"),
+    "socketio": (".server", "sio"),
+    "run_socket_server": (".server", "run_socket_server"),
+}
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = _EXPORTS[name]
+    value = getattr(importlib.import_module(module, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
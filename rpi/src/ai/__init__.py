@@ -1 +1,24 @@
-from .get_commands import text_to_command
\ No newline at end of file
+import importlib
+
+# Loaded on first use (PEP 562): get_commands reads .env and builds the plan cache, which the serial
+# link and safety reflexes don't need at startup
+_EXPORTS = {
+    "text_to_command": ".get_commands",
+    "plan_cache": ".get_commands",
+    "intent_compiler": ".get_commands",
+    "IntentCompiler": ".intents",
+    "PlanCache": ".plan_cache",
+}
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -1,19 +1,64 @@
-from openai import AsyncOpenAI
+import hashlib
+import os
+import time
+
 from dotenv import load_dotenv
 load_dotenv()
 from ..models.CommandResponse import AICommand
+from .intents import IntentCompiler
+from .plan_cache import PlanCache
+from .plan_stream import PlanStreamParser
+
+
+_client = None
+intent_compiler = IntentCompiler()  # Simple queries never reach the model
+plan_cache = PlanCache(os.environ.get("PLAN_CACHE_PATH", "plan_cache.json"))  # "" keeps it in memory only
+
+
+def get_client():
+    """The AsyncOpenAI client, created on first use: importing openai takes most of a second on the Pi."""
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+        _client = AsyncOpenAI()
+    return _client
+
+
+class PromptFile:
+    """System prompt read once and re-read only when the file's modification time or size changes."""
 
+    def __init__(self, path: str):
+        self.path = path
+        self.text = None
+        self.hash = None  # Short sha256 of the text, part of the plan cache key
+        self._version = None
 
-client = AsyncOpenAI()
+    def load(self) -> "PromptFile":
+        stat = os.stat(self.path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version != self._version:
+            with open(self.path, 'r') as prompt_file:
+                self.text = prompt_file.read()
+            self.hash = hashlib.sha256(self.text.encode()).hexdigest()[:16]
+            self._version = version
+        return self
 
-async def text_to_command(query: str, path="src/ai/PROMPT.txt") -> AICommand:
-    with open(path, 'r') as prompt_file:
-        system_prompt = prompt_file.read()
-        
-    messages = [
+
+_prompts = {}  # path -> PromptFile
+
+
+def _load_prompt(path: str) -> PromptFile:
+    prompt = _prompts.get(path)
+    if prompt is None:
+        prompt = _prompts[path] = PromptFile(path)
+    return prompt.load()
+
+
+def _messages(prompt: PromptFile, query: str) -> list:
+    return [
         {
             "role": "system",
-            "content": system_prompt,
+            "content": prompt.text,
         },
         {
             "role": "user",
@@ -21,20 +66,76 @@ async def text_to_command(query: str, path="src/ai/PROMPT.txt") -> AICommand:
         }
     ]
 
-    response = await client.responses.parse(
+
+async def text_to_command(query: str, path="src/ai/PROMPT.txt", use_cache: bool = True,
+                          use_intents: bool = True) -> AICommand:
+    if use_intents:
+        plan = intent_compiler.compile(query)
+        if plan is not None:
+            return plan
+
+    prompt = _load_prompt(path)
+
+    if use_cache:
+        cached = plan_cache.get(query, prompt.hash)
+        if cached is not None:
+            return cached
+
+    started = time.perf_counter()
+    response = await get_client().responses.parse(
         model="gpt-4.1-nano",
-        input=messages,
+        input=_messages(prompt, query),
         temperature=1,
         top_p=1,
         max_output_tokens=500,
         text_format=AICommand
     )
-    
-    return response.output_parsed
 
+    intent_compiler.observe_model_time(time.perf_counter() - started)
+    plan = response.output_parsed
+    if use_cache and plan is not None and plan.commands:
+        plan_cache.put(query, prompt.hash, plan)
+    return plan
+
+
+async def stream_commands(query: str, path="src/ai/PROMPT.txt", use_cache: bool = True, use_intents: bool = True):
+    """
+    Async generator yielding each ``Command`` of the plan as soon as the model has finished writing it.
+
+    Plans from the intent compiler or the cache are yielded at once. The complete plan is cached when
+    the stream ends.
+    """
+    if use_intents:
+        plan = intent_compiler.compile(query)
+        if plan is not None:
+            for command in plan.commands:
+                yield command
+            return
 
+    prompt = _load_prompt(path)
 
+    if use_cache:
+        cached = plan_cache.get(query, prompt.hash)
+        if cached is not None:
+            for command in cached.commands:
+                yield command
+            return
+
+    parser = PlanStreamParser()
+    started = time.perf_counter()
+    async with get_client().responses.stream(
+        model="gpt-4.1-nano",
+        input=_messages(prompt, query),
+        temperature=1,
+        top_p=1,
+        max_output_tokens=500,
+        text_format=AICommand
+    ) as stream:
+        async for event in stream:
+            if event.type == "response.output_text.delta":
+                for command in parser.feed(event.delta):
+                    yield command
 
-        
-    
-    
+    intent_compiler.observe_model_time(time.perf_counter() - started)
+    if use_cache and parser.done and parser.commands:
+        plan_cache.put(query, prompt.hash, parser.plan())
@@ -0,0 +1,190 @@
+import re
+import time
+
+from ..models.Command import Command
+from ..models.CommandResponse import AICommand
+from ..models.CommandTypeEnum import CommandType
+from ..models.LatencyHistogram import LatencyHistogram
+from ..models.LCDCommand import LCDCommand
+from ..models.MotorCommand import MotorCommand
+
+
+_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+            "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+_DURATION = r"(?:\s+for)?(?:\s+(?P<amount>\d+|" + "|".join(_NUMBERS) + r")\s*(?:s|secs?|seconds?))?"
+_SPEED = r"(?:\s+(?:at\s+)?(?P<{group}>slow(?:ly)?|half|normal|fast|full)(?:\s+speed)?)?"
+# Speed before or after the duration: "back up slowly for 2 seconds", "forward 2 seconds fast"
+_MODIFIERS = _SPEED.format(group="speed_first") + _DURATION + _SPEED.format(group="speed")
+_POLITE = re.compile(r"^(?:please\s+|can\s+you\s+|could\s+you\s+)")
+_SUFFIX = re.compile(r"\s+please$")
+_SCREEN = r"\s+on\s+(?:the\s+)?(?:screen|lcd|display)"
+# Unquoted text is only taken literally with an explicit screen target, and not when it reads like a
+# request to generate something ("show me how you dance", "write a poem on the screen")
+_LITERAL = r"(?!(?:me|you|your|my|a|an|some|the|what|how)\b)(?P<plain>.+?)"
+
+# Clauses are compiled one by one: "forward 2 seconds then turn left"
+_CLAUSE_SEPARATOR = re.compile(r"\s*(?:,?\s*and\s+then|,?\s*then|;|,)\s+")
+
+
+class IntentCompiler:
+    """
+    Local fast path for simple queries: a small grammar of motor, LCD and stop phrasings compiled
+    straight to an ``AICommand``, without a model round trip. Anything the grammar doesn't fully
+    cover returns None and goes to the model, so the rules only need to be right, not complete.
+
+    Examples: "forward 2 seconds", "back up slowly", "back up slowly for 2 seconds", "reverse fast 3s",
+    "turn left", "spin right for 3 seconds",
+    "show hello world on the screen", 'display "Hi there"', "stop", "forward then turn right and then stop".
+    LCD text must be quoted or have an explicit screen target, anything else goes to the model.
+
+    ``stats()`` reports the hit rate and the latency saved, estimated from the model round trips
+    recorded with ``observe_model_time``.
+    """
+
+    SPEEDS = {"slow": 120, "slowly": 120, "half": 128, "normal": 200, None: 200, "fast": 255, "full": 255}
+    TURN_SPEED = 180
+    MOVE_DURATION = 2  # Seconds when the query gives none
+    TURN_DURATION = 1
+    LCD_DURATION = 3
+    LCD_WIDTH = 16
+
+    def __init__(self):
+        self.rules = [
+            (re.compile(r"(?:stop|halt|freeze|brake|stand\s+still)(?:\s+(?:now|moving|the\s+robot))?"), self._stop),
+            (re.compile(r"(?:go|drive|move|roll)?\s*(?P<direction>forwards?|ahead|straight)" + _MODIFIERS),
+             self._move),
+            (re.compile(r"(?:go|drive|move|roll)?\s*(?P<direction>back(?:wards?)?|back\s+up|reverse)" + _MODIFIERS),
+             self._move),
+            (re.compile(r"(?:turn|spin|rotate)\s+(?:to\s+the\s+)?(?P<direction>left|right)" + _MODIFIERS),
+             self._turn),
+            (re.compile(r"(?:show|display|write|print|put)\s+(?P<quote>[\"'])(?P<text>.+?)(?P=quote)(?:" + _SCREEN + ")?"),
+             self._lcd),
+            (re.compile(r"(?:show|display|put)\s+" + _LITERAL + _SCREEN), self._lcd),
+        ]
+        self.max_duration = 10  # Longer moves go to the model, which knows the room
+        self.compile_time = LatencyHistogram()  # Time spent in compile(), hits and misses
+        self.model_time = LatencyHistogram()  # Model round trips for queries that missed
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.compile_time.reset()
+        self.model_time.reset()
+
+    def compile(self, query: str) -> AICommand:
+        """Return the plan for ``query``, or None if any part of it is outside the grammar."""
+        started = time.perf_counter()
+        text = query.strip().lower().rstrip(".!")
+        text = re.sub(r"\s+", " ", text)
+        commands = []
+        for clause in _CLAUSE_SEPARATOR.split(text) if text else ():
+            command = self._compile_clause(_POLITE.sub("", clause).strip(), query)
+            if command is None:
+                commands = None
+                break
+            commands.append(command)
+
+        self.compile_time.observe(time.perf_counter() - started)
+        if not commands:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return AICommand(commands=commands)
+
+    def _compile_clause(self, clause: str, query: str):
+        clause = _SUFFIX.sub("", clause)
+        for pattern, build in self.rules:
+            match = pattern.fullmatch(clause)
+            if match:
+                return build(match, query)
+        return None
+
+    def _duration(self, match, default: int):
+        amount = match.group("amount")
+        if amount is None:
+            return default
+        seconds = int(amount) if amount.isdigit() else _NUMBERS[amount]
+        return seconds if 0 < seconds <= self.max_duration else None
+
+    def _speed(self, match, default: int):
+        """Speed given before or after the duration, or None when both are given."""
+        first, last = match.group("speed_first"), match.group("speed")
+        if first and last:
+            return None
+        word = first or last
+        return self.SPEEDS[word] if word else default
+
+    def _stop(self, match, query):
+        return Command(ID="", command_type=CommandType.STOP, command=None, duration=0, pause_duration=0)
+
+    def _move(self, match, query):
+        duration = self._duration(match, self.MOVE_DURATION)
+        if duration is None:
+            return None
+        speed = self._speed(match, self.SPEEDS[None])
+        if speed is None:
+            return None
+        if match.group("direction").startswith(("back", "reverse")):
+            speed = -speed
+        return self._motor(speed, speed, duration)
+
+    def _turn(self, match, query):
+        duration = self._duration(match, self.TURN_DURATION)
+        if duration is None:
+            return None
+        speed = self._speed(match, self.TURN_SPEED)
+        if speed is None:
+            return None
+        # Spin in place, like the prompt's "spin left: left negative, right positive"
+        if match.group("direction") == "left":
+            return self._motor(-speed, speed, duration)
+        return self._motor(speed, -speed, duration)
+
+    def _lcd(self, match, query):
+        # Take the text from the original query to keep its case
+        group = "text" if "text" in match.re.groupindex else "plain"
+        start, end = match.span(group)
+        offset = query.lower().find(match.group(group))
+        text = query[offset:offset + end - start] if offset >= 0 else match.group(group)
+        lines = self._wrap(text)
+        if lines is None:
+            return None
+        return Command(ID="", command_type=CommandType.LCD, command=LCDCommand(line_1=lines[0], line_2=lines[1]),
+                       duration=self.LCD_DURATION, pause_duration=0)
+
+    def _wrap(self, text: str):
+        """Split text over the two LCD lines at a word boundary, or None if it doesn't fit."""
+        width = self.LCD_WIDTH
+        if len(text) <= width:
+            return text, ""
+        split = text.rfind(" ", 0, width + 1)
+        if split <= 0 or len(text) - split - 1 > width:
+            return None
+        return text[:split], text[split + 1:]
+
+    @staticmethod
+    def _motor(left: int, right: int, duration: int) -> Command:
+        return Command(ID="", command_type=CommandType.MOTOR, command=MotorCommand(left_motor=left, right_motor=right),
+                       duration=duration, pause_duration=0)
+
+    def observe_model_time(self, seconds: float):
+        """Record a model round trip made because compile() missed."""
+        self.model_time.observe(seconds)
+
+    def latency_saved(self) -> float:
+        """Estimated seconds saved: every hit would have cost an average model round trip."""
+        if not self.model_time.count:
+            return 0.0
+        return self.hits * self.model_time.mean - self.compile_time.sum
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency_saved": self.latency_saved(),
+            "compile_time": self.compile_time.snapshot(),
+            "model_time": self.model_time.snapshot(),
+        }
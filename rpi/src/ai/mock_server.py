@@ -0,0 +1,142 @@
+"""
+Local stand-in for the OpenAI Responses API that streams canned plans, for testing streamed plan
+execution without network access or API costs.
+
+Point the client at it with ``OPENAI_BASE_URL=http://127.0.0.1:8081/v1`` (any ``OPENAI_API_KEY``).
+``POST /v1/responses`` answers every query with the canned plan whose key appears in the query
+(or the default plan), split into ``chunk_size`` character deltas sent ``chunk_delay`` seconds apart,
+after ``first_token_delay`` seconds, roughly like a real model. Queries containing ``hang_keyword``
+never get an answer, to exercise client deadlines.
+
+Usage (from the rpi directory):
+    python -m src.ai.mock_server [--port 8081] [--chunk-delay 0.05]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
+
+
+def _motor(left: int, right: int, duration: int, pause: int = 0) -> dict:
+    return {"ID": "", "command_type": "MOTOR", "command": {"left_motor": left, "right_motor": right},
+            "duration": duration, "pause_duration": pause}
+
+
+CANNED_PLANS = {
+    "circle": {"commands": [
+        {"ID": "", "command_type": "LCD", "command": {"line_1": "Spinning", "line_2": "in a circle"},
+         "duration": 0, "pause_duration": 0},
+        _motor(180, -180, 4),
+        {"ID": "", "command_type": "STOP", "command": None, "duration": 0, "pause_duration": 0},
+    ]},
+    "square": {"commands": [command for _ in range(4) for command in (_motor(150, 150, 2, 1), _motor(-150, 150, 1, 1))]},
+    "default": {"commands": [_motor(150, 150, 2, 1), _motor(-150, -150, 2)]},
+}
+
+
+def create_app(plans: dict = None, first_token_delay: float = 0.3, chunk_size: int = 8,
+               chunk_delay: float = 0.02, hang_keyword: str = "hang") -> FastAPI:
+    """
+    Build the mock API.
+
+    :param plans: Query keyword -> plan dict; "default" answers everything else
+    :param first_token_delay: Seconds before the first delta
+    :param chunk_size: Characters per output_text delta
+    :param chunk_delay: Seconds between deltas
+    :param hang_keyword: Queries containing it are never answered, None to disable
+    """
+    plans = plans or CANNED_PLANS
+    app = FastAPI()
+    counter = iter(range(1, 1 << 62))
+
+    def user_query(body: dict) -> str:
+        messages = body.get("input") or []
+        query = messages[-1].get("content", "") if isinstance(messages, list) and messages else str(messages)
+        return query.lower() if isinstance(query, str) else ""
+
+    def choose_plan(query: str) -> str:
+        for keyword, plan in plans.items():
+            if keyword != "default" and keyword in query:
+                return json.dumps(plan)
+        return json.dumps(plans["default"])
+
+    def response_object(response_id: str, model: str, status: str, text: str = None) -> dict:
+        output = []
+        if text is not None:
+            output.append({
+                "id": f"msg_{response_id}", "type": "message", "role": "assistant", "status": "completed",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            })
+        return {
+            "id": response_id, "object": "response", "created_at": int(time.time()), "status": status,
+            "model": model, "output": output, "parallel_tool_calls": True, "tool_choice": "auto", "tools": [],
+        }
+
+    async def events(response_id: str, model: str, text: str):
+        sequence = iter(range(1 << 62))
+        item_id = f"msg_{response_id}"
+
+        def event(payload: dict) -> str:
+            payload["sequence_number"] = next(sequence)
+            return f"event: {payload['type']}\ndata: {json.dumps(payload)}\n\n"
+
+        yield event({"type": "response.created", "response": response_object(response_id, model, "in_progress")})
+        yield event({"type": "response.output_item.added", "output_index": 0, "item": {
+            "id": item_id, "type": "message", "role": "assistant", "status": "in_progress", "content": []}})
+        yield event({"type": "response.content_part.added", "item_id": item_id, "output_index": 0,
+                     "content_index": 0, "part": {"type": "output_text", "text": "", "annotations": []}})
+        await asyncio.sleep(first_token_delay)
+        for start in range(0, len(text), chunk_size):
+            yield event({"type": "response.output_text.delta", "item_id": item_id, "output_index": 0,
+                         "content_index": 0, "delta": text[start:start + chunk_size], "logprobs": []})
+            await asyncio.sleep(chunk_delay)
+        yield event({"type": "response.output_text.done", "item_id": item_id, "output_index": 0,
+                     "content_index": 0, "text": text, "logprobs": []})
+        yield event({"type": "response.content_part.done", "item_id": item_id, "output_index": 0,
+                     "content_index": 0, "part": {"type": "output_text", "text": text, "annotations": []}})
+        completed = response_object(response_id, model, "completed", text)
+        yield event({"type": "response.output_item.done", "output_index": 0, "item": completed["output"][0]})
+        yield event({"type": "response.completed", "response": completed})
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        try:
+            body = await request.json()
+        except ClientDisconnect:  # Cancelled by a deadline or a superseding query before the body arrived
+            return JSONResponse({"error": {"message": "Client disconnected"}}, status_code=499)
+        response_id = f"resp_mock_{next(counter)}"
+        model = body.get("model", "mock")
+        query = user_query(body)
+        if hang_keyword and hang_keyword in query:
+            while not await request.is_disconnected():  # Until the client gives up
+                await asyncio.sleep(0.1)
+            return JSONResponse({"error": {"message": "Client disconnected"}}, status_code=499)
+        text = choose_plan(query)
+        if body.get("stream"):
+            return StreamingResponse(events(response_id, model, text), media_type="text/event-stream")
+        await asyncio.sleep(first_token_delay + chunk_delay * (len(text) // chunk_size))
+        return JSONResponse(response_object(response_id, model, "completed", text))
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    parser.add_argument("--chunk-delay", type=float, default=0.02)
+    args = parser.parse_args()
+    app = create_app(first_token_delay=args.first_token_delay, chunk_size=args.chunk_size, chunk_delay=args.chunk_delay)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from ..models.CommandResponse import AICommand
+
+
+class PlanCache:
+    """
+    LRU cache of AI command plans, so a query the operators have typed before starts the robot
+    without a round trip to the model.
+
+    Plans are keyed by the normalized query and a hash of the system prompt, so editing PROMPT.txt
+    never serves a plan made with the old prompt. Entries expire after ``ttl`` seconds of wall
+    time (the file outlives restarts) and the least recently used entry is evicted beyond
+    ``max_entries``. Plans are stored as JSON and validated into a fresh ``AICommand`` on every hit,
+    because running a sequence assigns IDs to its commands.
+
+    Changes made on an event loop are saved ``save_delay`` seconds later from a worker thread, one
+    write for a burst of new plans, so the SD card never stalls the loop the safety reflexes run on.
+    ``flush`` writes what is left on shutdown. Without a running loop every change is saved right away.
+
+    :param path: JSON file the cache is loaded from and saved to, or None to keep it in memory
+    :param max_entries: Plans kept before the least recently used one is evicted
+    :param ttl: Seconds a plan stays valid, None for no expiry
+    :param save_delay: Seconds between a change and the background save
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 256, ttl: float = 7 * 24 * 3600, save_delay: float = 1.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.save_delay = save_delay
+        self._entries = OrderedDict()  # key -> (created, plan as JSON-able dict), oldest use first
+        self._version = 0  # Incremented on every change
+        self._saved_version = 0  # Version of the last write, guarded by _save_lock
+        self._save_lock = threading.Lock()  # One write at a time, background or not
+        self._save_task = None
+        self._logger = logging.getLogger("PlanCache")
+        self.reset_stats()
+        if path:
+            self.load()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0  # Misses because the entry was too old
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Lowercase, collapse whitespace and drop surrounding punctuation: "Spin in a circle!" == "spin in a  circle"."""
+        return re.sub(r"\s+", " ", query.lower()).strip(" .,!?;:'\"")
+
+    def _key(self, query: str, prompt_hash: str) -> str:
+        return f"{prompt_hash}:{self.normalize(query)}"
+
+    def get(self, query: str, prompt_hash: str) -> AICommand:
+        """Return the cached plan for ``query``, or None."""
+        key = self._key(query, prompt_hash)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if self.ttl is not None and time.time() - entry[0] > self.ttl:
+            del self._entries[key]
+            self.misses += 1
+            self.expired += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return AICommand.model_validate(entry[1])
+
+    def put(self, query: str, prompt_hash: str, plan: AICommand):
+        key = self._key(query, prompt_hash)
+        self._entries[key] = (time.time(), plan.model_dump(mode="json"))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._changed()
+
+    def clear(self):
+        self._entries.clear()
+        self._changed()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self):
+        """Load the entries saved by ``save``; a missing or unreadable file leaves the cache empty."""
+        try:
+            with open(self.path, "r") as cache_file:
+                entries = json.load(cache_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self._logger.warning(f"Ignoring unreadable plan cache {self.path}: {e}")
+            return
+
+        now = time.time()
+        for key, created, plan in entries[-self.max_entries:]:
+            if self.ttl is None or now - created <= self.ttl:
+                self._entries[key] = (created, plan)
+
+    def _changed(self):
+        if not self.path:
+            return
+        self._version += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()  # Scripts without an event loop
+            return
+        if self._save_task is None:
+            self._save_task = loop.create_task(self._save_later())
+
+    async def _save_later(self):
+        try:
+            while self._saved_version < self._version:
+                await asyncio.sleep(self.save_delay)  # Further changes meanwhile go into the same write
+                await asyncio.to_thread(self._write, self._version, self._snapshot())
+        finally:
+            if self._save_task is asyncio.current_task():  # flush may have replaced it already
+                self._save_task = None
+
+    async def flush(self):
+        """Write changes not saved yet and wait for the write, e.g. on shutdown."""
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+        if self.path and self._saved_version < self._version:
+            await asyncio.to_thread(self._write, self._version, self._snapshot())
+
+    def save(self):
+        """Write the cache now, blocking on the disk."""
+        self._write(self._version, self._snapshot())
+
+    def _snapshot(self) -> list:
+        # Least recently used first, so ``load`` keeps the order. The plan dicts are never modified
+        # after ``put``, so a worker thread can serialize them while the loop goes on.
+        return [[key, created, plan] for key, (created, plan) in self._entries.items()]
+
+    def _write(self, version: int, entries: list):
+        """Write ``entries`` atomically, unless a newer version was written meanwhile (runs in any thread)."""
+        with self._save_lock:
+            if version < self._saved_version:
+                return
+            self._saved_version = version  # Also after a failed write: retried with the next change
+            temporary = f"{self.path}.tmp"
+            try:
+                with open(temporary, "w") as cache_file:
+                    json.dump(entries, cache_file)
+                os.replace(temporary, self.path)
+            except OSError as e:
+                self._logger.error(f"Could not save plan cache {self.path}: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
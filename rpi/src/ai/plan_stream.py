@@ -0,0 +1,66 @@
+import json
+
+from ..models.Command import Command
+from ..models.CommandResponse import AICommand
+
+
+class PlanStreamParser:
+    """
+    Incremental scanner for a streamed ``AICommand`` JSON document.
+
+    ``feed`` takes text deltas as the model produces them and returns the ``Command``s whose JSON
+    object was completed by that delta, validated, so the first command can run while the rest of
+    the plan is still being generated. Only brackets outside strings are tracked; each element of the
+    top-level ``commands`` array is parsed once, when its closing brace arrives.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.commands = []  # Every command parsed so far, in order
+        self._position = 0  # Next character to scan
+        self._stack = []  # Open containers, "{" or "["
+        self._in_string = False
+        self._escaped = False
+        self._command_start = None  # Index of the "{" of the command being streamed
+        self.done = False  # The top-level object was closed
+
+    def feed(self, delta: str) -> list:
+        """Scan more text. Returns the commands completed by it; raises ValueError for an invalid command."""
+        self.text += delta
+        text = self.text
+        stack = self._stack
+        completed = []
+
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if char == "{" and stack == ["{", "["]:
+                    self._command_start = index  # An element of {"commands": [...]}
+                stack.append(char)
+            elif char in "}]":
+                if not stack:
+                    raise ValueError(f"Unbalanced {char!r} at {index}")
+                stack.pop()
+                if not stack:
+                    self.done = True
+                if char == "}" and stack == ["{", "["] and self._command_start is not None:
+                    command = Command.model_validate(json.loads(text[self._command_start:index + 1]))
+                    self._command_start = None
+                    self.commands.append(command)
+                    completed.append(command)
+
+        self._position = len(text)
+        return completed
+
+    def plan(self) -> AICommand:
+        """The complete plan, validated from the whole document once the stream ended."""
+        return AICommand.model_validate_json(self.text)
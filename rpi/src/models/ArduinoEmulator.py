@@ -0,0 +1,369 @@
+import logging
+import math
+import os
+import random
+import select
+import threading
+import time
+from collections import deque
+
+from .PacketCodec import PacketCodec
+
+
+class EmulatorScenario:
+    """
+    Simple 1D world for the emulator. The robot starts at x = 0 facing +x.
+
+    :param wall_distance: Distance in cm to a wall straight ahead, or None for open space
+    :param cliff_distance: Distance in cm to a drop-off ahead, or None for an endless floor
+    :param cliff_behind: Distance in cm to a drop-off behind the start position, or None
+    """
+
+    def __init__(self, wall_distance: float = None, cliff_distance: float = None, cliff_behind: float = None):
+        self.wall_distance = wall_distance
+        self.cliff_distance = cliff_distance
+        self.cliff_behind = cliff_behind
+
+    @classmethod
+    def named(cls, name: str) -> "EmulatorScenario":
+        """Build one of the predefined scenarios: open, wall, cliff."""
+        if name == "open":
+            return cls()
+        if name == "wall":
+            return cls(wall_distance=60)
+        if name == "cliff":
+            return cls(cliff_distance=40)
+        raise ValueError(f"Unknown scenario: {name}")
+
+
+class ArduinoEmulator:
+    """
+    Pseudo-terminal stand-in for the tank's Arduino, implementing the protocol in docs/SerialPackets.md.
+
+    Point ``SerialManager`` at ``emulator.port`` and it behaves like the real board: sensor requests
+    (0x03 / 0x05) are answered with sensor packets, motor (0x01) and stop (0x04) packets drive a simulated
+    differential drivetrain, and LCD frames (0x02) are stored. Like the firmware, every valid command is
+    followed by a sensor packet.
+
+    :param response_delay: Seconds between receiving a command and sending its sensor packet
+    :param push_rate: Unsolicited sensor packets per second (0 to only answer requests)
+    :param noise: Standard deviation of the ultrasonic reading in cm; IMU counts get 100x that
+    :param corrupt_rate: Probability that an outgoing packet is corrupted or preceded by garbage bytes
+    :param scenario: EmulatorScenario describing walls and cliffs
+    :param seed: Random seed for reproducible noise and corruption
+    """
+
+    MAX_SPEED = 50.0  # cm/s at full PWM
+    WHEELBASE = 15.0  # cm between the tracks
+    IR_FRONT_OFFSET = 8.0  # cm from the robot's center to the front IR sensor
+    IR_BACK_OFFSET = 8.0
+    TICK = 0.005  # Simulation step in seconds
+
+    def __init__(self, response_delay: float = 0.002, push_rate: float = 0.0, noise: float = 0.0,
+                 corrupt_rate: float = 0.0, scenario: EmulatorScenario = None, seed: int = None):
+        self.response_delay = response_delay
+        self.push_rate = push_rate
+        self.noise = noise
+        self.corrupt_rate = corrupt_rate
+        self.scenario = scenario or EmulatorScenario()
+        self.port = None  # Path of the pty device to open with SerialManager
+        self.running = False
+        self._random = random.Random(seed)
+        self._master = None
+        self._slave = None
+        self._thread = None
+        self._logger = logging.getLogger("ArduinoEmulator")
+
+        # Simulated drivetrain
+        self.x = 0.0  # cm along the track
+        self.heading = 0.0  # radians, 0 = facing the wall/cliff
+        self.left_motor = 0
+        self.right_motor = 0
+        self.motors_enabled = True
+        self._velocity = 0.0
+
+        self.protocol_v2 = False  # Switched on by the first 0x05 request, like the firmware
+        self.lcd_line_1 = ""
+        self.lcd_line_2 = ""
+        self._pending_replies = deque()  # (due time, sequence number)
+        self._input = bytearray()
+
+        self.commands_received = {code: 0 for code in PacketCodec.COMMAND_LENGTHS}
+        self.checksum_errors = 0
+        self.packets_sent = 0
+        self.corruptions_injected = 0
+
+    def start(self) -> str:
+        """Open the pseudo-terminal and start the emulator thread. Returns the device path."""
+        import tty  # POSIX only, imported here so the module loads on Windows too
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)  # No line discipline processing, the link is binary
+        self.port = os.ttyname(self._slave)
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="ArduinoEmulator", daemon=True)
+        self._thread.start()
+        self._logger.info(f"Arduino emulator listening on {self.port}")
+        return self.port
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=1)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    def _reset_timers(self):
+        self._last_tick = self._now()
+        self._next_push = self._last_tick + (1 / self.push_rate if self.push_rate > 0 else math.inf)
+
+    def _next_deadline(self, now: float) -> float:
+        deadline = min(self._next_push, now + self.TICK)
+        if self._pending_replies:
+            deadline = min(deadline, self._pending_replies[0][0])
+        return deadline
+
+    def _update(self, now: float):
+        """Advance the simulation to ``now`` and send the sensor packets that are due."""
+        self._step(now - self._last_tick)
+        self._last_tick = now
+
+        while self._pending_replies and self._pending_replies[0][0] <= now:
+            _, sequence = self._pending_replies.popleft()
+            self._send_sensor_packet(sequence)
+
+        if now >= self._next_push:
+            self._send_sensor_packet(0)
+            self._next_push = now + 1 / self.push_rate
+
+    def _run(self):
+        self._reset_timers()
+        while self.running:
+            now = self._now()
+            readable, _, _ = select.select([self._master], [], [], max(0.0, self._next_deadline(now) - now))
+            if readable:
+                try:
+                    data = os.read(self._master, 1024)
+                except OSError:
+                    break  # Slave side closed
+                self._input.extend(data)
+                self._handle_input()
+
+            self._update(self._now())
+
+    def _handle_input(self):
+        buffer = self._input
+        while buffer:
+            length = PacketCodec.COMMAND_LENGTHS.get(buffer[0])
+            if length is None:
+                del buffer[0]  # Unknown command byte, the firmware would report "Invalid Cmd"
+                continue
+            if len(buffer) < length:
+                return
+
+            packet = bytes(buffer[:length])
+            del buffer[:length]
+            if PacketCodec.checksum(packet[:-1]) != packet[-1]:
+                self.checksum_errors += 1
+                continue
+            self._handle_command(packet)
+
+    def _handle_command(self, packet: bytes):
+        command = packet[0]
+        self.commands_received[command] += 1
+        sequence = 0
+
+        if command == PacketCodec.MOTOR:
+            _, self.left_motor, self.right_motor, _ = PacketCodec.MOTOR_STRUCT.unpack(packet)
+            self.motors_enabled = True
+        elif command == PacketCodec.LCD:
+            _, line_1, line_2, _ = PacketCodec.LCD_STRUCT.unpack(packet)
+            self.lcd_line_1 = line_1.decode("utf-8", "replace").rstrip()
+            self.lcd_line_2 = line_2.decode("utf-8", "replace").rstrip()
+        elif command == PacketCodec.STOP:
+            self.motors_enabled = False
+            self.left_motor = self.right_motor = 0
+        elif command == PacketCodec.SEQUENCED_SENSOR_REQUEST:
+            self.protocol_v2 = True
+            sequence = packet[1]
+
+        self._pending_replies.append((self._now() + self.response_delay, sequence))
+
+    def _step(self, dt: float):
+        """Advance the drivetrain simulation by dt seconds."""
+        if not self.motors_enabled:
+            self._velocity = 0.0
+            return
+
+        left = self.left_motor / 255 * self.MAX_SPEED
+        right = self.right_motor / 255 * self.MAX_SPEED
+        self._velocity = (left + right) / 2
+        self.heading += (right - left) / self.WHEELBASE * dt
+        self.x += self._velocity * math.cos(self.heading) * dt
+
+        wall = self.scenario.wall_distance
+        if wall is not None and self.x > wall - self.IR_FRONT_OFFSET:
+            self.x = wall - self.IR_FRONT_OFFSET  # Pushing against the wall
+
+    def sensor_values(self) -> tuple:
+        """Return the current (distance, ax, ay, az, gx, gy, gz, temperature, ir_flags, battery) readings."""
+        scenario = self.scenario
+        noise = self.noise
+        gauss = self._random.gauss
+
+        distance = -1.0  # Nothing in range
+        facing = math.cos(self.heading)
+        if scenario.wall_distance is not None and facing > 0.5:
+            distance = (scenario.wall_distance - self.x) / facing
+            if noise:
+                distance += gauss(0, noise)
+            if distance < 2:
+                distance = -2.0  # Too close
+            elif distance > 400:
+                distance = -1.0
+
+        imu_noise = noise * 100
+        yaw_rate = math.degrees((self.right_motor - self.left_motor) / 255 * self.MAX_SPEED / self.WHEELBASE)
+        if not self.motors_enabled:
+            yaw_rate = 0.0
+        ax = int(gauss(0, imu_noise)) if imu_noise else 0
+        ay = int(gauss(0, imu_noise)) if imu_noise else 0
+        az = 16384 + (int(gauss(0, imu_noise)) if imu_noise else 0)
+        gz = int(yaw_rate * 131)
+
+        # Bit set = no floor under the sensor, matching how Robot interprets the flags
+        front = self.x + self.IR_FRONT_OFFSET * facing
+        back = self.x - self.IR_BACK_OFFSET * facing
+        ir_flags = (0b01 if self._off_floor(front) else 0) | (0b10 if self._off_floor(back) else 0)
+
+        clamp = lambda value: max(-32768, min(32767, value))
+        return distance, clamp(ax), clamp(ay), clamp(az), 0, 0, clamp(gz), 25.0, ir_flags, 87
+
+    def _off_floor(self, position: float) -> bool:
+        scenario = self.scenario
+        if scenario.cliff_distance is not None and position > scenario.cliff_distance:
+            return True
+        return scenario.cliff_behind is not None and position < -scenario.cliff_behind
+
+    def _send_sensor_packet(self, sequence: int):
+        values = self.sensor_values()
+        if self.protocol_v2:
+            packet = PacketCodec.encode_sensor(*values, sequence=sequence)
+        else:
+            packet = PacketCodec.encode_sensor(*values)
+
+        if self.corrupt_rate and self._random.random() < self.corrupt_rate:
+            self.corruptions_injected += 1
+            if self._random.random() < 0.5:
+                # Line noise before the packet, possibly including a false start byte
+                garbage = bytes(self._random.choice((0xAA, 0xAB, self._random.randrange(256)))
+                                for _ in range(self._random.randint(1, 8)))
+                packet = garbage + packet
+            else:
+                corrupted = bytearray(packet)
+                corrupted[self._random.randrange(1, len(packet))] ^= 0xFF
+                packet = bytes(corrupted)
+
+        try:
+            self._output(packet)
+            self.packets_sent += 1
+        except OSError as e:
+            self._logger.error(f"Emulator write failed: {e}")
+
+    def _output(self, data: bytes):
+        os.write(self._master, data)
+
+    def stats(self) -> dict:
+        return {
+            "commands_received": {hex(code): count for code, count in self.commands_received.items()},
+            "checksum_errors": self.checksum_errors,
+            "packets_sent": self.packets_sent,
+            "corruptions_injected": self.corruptions_injected,
+            "position_cm": self.x,
+            "lcd": [self.lcd_line_1, self.lcd_line_2],
+        }
+
+
+class SimulatedArduino(ArduinoEmulator):
+    """
+    ArduinoEmulator that runs on the event loop and a ``Clock`` instead of a pseudo-terminal and a
+    thread, so together with a ``VirtualClock`` whole scenarios run deterministically and much faster
+    than real time. Instead of ticking, the drivetrain is advanced (in ``TICK`` steps) whenever a
+    command arrives or a sensor packet is due.
+
+    It is passed to ``SerialManager`` as the connection with the "feed" transport: the SerialWriter
+    calls ``write`` inline and sensor packets are handed to ``on_receive`` (``SerialManager.feed``)::
+
+        clock = VirtualClock()
+        arduino = SimulatedArduino(clock, scenario=EmulatorScenario.named("wall"))
+        serial_manager = SerialManager(connection=arduino, transport="feed", clock=clock)
+        arduino.on_receive = serial_manager.feed
+
+    :param clock: Clock driving the simulation
+    """
+
+    portstr = "simulated"
+    baudrate = 115200
+
+    def __init__(self, clock, **kwargs):
+        super().__init__(**kwargs)
+        self.clock = clock
+        self.port = self.portstr
+        self.on_receive = None  # Callback(bytes) receiving every packet the board sends
+
+    def start(self) -> str:
+        """Start simulating. Must be called from the event loop."""
+        self.running = True
+        self._reset_timers()
+        if self.push_rate > 0:
+            self.clock.call_later(1 / self.push_rate, self._wake)
+        return self.port
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        self.stop()
+
+    def write(self, data: bytes) -> int:
+        if self.running:
+            self._update(self._now())  # Drive with the old motor values up to now
+        self._input.extend(data)
+        self._handle_input()
+        return len(data)
+
+    def _now(self) -> float:
+        return self.clock.monotonic()
+
+    def _handle_command(self, packet: bytes):
+        super()._handle_command(packet)
+        self.clock.call_later(self.response_delay, self._wake)
+
+    def _wake(self):
+        if not self.running:
+            return
+        pushing = self._now() >= self._next_push
+        self._update(self._now())
+        if pushing:
+            self.clock.call_later(1 / self.push_rate, self._wake)
+
+    def _step(self, dt: float):
+        while dt > self.TICK:
+            super()._step(self.TICK)
+            dt -= self.TICK
+        super()._step(dt)
+
+    def _output(self, data: bytes):
+        if self.on_receive is not None:
+            self.on_receive(data)
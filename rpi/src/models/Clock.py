@@ -0,0 +1,137 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+
+class Clock:
+    """
+    Source of time for the robot logic: timeouts, throttling, cooldowns and every ``sleep`` that
+    paces the motors. The default reads the real clocks; ``VirtualClock`` replaces it in simulations.
+
+    Latency histograms keep using ``time.perf_counter()`` directly, since they measure how long the
+    code itself takes.
+    """
+
+    def monotonic(self) -> float:
+        """Seconds on a clock that never goes backwards, for intervals and deadlines."""
+        return time.monotonic()
+
+    def time(self) -> float:
+        """Unix time in seconds, for timestamps sent to clients."""
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    def call_later(self, delay: float, callback, *args):
+        """Call ``callback(*args)`` on the event loop after ``delay`` seconds."""
+        return asyncio.get_running_loop().call_later(delay, callback, *args)
+
+
+class VirtualClock(Clock):
+    """
+    Clock whose time only moves when ``advance`` is awaited, so simulated scenarios run as fast as the
+    code allows and always interleave the same way.
+
+    ``sleep`` and ``call_later`` add timers; ``call_later`` returns a ``VirtualTimer`` that can be
+    cancelled like the loop's ``TimerHandle``. ``advance`` lets the event loop run until it settles, then
+    jumps to the next timer, runs everything due at that instant and settles again, until the target
+    time is reached. "Settled" means ``settle_steps`` passes of the event loop, enough for a packet to travel from
+    ``SerialManager.feed`` through ``Robot.process_sensor_data`` to the packets it sends.
+
+    :param start: Initial ``monotonic()`` value
+    :param wall_start: ``time()`` when ``monotonic()`` is 0
+    :param settle_steps: Event loop passes after every wake-up
+    """
+
+    def __init__(self, start: float = 0.0, wall_start: float = 1_700_000_000.0, settle_steps: int = 20):
+        self._now = start
+        self.wall_start = wall_start
+        self.settle_steps = settle_steps
+        self._timers = []  # Heap of (deadline, order, VirtualTimer), cancelled timers are dropped lazily
+        self._order = itertools.count()  # Runs timers with the same deadline in the order they were added
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def time(self) -> float:
+        return self.wall_start + self._now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        timer = self.call_later(seconds, _wake, future)
+        try:
+            await future
+        finally:
+            timer.cancel()  # No-op once it fired, drops the timer if the sleeper was cancelled
+
+    def call_later(self, delay: float, callback, *args) -> "VirtualTimer":
+        timer = VirtualTimer(callback, args)
+        heapq.heappush(self._timers, (self._now + max(0.0, delay), next(self._order), timer))
+        return timer
+
+    async def advance(self, seconds: float):
+        """Run everything that happens in the next ``seconds`` of virtual time."""
+        target = self._now + seconds
+        await self.settle()
+        timers = self._timers
+        while timers and timers[0][0] <= target:
+            if timers[0][2].done():  # Cancelled, don't stop at its deadline
+                heapq.heappop(timers)
+                continue
+            deadline = timers[0][0]
+            self._now = max(self._now, deadline)
+            while timers and timers[0][0] == deadline:
+                _, _, timer = heapq.heappop(timers)
+                timer.run()
+            await self.settle()
+        self._now = max(self._now, target)
+        await self.settle()
+
+    async def settle(self):
+        for _ in range(self.settle_steps):
+            await asyncio.sleep(0)
+
+    def pending(self) -> int:
+        """Number of timers waiting for virtual time to pass."""
+        self._timers = [entry for entry in self._timers if not entry[2].done()]
+        heapq.heapify(self._timers)
+        return len(self._timers)
+
+
+class VirtualTimer:
+    """Handle returned by ``VirtualClock.call_later``, cancellable like ``asyncio.TimerHandle``."""
+
+    __slots__ = ("_callback", "_args", "_cancelled")
+
+    def __init__(self, callback, args: tuple):
+        self._callback = callback
+        self._args = args
+        self._cancelled = False
+
+    def cancel(self):
+        if self._callback is not None:  # Cancelling a timer that already fired changes nothing
+            self._cancelled = True
+            self._callback = self._args = None  # Release what the callback holds, e.g. a finished task
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def done(self) -> bool:
+        """Fired or cancelled, the heap entry is dead."""
+        return self._callback is None
+
+    def run(self):
+        if self._callback is not None:
+            callback, args = self._callback, self._args
+            self._callback = self._args = None
+            callback(*args)
+
+
+def _wake(future):
+    if not future.done():  # The sleeper may have been cancelled
+        future.set_result(None)
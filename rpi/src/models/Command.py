@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import uuid
 from .LCDCommand import LCDCommand
 from .MotorCommand import MotorCommand
@@ -16,9 +16,13 @@ class Command(BaseModel):
     pause_duration: int = Field(description="Pause duration in seconds after executing the command (AI Command ONLY)")
     duration: int = Field(description="Duration in seconds for which the command should be executed (AI Command ONLY)")
 
-    def __init__(self, **data):
-        super().__init__(**data)
+    def assign_id(self) -> str:
+        """
+        Give the command a fresh unique ID. IDs are only needed by the UI (active_command), so they are
+        generated here instead of for every command built.
+        """
         self.ID = str(uuid.uuid4())
+        return self.ID
         
     @staticmethod
     def apply_deadzone_and_scale(value, deadzone=0.1, min_speed=60, max_speed=255):
@@ -33,18 +37,27 @@ class Command(BaseModel):
         
     
     @classmethod
-    def from_joystick(cls, left_y: float, right_x: float):
+    def joystick_to_motor(cls, left_y: float, right_x: float) -> tuple[int, int]:
         """
         Calculate the differential drive values based on the controller input.
+
+        :return: (left_motor, right_motor), each -255 to 255
         """
-        
-        
         forward = cls.apply_deadzone_and_scale(left_y)
         turn = cls.apply_deadzone_and_scale(right_x)
         
         # Calculate motor values (arcade drive)
         left_motor = min(255, max(-255, forward - turn))
         right_motor = min(255, max(-255, forward + turn))
+        return left_motor, right_motor
+
+    @classmethod
+    def from_joystick(cls, left_y: float, right_x: float):
+        """
+        Build a MOTOR command from the controller input. The joystick hot path uses
+        ``joystick_to_motor`` and ``PacketCodec.encode_motor`` directly instead.
+        """
+        left_motor, right_motor = cls.joystick_to_motor(left_y, right_x)
 
         command = cls(
             ID="",
@@ -62,16 +75,36 @@ class Command(BaseModel):
     @classmethod
     def stop(cls):
         """
-        Send a stop command to the robot.
+        Send a stop command to the robot. Returns a shared immutable instance.
         """
-        command = cls(
-            ID="",
-            command_type=CommandType.STOP,
-            command=None,  # Stop command has no specific motor values
-            pause_duration=0,
-            duration=0
-        )
-        
-        return command
+        return _STOP
+
+    @classmethod
+    def sensor_request(cls):
+        """
+        Request sensor data from the robot. Returns a shared immutable instance.
+        """
+        return _SENSOR_REQUEST
+
+
+class _FrozenCommand(Command):
+    """Immutable Command used for the shared parameterless commands."""
+    model_config = ConfigDict(frozen=True)
+
+
+_STOP = _FrozenCommand(
+    ID="",
+    command_type=CommandType.STOP,
+    command=None,  # Stop command has no specific motor values
+    pause_duration=0,
+    duration=0
+)
+_SENSOR_REQUEST = _FrozenCommand(
+    ID="",
+    command_type=CommandType.SENSOR,
+    command=None,
+    pause_duration=0,
+    duration=0
+)
     
     
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from enum import IntEnum
+
+from .LatencyHistogram import LatencyHistogram
+from .PacketCodec import PacketCodec
+
+
+class CommandPriority(IntEnum):
+    EMERGENCY = 0  # STOP from the user: preempts everything
+    SAFETY = 1  # Cliff/obstacle reflexes
+    JOYSTICK = 2  # Live driving, latest wins
+    SEQUENCE = 3  # AI command sequences and macros, cancellable
+
+    def __str__(self):
+        return self.name.lower()
+
+
+class CommandScheduler:
+    """
+    Decides who may drive the motors, by priority class, without holding a lock across sleeps.
+
+    - EMERGENCY (``emergency_stop``) cancels every running and queued action and writes STOP
+      immediately, so its latency is one serial write.
+    - SAFETY actions (``schedule``) cancel sequences and any older safety action: the newest reflex
+      reacts to the newest sensor data.
+    - JOYSTICK packets (``joystick``) are written straight away (the SerialWriter keeps only the latest
+      unsent one) and cancel a running sequence. They are dropped while a safety action runs, and a
+      centered stick does not interrupt a sequence.
+    - SEQUENCE actions run one at a time in submission order, and wait while safety actions run.
+
+    Actions are coroutines ``action(send, *args)`` that write packets with ``send(packet)``. A cancelled
+    action simply stops at its next ``await``; the action that preempted it sends its own packets.
+
+    :param send_packet: Callable queueing a packet for the serial port (e.g. SerialManager.send_packet)
+    """
+
+    def __init__(self, send_packet):
+        self._send = send_packet
+        self._tasks = {priority: set() for priority in CommandPriority}  # Queued and running actions
+        self._sequence_lock = asyncio.Lock()
+        self._safety_idle = asyncio.Event()
+        self._safety_idle.set()
+        self._logger = logging.getLogger("CommandScheduler")
+        self.queue_delay = {priority: LatencyHistogram() for priority in CommandPriority}  # Submit to first write
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.submitted = dict.fromkeys(CommandPriority, 0)
+        self.preempted = dict.fromkeys(CommandPriority, 0)  # Actions cancelled by a higher (or newer safety) action
+        self.dropped = dict.fromkeys(CommandPriority, 0)  # Joystick packets ignored during safety actions
+        for histogram in self.queue_delay.values():
+            histogram.reset()
+
+    def emergency_stop(self):
+        """Cancel every action and write STOP now."""
+        submitted = time.perf_counter()
+        self.submitted[CommandPriority.EMERGENCY] += 1
+        self._cancel(CommandPriority.SAFETY)
+        self._cancel(CommandPriority.SEQUENCE)
+        self._send(PacketCodec.STOP_PACKET)
+        self.queue_delay[CommandPriority.EMERGENCY].observe(time.perf_counter() - submitted)
+
+    def joystick(self, left_motor: int, right_motor: int) -> bool:
+        """Write a joystick motor packet. Returns False if it was dropped."""
+        submitted = time.perf_counter()
+        self.submitted[CommandPriority.JOYSTICK] += 1
+        if self._tasks[CommandPriority.SAFETY]:
+            self.dropped[CommandPriority.JOYSTICK] += 1
+            return False
+        if self._tasks[CommandPriority.SEQUENCE]:
+            if not left_motor and not right_motor:
+                self.dropped[CommandPriority.JOYSTICK] += 1  # Centered stick, let the sequence continue
+                return False
+            self._cancel(CommandPriority.SEQUENCE)
+        self._send(PacketCodec.encode_motor(left_motor, right_motor))
+        self.queue_delay[CommandPriority.JOYSTICK].observe(time.perf_counter() - submitted)
+        return True
+
+    def schedule(self, priority: CommandPriority, action, *args, first_packet: bytes = None) -> asyncio.Task:
+        """
+        Run a SAFETY or SEQUENCE action.
+
+        :param action: Coroutine function called as ``action(send, *args)``
+        :param first_packet: SAFETY only: packet written synchronously, before this returns, so a
+                             reflex doesn't wait for its task to be scheduled
+        :return: The task running the action; it is cancelled if the action is preempted
+        """
+        if priority not in (CommandPriority.SAFETY, CommandPriority.SEQUENCE):
+            raise ValueError(f"Only SAFETY and SEQUENCE actions can be scheduled, got {priority.name}")
+
+        submitted = time.perf_counter()
+        self.submitted[priority] += 1
+        if priority == CommandPriority.SAFETY:
+            self._cancel(CommandPriority.SAFETY)
+            self._cancel(CommandPriority.SEQUENCE)
+            self._safety_idle.clear()
+            if first_packet is not None:
+                self._send(first_packet)
+                self.queue_delay[priority].observe(time.perf_counter() - submitted)
+                submitted = None  # Already observed
+        elif first_packet is not None:
+            raise ValueError("first_packet is only supported for SAFETY actions")
+
+        task = asyncio.create_task(self._run(priority, submitted, action, args))
+        tasks = self._tasks[priority]
+        tasks.add(task)
+        task.add_done_callback(lambda done: self._finished(priority, done))
+        return task
+
+    async def run(self, priority: CommandPriority, action, *args) -> bool:
+        """Schedule an action and wait for it. Returns False if it was preempted."""
+        task = self.schedule(priority, action, *args)
+        try:
+            await asyncio.wait([task])
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        if task.cancelled():
+            return False
+        task.result()  # Re-raise errors from the action
+        return True
+
+    async def _run(self, priority, submitted, action, args):
+        first_write = submitted is not None
+
+        def send(packet: bytes):
+            nonlocal first_write
+            if first_write:
+                first_write = False
+                self.queue_delay[priority].observe(time.perf_counter() - submitted)
+            self._send(packet)
+
+        if priority == CommandPriority.SAFETY:
+            await action(send, *args)
+            return
+
+        async with self._sequence_lock:
+            await self._safety_idle.wait()
+            await action(send, *args)
+
+    def _cancel(self, priority):
+        for task in self._tasks[priority]:
+            if not task.done():
+                task.cancel()
+                self.preempted[priority] += 1
+
+    def _finished(self, priority, task):
+        tasks = self._tasks[priority]
+        tasks.discard(task)
+        if priority == CommandPriority.SAFETY and not tasks:
+            self._safety_idle.set()
+        if not task.cancelled() and task.exception() is not None:
+            self._logger.error(f"{priority.name} action failed: {task.exception()}")
+
+    def active(self, priority: CommandPriority) -> bool:
+        return bool(self._tasks[priority])
+
+    def stats(self) -> dict:
+        return {
+            str(priority): {
+                "submitted": self.submitted[priority],
+                "preempted": self.preempted[priority],
+                "dropped": self.dropped[priority],
+                "active": len(self._tasks[priority]),
+                "queue_delay": self.queue_delay[priority].snapshot(),
+            }
+            for priority in CommandPriority
+        }
@@ -0,0 +1,97 @@
+from .Clock import Clock
+from .Command import Command
+from .CommandTypeEnum import CommandType
+from .LatencyHistogram import LatencyHistogram
+from .PacketCodec import PacketCodec
+
+
+class CommandTimeline:
+    """
+    Command sequence compiled to packets at fixed offsets from the start of the plan, run against
+    absolute deadlines on the clock.
+
+    Each step waits for ``start + offset`` rather than for the previous step's duration, so time
+    spent writing packets, emitting or waiting for the scheduler doesn't accumulate as drift: a late
+    step is followed by a shorter wait. Commands can be added while the timeline runs (streamed
+    plans); ``rebase`` moves the remaining deadlines when the plan ran dry.
+
+    For every step the planned and actual start are compared, the difference goes to ``lateness``.
+
+    :param encode: Command -> packet, or None for commands without one (SerialManager.encode)
+    :param clock: Clock the deadlines are on
+    :param lateness: Histogram shared between timelines, created if not given
+    """
+
+    def __init__(self, encode, clock: Clock = None, lateness: LatencyHistogram = None):
+        self.encode = encode
+        self.clock = clock or Clock()
+        self.lateness = lateness if lateness is not None else LatencyHistogram()  # Actual - planned start, seconds
+        self.steps = []  # (offset, packet or None, command or None), ordered by offset
+        self.duration = 0.0  # Offset at which the next command added will start
+        self.start = None  # Clock time of offset 0, set by the first run()
+        self._next = 0  # Index of the next step to run
+
+    @classmethod
+    def compile(cls, commands, encode, clock: Clock = None, lateness: LatencyHistogram = None) -> "CommandTimeline":
+        """Timeline for a whole plan, ending with STOP."""
+        timeline = cls(encode, clock, lateness)
+        for command in commands:
+            timeline.add(command)
+        timeline.add_stop()
+        return timeline
+
+    def add(self, command: Command):
+        """Append a command: its packet at the current end, then STOP for its pause (MOTOR only)."""
+        self.steps.append((self.duration, self.encode(command), command))
+        self.duration += max(command.duration, 0)
+        if command.pause_duration and command.command_type == CommandType.MOTOR:
+            self.add_stop()
+            self.duration += command.pause_duration
+
+    def add_stop(self):
+        self.steps.append((self.duration, PacketCodec.STOP_PACKET, None))
+
+    def rebase(self):
+        """Start the steps not run yet now, e.g. after waiting for a streamed plan, instead of catching up."""
+        if self.start is not None and self._next < len(self.steps):
+            self.start = max(self.start, self.clock.monotonic() - self.steps[self._next][0])
+
+    def deadline(self, offset: float) -> float:
+        return self.start + offset
+
+    async def run(self, send, on_command=None):
+        """
+        Run the steps not run yet, then wait until the timeline's end.
+
+        :param send: Writes a packet (the scheduler's send)
+        :param on_command: Awaited after a command's packet was sent, with (command, timing dict)
+        """
+        clock = self.clock
+        if self.start is None:
+            self.start = clock.monotonic()
+        steps = self.steps
+        while self._next < len(steps):
+            await self._sleep_until(self.deadline(steps[self._next][0]))
+            actual = clock.monotonic() - self.start
+            # Write every packet that is due before awaiting any callback, so steps sharing a deadline
+            # (an LCD line with a move) go out together
+            due = max(actual, steps[self._next][0])
+            started = []
+            while self._next < len(steps) and steps[self._next][0] <= due:
+                offset, packet, command = steps[self._next]
+                self._next += 1
+                self.lateness.observe(max(actual - offset, 0.0))
+                if packet is not None:
+                    send(packet)
+                if command is not None:
+                    started.append((command, {"planned": round(offset, 4), "actual": round(actual, 4),
+                                              "jitter": round(actual - offset, 4)}))
+            if on_command is not None:
+                for command, timing in started:
+                    await on_command(command, timing)
+        await self._sleep_until(self.deadline(self.duration))
+
+    async def _sleep_until(self, deadline: float):
+        delay = deadline - self.clock.monotonic()
+        if delay > 0:
+            await self.clock.sleep(delay)
@@ -0,0 +1,192 @@
+import math
+
+import numpy as np
+
+from .Command import Command
+from .PacketCodec import PacketCodec
+
+
+class DriveMixer:
+    """
+    Joystick-to-motor mixing for whole arrays of samples, e.g. to precompile recorded macros or to
+    analyse driving logs offline.
+
+    ``mix`` is the NumPy version of ``Command.joystick_to_motor`` (deadzone, min/max speed scaling,
+    arcade mixing, clamping) and produces bit-identical results: the same float64 operations run in
+    the same order, and truncation towards zero matches ``int()``. ``joystick_from_axes`` turns raw
+    controller axes into (left_y, right_x) for every backend ``ControllerState`` mode, like
+    ``Controller.send_update`` does one sample at a time.
+
+    :param deadzone: Stick values below this magnitude map to 0
+    :param min_speed: Motor value just outside the deadzone
+    :param max_speed: Motor value at full deflection
+    """
+
+    # Values of the backend's ControllerState enum (a str Enum, so its members compare equal to these)
+    ONE_ARCADE = "one_arcade"
+    TWO_ARCADE = "two_arcade"
+    TANK = "tank"
+    CAR = "car"
+    GESTURE = "gesture"
+    MODES = (ONE_ARCADE, TWO_ARCADE, TANK, CAR, GESTURE)
+
+    PRECISION_SCALE = 0.5  # Stick scaling in precision mode
+
+    MOTOR_PACKET_DTYPE = np.dtype([("type", "u1"), ("left", "<i2"), ("right", "<i2"), ("checksum", "u1")])
+
+    def __init__(self, deadzone: float = 0.1, min_speed: int = 60, max_speed: int = 255):
+        self.deadzone = deadzone
+        self.min_speed = min_speed
+        self.max_speed = max_speed
+        self._lut = None
+        self._lut_steps = 0
+
+    # ---- Joystick to motor values ----
+
+    def scale(self, values) -> np.ndarray:
+        """Vectorized ``Command.apply_deadzone_and_scale``. Returns int64 motor values."""
+        values = np.asarray(values, dtype=np.float64)
+        magnitude = np.abs(values)
+        scaled = np.clip((magnitude - self.deadzone) / (1 - self.deadzone), 0, 1)
+        sign = np.where(values > 0, 1.0, -1.0)
+        speed = np.trunc(sign * (self.min_speed + scaled * (self.max_speed - self.min_speed)))
+        return np.where(magnitude < self.deadzone, 0, speed).astype(np.int64)
+
+    def mix(self, left_y, right_x) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Arcade-mix arrays of stick values.
+
+        :return: (left_motor, right_motor) int16 arrays clamped to -255..255
+        """
+        forward = self.scale(left_y)
+        turn = self.scale(right_x)
+        left_motor = np.clip(forward - turn, -255, 255).astype(np.int16)
+        right_motor = np.clip(forward + turn, -255, 255).astype(np.int16)
+        return left_motor, right_motor
+
+    def mix_scalar(self, left_y: float, right_x: float) -> tuple[int, int]:
+        """Scalar reference path, identical to ``Command.joystick_to_motor`` with this mixer's settings."""
+        forward = Command.apply_deadzone_and_scale(left_y, self.deadzone, self.min_speed, self.max_speed)
+        turn = Command.apply_deadzone_and_scale(right_x, self.deadzone, self.min_speed, self.max_speed)
+        return min(255, max(-255, forward - turn)), min(255, max(-255, forward + turn))
+
+    # ---- Quantized lookup table ----
+
+    def build_lut(self, steps: int = 1024):
+        """
+        Precompute the scaled motor value for ``2 * steps + 1`` evenly spaced stick positions in -1..1.
+
+        Inputs are rounded to the nearest grid point, so ``mix_lut`` is exact for inputs on the grid
+        (e.g. sticks already quantized to 1/steps) and otherwise off by at most one grid step.
+        """
+        self._lut_steps = steps
+        grid = np.arange(-steps, steps + 1) / steps
+        self._lut = self.scale(grid).tolist()  # Python ints index faster than a NumPy array
+        return self
+
+    def mix_lut(self, left_y: float, right_x: float) -> tuple[int, int]:
+        """Scalar mixing through the lookup table built by ``build_lut``."""
+        if self._lut is None:
+            self.build_lut()
+        lut, steps = self._lut, self._lut_steps
+        forward = lut[round(min(1.0, max(-1.0, left_y)) * steps) + steps]
+        turn = lut[round(min(1.0, max(-1.0, right_x)) * steps) + steps]
+        return min(255, max(-255, forward - turn)), min(255, max(-255, forward + turn))
+
+    # ---- Controller modes ----
+
+    def joystick_from_axes(self, mode: str, axes, speed=None, precision=False) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Convert raw controller axes to (left_y, right_x) the way ``Controller.send_update`` does.
+
+        :param mode: A ``ControllerState`` value
+        :param axes: (N, 6) array of pygame axes 0-5. In GESTURE mode, an (N, 2) array of the gesture
+                     controller's (left_y, right_x) instead
+        :param speed: (N,) car speed, required in CAR mode (the trigger integration is stateful)
+        :param precision: Precision mode flag, scalar or (N,) array
+        """
+        axes = np.asarray(axes, dtype=np.float64)
+        if mode == self.TWO_ARCADE:
+            left_y, right_x = -axes[:, 1], -axes[:, 2]
+        elif mode == self.ONE_ARCADE:
+            left_y, right_x = -axes[:, 1], -axes[:, 0]
+        elif mode == self.TANK:
+            left, right = -axes[:, 1], -axes[:, 3]
+            left_y, right_x = (left + right) / 2, (right - left) / 2
+        elif mode == self.CAR:
+            if speed is None:
+                raise ValueError("CAR mode needs the speed of every sample")
+            speed = np.asarray(speed, dtype=np.float64)
+            x, y = -axes[:, 0], -axes[:, 1]
+            magnitude = np.sqrt(x ** 2 + y ** 2)
+            moving = magnitude > 0.1
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x = np.where(moving, x / magnitude, 0.0)
+                y = np.where(moving, y / magnitude, 1.0)  # Straight ahead when the stick is centered
+            left_y, right_x = y * speed, x * speed
+        elif mode == self.GESTURE:
+            left_y, right_x = axes[:, 0].copy(), axes[:, 1].copy()
+        else:
+            raise ValueError(f"Unknown controller mode: {mode}")
+
+        precision = np.asarray(precision, dtype=bool)
+        if precision.any():
+            left_y = np.where(precision, left_y * self.PRECISION_SCALE, left_y)
+            right_x = np.where(precision, right_x * self.PRECISION_SCALE, right_x)
+        return left_y, right_x
+
+    @classmethod
+    def joystick_from_axes_scalar(cls, mode: str, axes, speed: float = 0.0, precision: bool = False) -> tuple[float, float]:
+        """Scalar counterpart of ``joystick_from_axes`` for one sample."""
+        if mode == cls.TWO_ARCADE:
+            left_y, right_x = -axes[1], -axes[2]
+        elif mode == cls.ONE_ARCADE:
+            left_y, right_x = -axes[1], -axes[0]
+        elif mode == cls.TANK:
+            left, right = -axes[1], -axes[3]
+            left_y, right_x = (left + right) / 2, (right - left) / 2
+        elif mode == cls.CAR:
+            x, y = -axes[0], -axes[1]
+            magnitude = math.sqrt(x ** 2 + y ** 2)
+            if magnitude > 0.1:
+                x /= magnitude
+                y /= magnitude
+            else:
+                x = 0
+                y = 1
+            left_y, right_x = y * speed, x * speed
+        elif mode == cls.GESTURE:
+            left_y, right_x = axes[0], axes[1]
+        else:
+            raise ValueError(f"Unknown controller mode: {mode}")
+
+        if precision:
+            left_y *= cls.PRECISION_SCALE
+            right_x *= cls.PRECISION_SCALE
+        return left_y, right_x
+
+    # ---- Macros ----
+
+    def compile_macro(self, commands: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Mix a recorded macro (the backend's ``joystick_history`` entries, ``{"left_y", "right_x"}`` dicts).
+
+        :return: (left_motor, right_motor) int16 arrays, one entry per recorded sample
+        """
+        samples = np.array([(c.get("left_y", 0), c.get("right_x", 0)) for c in commands], dtype=np.float64).reshape(-1, 2)
+        return self.mix(samples[:, 0], samples[:, 1])
+
+    @classmethod
+    def motor_packets(cls, left_motor, right_motor) -> np.ndarray:
+        """
+        Encode motor packets for every sample at once.
+
+        :return: (N, 6) uint8 array, row i is ``PacketCodec.encode_motor(left_motor[i], right_motor[i])``
+        """
+        packets = np.zeros(len(left_motor), dtype=cls.MOTOR_PACKET_DTYPE)
+        packets["type"] = PacketCodec.MOTOR
+        packets["left"] = left_motor
+        packets["right"] = right_motor
+        raw = packets.view(np.uint8).reshape(-1, PacketCodec.MOTOR_LENGTH)
+        raw[:, -1] = raw[:, :-1].sum(axis=1, dtype=np.uint32) & 0xFF
+        return raw
@@ -0,0 +1,67 @@
+import bisect
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram. Recording a sample is a bisect and a few additions,
+    so it is cheap enough for per-packet use. Values are in seconds.
+    """
+
+    # Bucket upper bounds from 50 us to ~10 s, each sqrt(2) apart so percentile estimates stay within ~20%
+    DEFAULT_BOUNDS = tuple(round(0.00005 * 2 ** (i / 2), 9) for i in range(36))
+
+    def __init__(self, bounds: tuple = DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.reset()
+
+    def reset(self):
+        self.buckets = [0] * (len(self.bounds) + 1)  # Last bucket counts samples above the largest bound
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate a percentile by interpolating inside the bucket that contains it.
+
+        :param fraction: Percentile as a fraction, e.g. 0.99
+        """
+        if not self.count:
+            return 0.0
+
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else self.min
+                upper = self.bounds[index] if index < len(self.bounds) else self.max
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * ((rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min or 0.0,
+            "max": self.max or 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
@@ -0,0 +1,120 @@
+import asyncio
+import functools
+import time
+
+from .LatencyHistogram import LatencyHistogram
+
+
+class Metrics:
+    """
+    Minimal metrics registry rendered in the Prometheus text exposition format.
+
+    Histograms are ``LatencyHistogram``s that their owners already update (observing is a bisect and a
+    few additions), and counters/gauges are callables read only when ``/metrics`` is scraped, so
+    leaving the instrumentation on costs almost nothing.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, prefix: str = "tank"):
+        self.prefix = prefix
+        self._metrics = {}  # name -> (type, help, [(labels, source)])
+
+    def _add(self, kind: str, name: str, help_text: str, labels: dict, source):
+        name = f"{self.prefix}_{name}"
+        entry = self._metrics.setdefault(name, (kind, help_text, []))
+        if entry[0] != kind:
+            raise ValueError(f"Metric {name} is already registered as a {entry[0]}")
+        entry[2].append((labels or {}, source))
+
+    def histogram(self, name: str, help_text: str, histogram: LatencyHistogram = None, labels: dict = None) -> LatencyHistogram:
+        """Register a histogram (created if not given) and return it."""
+        histogram = histogram if histogram is not None else LatencyHistogram()
+        self._add("histogram", name, help_text, labels, histogram)
+        return histogram
+
+    def counter(self, name: str, help_text: str, read, labels: dict = None):
+        """Register a counter whose current value is returned by ``read()``."""
+        self._add("counter", name, help_text, labels, read)
+
+    def gauge(self, name: str, help_text: str, read, labels: dict = None):
+        self._add("gauge", name, help_text, labels, read)
+
+    def timed(self, name: str, help_text: str, labels: dict = None):
+        """Decorator recording the duration of every call of a coroutine function."""
+        histogram = self.histogram(name, help_text, labels=labels)
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_text, series) in self._metrics.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, source in series:
+                if kind == "histogram":
+                    self._render_histogram(lines, name, labels, source)
+                else:
+                    try:
+                        value = float(source())
+                    except Exception:
+                        continue  # e.g. the serial port isn't started yet
+                    lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        lines.append("")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _render_histogram(lines: list, name: str, labels: dict, histogram: LatencyHistogram):
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.buckets):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, le=f'{bound:g}')} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(labels, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:g}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag with a sleeper task: how much later than requested each sleep returns.
+
+    :param histogram: Histogram receiving the lag in seconds
+    :param interval: Seconds between samples
+    """
+
+    def __init__(self, histogram: LatencyHistogram, interval: float = 0.25):
+        self.histogram = histogram
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.histogram.observe(max(0.0, loop.time() - start - self.interval))
+
+
+def _format_labels(labels: dict, **extra) -> str:
+    if not labels and not extra:
+        return ""
+    pairs = {**labels, **extra}
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs.items()) + "}"
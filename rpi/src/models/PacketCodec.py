@@ -0,0 +1,171 @@
+import struct
+from functools import lru_cache
+
+# This module only depends on the standard library, it sits on the hot path of every packet.
+
+
+class PacketCodec:
+    """
+    Encoder/decoder for every serial packet in docs/SerialPackets.md, built on precompiled ``struct.Struct``s.
+
+    All encoders return complete packets including the checksum byte.
+    """
+
+    MOTOR = 0x01
+    LCD = 0x02
+    SENSOR_REQUEST = 0x03
+    STOP = 0x04
+    SEQUENCED_SENSOR_REQUEST = 0x05
+    SENSOR_DATA = 0xAA
+    SEQUENCED_SENSOR_DATA = 0xAB
+
+    LCD_WIDTH = 16
+
+    MOTOR_STRUCT = struct.Struct("<BhhB")  # type, left, right, checksum
+    LCD_STRUCT = struct.Struct("<B16s16sB")  # type, line 1, line 2, checksum
+    SENSOR_STRUCT = struct.Struct("<BfhhhhhhfBBB")  # start, distance, ax, ay, az, gx, gy, gz, temp, ir, battery, checksum
+    SEQUENCED_SENSOR_STRUCT = struct.Struct("<BBfhhhhhhfBBB")  # Same as SENSOR_STRUCT with a sequence number
+
+    MOTOR_LENGTH = MOTOR_STRUCT.size
+    LCD_LENGTH = LCD_STRUCT.size
+    SENSOR_LENGTH = SENSOR_STRUCT.size
+    SEQUENCED_SENSOR_LENGTH = SEQUENCED_SENSOR_STRUCT.size
+
+    # Packets without parameters never change, so they are built once
+    STOP_PACKET = bytes([STOP, STOP])
+    SENSOR_REQUEST_PACKET = bytes([SENSOR_REQUEST, SENSOR_REQUEST])
+    SEQUENCED_SENSOR_REQUESTS = tuple(bytes([0x05, sequence, (0x05 + sequence) & 0xFF]) for sequence in range(256))
+
+    COMMAND_LENGTHS = {MOTOR: MOTOR_LENGTH, LCD: LCD_LENGTH, SENSOR_REQUEST: 2, STOP: 2, SEQUENCED_SENSOR_REQUEST: 3}
+
+    _lcd_buffer = bytearray(LCD_STRUCT.size)
+
+    @staticmethod
+    def checksum(data) -> int:
+        """Simple checksum used by every packet: sum of the bytes modulo 256."""
+        return sum(data) & 0xFF
+
+    @staticmethod
+    def encode_motor(left_motor: int, right_motor: int) -> bytes:
+        # Checksum from the int16 values without re-reading the packed bytes: value + (value >> 8) is
+        # congruent to low byte + high byte modulo 256, negative values included
+        return _pack_motor(0x01, left_motor, right_motor,
+                           (0x01 + left_motor + (left_motor >> 8) + right_motor + (right_motor >> 8)) & 0xFF)
+
+    @staticmethod
+    def pack_motor_into(buffer, offset: int, left_motor: int, right_motor: int) -> int:
+        """Write a motor packet into a preallocated buffer. Returns the number of bytes written."""
+        _pack_motor_into(buffer, offset, 0x01, left_motor, right_motor,
+                         (0x01 + left_motor + (left_motor >> 8) + right_motor + (right_motor >> 8)) & 0xFF)
+        return 6
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def encode_lcd(cls, line_1: str, line_2: str) -> bytes:
+        """Encode an LCD packet. Frames are cached since the same messages (e.g. "Thinking...") repeat."""
+        buffer = cls._lcd_buffer
+        cls.LCD_STRUCT.pack_into(
+            buffer, 0, cls.LCD,
+            line_1[:cls.LCD_WIDTH].ljust(cls.LCD_WIDTH).encode("utf-8"),
+            line_2[:cls.LCD_WIDTH].ljust(cls.LCD_WIDTH).encode("utf-8"),
+            0,
+        )
+        buffer[-1] = sum(buffer) & 0xFF  # Checksum byte is still 0 here
+        return bytes(buffer)
+
+    @classmethod
+    def encode_sensor_request(cls, sequence: int = None) -> bytes:
+        """
+        Encode a sensor data request.
+
+        :param sequence: Sequence number for a protocol v2 request (0x05), or None for a plain 0x03 request
+        """
+        if sequence is None:
+            return cls.SENSOR_REQUEST_PACKET
+        return cls.SEQUENCED_SENSOR_REQUESTS[sequence]
+
+    @classmethod
+    def encode(cls, packet_type, *fields) -> bytes:
+        """
+        Encode a packet from a raw tuple, e.g. ``encode(0x01, 150, -150)`` or ``encode("LCD", "Hello", "")``.
+
+        :param packet_type: Packet type byte or command type name (MOTOR, LCD, SENSOR, STOP)
+        """
+        packet_type = _PACKET_TYPES.get(packet_type, packet_type)
+        if packet_type == 0x01:
+            return cls.encode_motor(*fields)
+        if packet_type == 0x04:
+            return cls.STOP_PACKET
+        if packet_type == 0x02:
+            return cls.encode_lcd(*fields)
+        if packet_type == 0x03:
+            return cls.SENSOR_REQUEST_PACKET
+        if packet_type == 0x05:
+            return cls.SEQUENCED_SENSOR_REQUESTS[fields[0]]
+        raise ValueError(f"Unknown packet type: {packet_type}")
+
+    @classmethod
+    def encode_command(cls, command) -> bytes:
+        """Encode a ``Command`` model. Returns None for command types without a serial packet."""
+        command_type = command.command_type
+        if command_type == "MOTOR":
+            return cls.encode_motor(command.command.left_motor, command.command.right_motor)
+        if command_type == "LCD":
+            return cls.encode_lcd(command.command.line_1, command.command.line_2)
+        if command_type == "SENSOR":
+            return cls.SENSOR_REQUEST_PACKET
+        if command_type == "STOP":
+            return cls.STOP_PACKET
+        return None
+
+    @staticmethod
+    def decode_sensor(data, verify: bool = True) -> tuple:
+        """
+        Decode a 0xAA or 0xAB sensor packet into raw field values.
+
+        :param data: bytes-like packet, 24 bytes (0xAA) or 25 bytes (0xAB)
+        :param verify: Check the checksum (framers that already validated it can skip this)
+        :return: (sequence, distance, ax, ay, az, gx, gy, gz, temperature, ir_flags, battery) with the raw
+                 IMU counts; sequence is None for 0xAA packets
+        """
+        # The field structs skip the start and checksum bytes, so the result needs no slicing
+        start_byte = data[0]
+        if start_byte == 0xAA:
+            fields = _NO_SEQUENCE + _unpack_sensor_fields(data)
+            end = 23  # Index of the checksum byte
+        elif start_byte == 0xAB:
+            fields = _unpack_sequenced_sensor_fields(data)
+            end = 24
+        else:
+            raise ValueError(f"Invalid start byte: {hex(start_byte)}")
+
+        if verify:
+            # Sum of all bytes except the start byte and the checksum byte, without slicing the packet.
+            # sum() over the bytes is the fastest checksum in pure Python (int.from_bytes tricks are slower).
+            received_checksum = data[end]
+            calculated_checksum = (sum(data) - start_byte - received_checksum) & 0xFF
+            if calculated_checksum != received_checksum:
+                raise ValueError(f"Invalid checksum: calculated={calculated_checksum}, received={received_checksum}")
+
+        return fields
+
+    @classmethod
+    def encode_sensor(cls, distance: float, ax: int, ay: int, az: int, gx: int, gy: int, gz: int,
+                      temperature: float, ir_flags: int, battery: int, sequence: int = None) -> bytes:
+        """Encode a sensor data packet (what the Arduino sends), for emulators and benchmarks."""
+        if sequence is None:
+            packet = cls.SENSOR_STRUCT.pack(cls.SENSOR_DATA, distance, ax, ay, az, gx, gy, gz, temperature, ir_flags, battery, 0)
+        else:
+            packet = cls.SEQUENCED_SENSOR_STRUCT.pack(
+                cls.SEQUENCED_SENSOR_DATA, sequence, distance, ax, ay, az, gx, gy, gz, temperature, ir_flags, battery, 0
+            )
+        return packet[:-1] + bytes([sum(packet[1:-1]) & 0xFF])
+
+
+_PACKET_TYPES = {"MOTOR": 0x01, "LCD": 0x02, "SENSOR": 0x03, "STOP": 0x04}
+_pack_motor = PacketCodec.MOTOR_STRUCT.pack
+_pack_motor_into = PacketCodec.MOTOR_STRUCT.pack_into
+# SENSOR_STRUCT / SEQUENCED_SENSOR_STRUCT without the start and checksum bytes
+_unpack_sensor_fields = struct.Struct("<xfhhhhhhfBB").unpack_from
+_unpack_sequenced_sensor_fields = struct.Struct("<xBfhhhhhhfBB").unpack_from
+_NO_SEQUENCE = (None,)
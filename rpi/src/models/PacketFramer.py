@@ -0,0 +1,137 @@
+import time
+
+
+class PacketFramer:
+    """
+    Fixed-capacity ring buffer that frames fixed-length packets out of a serial byte stream.
+
+    Incoming bytes are written straight into a preallocated ``bytearray`` (see ``writable`` / ``commit``),
+    and complete packets are handed out as ``memoryview`` slices of that same buffer, so no bytes are
+    copied between the UART read and the consumer. A yielded view is only valid until the next write.
+
+    Unread bytes stay where they are until the write position reaches the end of the buffer; only then
+    is the (at most one partial packet) tail moved back to the front, which keeps the per-packet cost
+    constant instead of shifting the whole buffer on every packet.
+    """
+
+    def __init__(self, packet_length: int = 24, start_byte: int = 0xAA, capacity: int = 4096, validate_checksum: bool = True):
+        if capacity < packet_length * 2:
+            raise ValueError("Capacity must hold at least two packets")
+
+        self.packet_length = packet_length
+        self.start_byte = start_byte
+        self.capacity = capacity
+        self.validate_checksum = validate_checksum  # Resync past start bytes whose packet checksum fails
+
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._start = bytes([start_byte])
+        self._head = 0  # Index of the first unread byte
+        self._tail = 0  # Index one past the last written byte
+        self._in_sync = True
+
+        self.reset_stats()
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def reset_stats(self):
+        self.packets = 0  # Complete packets handed to the consumer
+        self.bytes_discarded = 0  # Garbage bytes skipped while searching for a start byte
+        self.resyncs = 0  # Number of times framing was lost and then recovered
+        self.checksum_errors = 0  # Candidate packets rejected by the checksum
+        self._stats_since = time.monotonic()
+
+    def writable(self, min_size: int = 1) -> memoryview:
+        """
+        Return the free region of the buffer for a direct ``readinto``. Call ``commit`` with the number
+        of bytes actually written.
+
+        :param min_size: Minimum number of free bytes required; compacts the buffer if necessary
+        """
+        if self.capacity - self._tail < min_size:
+            self._compact()
+            if self.capacity - self._tail < min_size:
+                # The consumer is not keeping up, drop the oldest bytes to make room
+                overflow = min_size - (self.capacity - self._tail)
+                self._discard(min(overflow, len(self)))
+                self._compact()
+        return self._view[self._tail:]
+
+    def commit(self, size: int):
+        """Mark ``size`` bytes of the last ``writable`` region as filled."""
+        self._tail += size
+
+    def feed(self, data) -> int:
+        """Copy ``data`` into the buffer. Returns the number of bytes written."""
+        size = len(data)
+        if size > self.capacity:
+            # Only the newest bytes can be framed anyway
+            self.bytes_discarded += size - self.capacity
+            data = memoryview(data)[size - self.capacity:]
+            size = self.capacity
+        self.writable(size)[:size] = data
+        self.commit(size)
+        return size
+
+    def packets_available(self):
+        """
+        Yield complete packets as ``memoryview`` slices of the internal buffer.
+
+        Each view must be consumed (or copied) before the next ``feed``/``commit``.
+        """
+        buffer = self._buffer
+        length = self.packet_length
+        while self._tail - self._head >= length:
+            start_index = buffer.find(self._start, self._head, self._tail)
+            if start_index == -1:
+                self._discard(self._tail - self._head)
+                break
+            elif start_index > self._head:
+                self._discard(start_index - self._head)
+                if self._tail - self._head < length:
+                    break
+
+            packet = self._view[self._head:self._head + length]
+            if self.validate_checksum and (sum(packet[1:-1]) & 0xFF) != packet[-1]:
+                # False start byte inside garbage or a corrupted packet, resync from the next byte
+                self.checksum_errors += 1
+                self._discard(1)
+                continue
+
+            self._head += length
+            self.packets += 1
+            if not self._in_sync:
+                self._in_sync = True
+                self.resyncs += 1
+            yield packet
+
+        if self._head == self._tail:
+            self._head = self._tail = 0
+
+    def stats(self) -> dict:
+        """Return the framing counters, including the packet rate since the last reset."""
+        elapsed = time.monotonic() - self._stats_since
+        return {
+            "packets": self.packets,
+            "packets_per_sec": self.packets / elapsed if elapsed > 0 else 0.0,
+            "bytes_discarded": self.bytes_discarded,
+            "resyncs": self.resyncs,
+            "checksum_errors": self.checksum_errors,
+            "buffered": len(self),
+        }
+
+    def _discard(self, size: int):
+        if size <= 0:
+            return
+        self._head += size
+        self.bytes_discarded += size
+        self._in_sync = False
+
+    def _compact(self):
+        remaining = self._tail - self._head
+        if self._head and remaining:
+            # The tail is normally less than one packet, copying it out avoids overlapping moves
+            self._buffer[:remaining] = self._view[self._head:self._tail].tobytes()
+        self._head = 0
+        self._tail = remaining
@@ -0,0 +1,230 @@
+import asyncio
+import importlib
+import logging
+import time
+
+from .CommandScheduler import CommandPriority
+from .LatencyHistogram import LatencyHistogram
+from .PacketCodec import PacketCodec
+from ..ai.plan_cache import PlanCache
+
+# Plans run for seconds to minutes, beyond LatencyHistogram's default 10 s range
+EXECUTION_BOUNDS = tuple(round(0.1 * 2 ** (i / 2), 3) for i in range(22))
+
+
+def _import_planner():
+    planner = importlib.import_module("..ai.get_commands", __package__)
+    importlib.import_module("openai")  # Otherwise imported by the first model call, on the event loop
+    return planner
+
+
+class QueryManager:
+    """
+    Admission control for AI queries: at most one query is planned or executed at a time, and the
+    newest one wins.
+
+    - A query identical (after normalization) to the one in flight joins it instead of starting again.
+    - A different query cancels the one in flight, whether it is still waiting for the model or
+      already driving, and the motors are stopped while the new plan is made.
+    - ``cancel`` (STOP from the dashboard) cancels it as well.
+    - Planning has a deadline in real time (it is a network call) and execution a deadline on the
+      robot's clock. With ``robot.stream_queries`` both run together under the execution deadline,
+      and the model stream under the planning deadline.
+
+    :param robot: Robot whose scheduler runs the plans
+    :param plan_timeout: Seconds allowed for the model to produce the plan
+    :param execution_timeout: Seconds a plan may drive before it is stopped
+    """
+
+    SUPERSEDED = "superseded"
+    STOPPED = "stopped"
+    TIMED_OUT = "timed out"
+
+    def __init__(self, robot, plan_timeout: float = 15.0, execution_timeout: float = 120.0):
+        self.robot = robot
+        self.plan_timeout = plan_timeout
+        self.execution_timeout = execution_timeout
+        self._current = None  # (normalized query, task)
+        self._executing = None  # Task of the query in flight once it has started driving
+        self._reasons = {}  # Cancelled task -> why
+        self._planner = None  # ai.get_commands, imported by the first query
+        self._logger = logging.getLogger("QueryManager")
+        self.first_command = LatencyHistogram()  # Query to first command ready, in seconds
+        self.plan_time = LatencyHistogram()  # Query to complete plan, in seconds
+        self.execution_time = LatencyHistogram(EXECUTION_BOUNDS)  # Plan start to end of execution
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.submitted = 0
+        self.deduplicated = 0  # Joined an identical query in flight
+        self.superseded = 0  # Cancelled by a newer query
+        self.stopped = 0  # Cancelled by STOP
+        self.plan_timeouts = 0
+        self.execution_timeouts = 0
+        self.failed = 0
+        self.interrupted = 0  # Preempted by the joystick or a safety reflex
+        self.completed = 0
+        self.first_command.reset()
+        self.plan_time.reset()
+        self.execution_time.reset()
+
+    def submit(self, query: str) -> asyncio.Task:
+        """Plan and run ``query``, cancelling a different query in flight. Returns the task doing it."""
+        self.submitted += 1
+        key = PlanCache.normalize(query)
+        current = self._current
+        if current is not None and not current[1].done():
+            if current[0] == key:
+                self.deduplicated += 1
+                return current[1]
+            self._cancel(current[1], self.SUPERSEDED)
+
+        task = asyncio.create_task(self._run(query))
+        self._current = (key, task)
+        return task
+
+    def cancel(self) -> bool:
+        """Cancel the query in flight (STOP). Returns False if there was none."""
+        current = self._current
+        if current is None or current[1].done():
+            return False
+        self._cancel(current[1], self.STOPPED)
+        return True
+
+    def _cancel(self, task: asyncio.Task, reason: str):
+        if self._executing is task and reason != self.STOPPED:
+            self._halt()
+        self._reasons.setdefault(task, reason)
+        task.cancel(reason)
+
+    def _halt(self):
+        """Stop a cancelled plan's motors, unless a safety reflex is driving them."""
+        scheduler = self.robot.scheduler
+        if not scheduler.active(CommandPriority.SAFETY):
+            scheduler.emergency_stop()
+
+    def in_flight(self) -> int:
+        return int(self._current is not None and not self._current[1].done())
+
+    async def _run(self, query: str):
+        robot = self.robot
+        task = asyncio.current_task()
+        started = time.perf_counter()
+        timer = None
+        plan_timeouts = self.plan_timeouts
+        try:
+            robot.serial.send_packet(PacketCodec.encode_lcd("Thinking...", ""))  # Doesn't touch the motors
+            planner = await self._load_planner()
+            if robot.stream_queries:
+                timer = robot.clock.call_later(self.execution_timeout, self._expire, task)
+                self._executing = task
+                completed = await self._run_streamed(query, started)
+                self.execution_time.observe(time.perf_counter() - started)  # Planning and driving overlap
+            else:
+                try:
+                    async with asyncio.timeout(self.plan_timeout):
+                        plan = await planner.text_to_command(query)
+                    if task.cancelling():
+                        raise asyncio.CancelledError()  # The HTTP client swallowed the cancellation
+                except TimeoutError:
+                    self.plan_timeouts += 1
+                    self._logger.warning(f"Planning {query!r} timed out after {self.plan_timeout} s")
+                    await robot.telemetry.publish_active_command({"ID": "", "error": "Planning timed out"})
+                    return
+                planned = time.perf_counter() - started
+                self.first_command.observe(planned)  # Nothing can run before the whole plan is parsed
+                self.plan_time.observe(planned)
+
+                timer = robot.clock.call_later(self.execution_timeout, self._expire, task)
+                self._executing = task
+                executing = time.perf_counter()
+                completed = await robot._run_command_sequence(plan)
+                self.execution_time.observe(time.perf_counter() - executing)
+
+            if completed is None:
+                if self.plan_timeouts == plan_timeouts:  # A stream cut off by its deadline is counted there
+                    self.failed += 1
+            elif completed:
+                self.completed += 1
+            else:
+                self.interrupted += 1
+        except asyncio.CancelledError:
+            reason = self._reasons.get(task, self.STOPPED)
+            if reason == self.SUPERSEDED:
+                self.superseded += 1
+            elif reason == self.TIMED_OUT:
+                self.execution_timeouts += 1
+            else:
+                self.stopped += 1
+            await robot.telemetry.publish_active_command({"ID": "", "error": reason.capitalize()})
+            raise
+        except Exception as e:
+            self.failed += 1
+            self._logger.error(f"Query {query!r} failed: {e}")
+            await robot.telemetry.publish_active_command({"ID": "", "error": str(e)})
+        finally:
+            self._reasons.pop(task, None)
+            if self._executing is task:
+                self._executing = None
+            if timer is not None:
+                timer.cancel()
+
+    async def _load_planner(self):
+        """
+        Import the AI stack in a worker thread the first time, so a query sent while it is still loading
+        at startup doesn't block the event loop, and the safety reflexes with it.
+        """
+        if self._planner is None:
+            self._planner = await asyncio.to_thread(_import_planner)
+        return self._planner
+
+    def _expire(self, task: asyncio.Task):
+        if not task.done():
+            self._logger.warning(f"Plan execution exceeded {self.execution_timeout} s")
+            self._cancel(task, self.TIMED_OUT)
+
+    async def _run_streamed(self, query: str, started: float):
+        """Start each command as soon as the model has written it, while the rest of the plan is generated."""
+        queue = asyncio.Queue()
+        producer = asyncio.create_task(self._produce_commands(query, queue, started))
+        try:
+            return await self.robot._run_command_sequence(queue, self.robot._command_stream)
+        finally:
+            producer.cancel()  # The sequence was preempted or failed, stop generating
+
+    async def _produce_commands(self, query: str, queue: asyncio.Queue, started: float):
+        count = 0
+        try:
+            async with asyncio.timeout(self.plan_timeout):
+                async for command in self._planner.stream_commands(query):
+                    if not count:
+                        self.first_command.observe(time.perf_counter() - started)
+                    count += 1
+                    queue.put_nowait(command)
+        except TimeoutError:
+            self.plan_timeouts += 1
+            queue.put_nowait(TimeoutError("Planning timed out"))
+            return
+        except Exception as e:
+            self._logger.error(f"Error streaming plan for {query!r}: {e}")
+            queue.put_nowait(e)
+            return
+        self.plan_time.observe(time.perf_counter() - started)
+        queue.put_nowait(None)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight(),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "superseded": self.superseded,
+            "stopped": self.stopped,
+            "plan_timeouts": self.plan_timeouts,
+            "execution_timeouts": self.execution_timeouts,
+            "failed": self.failed,
+            "interrupted": self.interrupted,
+            "completed": self.completed,
+            "first_command": self.first_command.snapshot(),
+            "plan_time": self.plan_time.snapshot(),
+            "execution_time": self.execution_time.snapshot(),
+        }
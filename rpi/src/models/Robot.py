@@ -1,44 +1,85 @@
 import logging
-import time, struct
 import asyncio
-from . import SerialManager, SensorData, Command, CommandType, LCDCommand
-from ..ai.get_commands import text_to_command
+from . import SerialManager, SensorRecord, Command, CommandType, LatencyHistogram, PacketCodec, SensorStats, TelemetryHub, CommandScheduler, CommandPriority, SafetyReflex, QueryManager, CommandTimeline
+
+BACKUP_PACKET = PacketCodec.encode_motor(*Command.joystick_to_motor(-0.5, 0))  # Reverse at half stick
 
 
 class Robot:
-    def __init__(self, serial_manager: SerialManager, socketio):
+    def __init__(self, serial_manager: SerialManager, socketio=None):
         self.serial = serial_manager
-        self.last_emit_time = 0
-        self.emit_interval = 0.1  # for sensor data
+        self.clock = serial_manager.clock  # Real time, or a VirtualClock in simulations
+        self.emit_interval = 0.1  # for sensor data sent to clients without subscriptions
         self.last_rumble_time = 0
         self.rumble_cooldown = 1  # seconds between rumbles
-        self.socketio = socketio
-        self.cliff_clear = asyncio.Event()
-        self.waiting_for_sensor = asyncio.Event()
+        self.socketio = socketio  # None until the web server is up, see attach_socketio
+        self.telemetry = TelemetryHub(socketio, legacy_interval=self.emit_interval, clock=self.clock)
         self.sensor_request_interval = 0.1  # 10Hz = 0.1 seconds
         self.sensor_request_task = None
         self.running = False
-        self.distance_history = []  # Store last 10 distances
+        # Rolling statistics over the last 10 packets of every channel. The reflexes see a cliff in 2
+        # consecutive packets and the median of the last 3 distances, so one bad reading can't trigger them.
+        self.sensor_stats = SensorStats(window=10, cliff_window=2, obstacle_window=3)
+        self.emit_sensor_stats = False  # Include sensor_stats in the sensor_data emit
         self.sensor_count = 0  # Count of sensor data received
         self.last_sensor_request_time = 0  # Last time sensor data was requested
-        self.obstacle_clear = asyncio.Event()
-        self.backup_time = 2  # Amount of time to backup when an obstacle is detected
-        self.obstacle_threshold = 20 # Distance threshold for obstacle detection
+        self.link_probe_interval = 0.05  # Sensor requests while waiting for the Arduino to boot
+        self.link_up_time = None  # Seconds from start() to the first sensor packet
         self._logger = logging.getLogger("RobotManager")
-        self.motor_lock = asyncio.Lock()
+        self.scheduler = CommandScheduler(serial_manager.send_packet)  # Arbitrates motor commands by priority
+        # Cliff stop / obstacle backoff, written from the packet path before any await
+        self.safety = SafetyReflex(self.scheduler, BACKUP_PACKET, backup_time=2, obstacle_threshold=20, clock=self.clock)
+        serial_manager.writer.on_written = self.safety.packet_written
         
-        self.waiting_for_sensor.set()
-        self.obstacle_clear.set()
-        self.cliff_clear.set()
-
-    async def send_safe_command(self, command: Command, wait_after: float = 0):
-        async with self.motor_lock:
-            await self.waiting_for_sensor.wait()
-            self.waiting_for_sensor.clear()
-            self.serial.send(command)
-            if wait_after > 0:
-                await asyncio.sleep(wait_after)
-            self.waiting_for_sensor.set()
+        # Protocol v2: sequence-numbered sensor requests, several may be in flight at once
+        self.protocol_version = serial_manager.protocol_version
+        self.max_sensor_requests_in_flight = 4
+        self.sensor_request_timeout = 0.5  # Seconds before an unanswered request is counted as lost
+        self.sensor_rtt = LatencyHistogram()  # Round-trip time of matched sensor requests
+        self.sensor_requests_sent = 0
+        self.sensor_requests_lost = 0
+        self.unmatched_sensor_replies = 0
+        self._sensor_requests = {}  # Sequence number -> time the request was sent
+        self._next_sensor_sequence = 1
+
+        # AI queries: one at a time, the newest wins. Streamed plans start moving before the model has finished the plan
+        self.queries = QueryManager(self)
+        self.stream_queries = False
+        self.step_lateness = LatencyHistogram()  # Actual - planned start of each plan step, in seconds
+
+    async def send_safe_command(self, command: Command, wait_after: float = 0,
+                                priority: CommandPriority = CommandPriority.SEQUENCE) -> bool:
+        """
+        Send a command through the scheduler and keep the motors for ``wait_after`` seconds.
+        STOP commands are emergency stops and never wait. Returns False if the command was preempted.
+        """
+        if command.command_type == CommandType.STOP:
+            self.scheduler.emergency_stop()
+            return True
+        packet = self.serial.encode(command)
+        if packet is None:
+            return True
+        return await self.send_safe_packet(packet, wait_after, priority)
+
+    async def send_safe_packet(self, packet: bytes, wait_after: float = 0,
+                               priority: CommandPriority = CommandPriority.SEQUENCE) -> bool:
+        """Same as send_safe_command for an already encoded packet, e.g. from PacketCodec."""
+        return await self.scheduler.run(priority, self._send_and_hold, packet, wait_after)
+
+    async def _send_and_hold(self, send, packet: bytes, wait_after: float):
+        send(packet)
+        if wait_after > 0:
+            await self.clock.sleep(wait_after)
+
+    def attach_socketio(self, socketio):
+        """Start emitting to the web server's clients, once it has been loaded after the serial link."""
+        self.socketio = socketio
+        self.telemetry.socketio = socketio
+
+    def emergency_stop(self):
+        """Stop the motors now, cancelling reflexes, command sequences and the AI query in flight."""
+        self.scheduler.emergency_stop()
+        self.queries.cancel()
 
     async def start(self):
         """Start the robot's background tasks"""
@@ -57,171 +98,121 @@ class Robot:
 
     async def _sensor_request_loop(self):
         """Background task to request sensor data at 10Hz"""
-        await asyncio.sleep(1)  # Allow time for the connection to stabilize
+        await self._wait_for_link()
+        if self.protocol_version == 2:
+            await self._sequenced_sensor_request_loop()
+            return
+
         while self.running:
-            try:
-                await asyncio.wait_for(self.waiting_for_sensor.wait(), timeout=1.0)
-            except asyncio.TimeoutError:
-                self._logger.warning("Waiting for sensor data timed out, retrying...")
-                self.waiting_for_sensor.set()  # op
-                
             # Send "SENSOR" command to Arduino to request sensor data
-            sensor_request_command = Command(
-                ID="",
-                command_type=CommandType.SENSOR,
-                command=None,
-                pause_duration=0,
-                duration=0
-            )
-            self.last_sensor_request_time = time.time()
-            self.serial.send(sensor_request_command)
-            self.waiting_for_sensor.set()  # Reset waiting for sensor flag
-            await asyncio.sleep(self.sensor_request_interval)
-
-    async def _reset_cliff_detected(self):
-        """Reset the cliff clear flag after a short duration."""
-        await asyncio.sleep(0.5)  # Wait for half a second before resetting cliff detection to ensure backup completes
-        self.cliff_clear.set()
-        
-    async def _reset_obstacle_clear(self):
-        await asyncio.sleep(0.5)
-        self.obstacle_clear.set()
+            self.last_sensor_request_time = self.clock.time()
+            self.serial.send_sensor_request()
+            await self.clock.sleep(self.sensor_request_interval)
 
-    async def backup(self):
-        """Backup the robot for a short duration when an obstacle is detected."""
+    async def _wait_for_link(self):
+        """
+        Request sensor data until the Arduino answers, instead of waiting a fixed time for it to boot.
+        Probes are unsequenced, so protocol v2 doesn't count the ones sent during the boot as lost.
+        """
+        started = self.clock.monotonic()
+        while self.running and not self.serial.ready.is_set():
+            self.serial.send_sensor_request()
+            await self.clock.sleep(self.link_probe_interval)
+        self.link_up_time = self.clock.monotonic() - started
+        self._logger.info(f"Serial link up after {self.link_up_time:.3f} s")
+
+    async def _sequenced_sensor_request_loop(self):
+        """Protocol v2: keep up to max_sensor_requests_in_flight numbered requests outstanding."""
+        while self.running:
+            now = self.clock.monotonic()
+            for sequence, sent_time in list(self._sensor_requests.items()):
+                if now - sent_time > self.sensor_request_timeout:
+                    del self._sensor_requests[sequence]
+                    self.sensor_requests_lost += 1
+
+            if len(self._sensor_requests) < self.max_sensor_requests_in_flight:
+                sequence = self._next_sensor_sequence
+                self._next_sensor_sequence = sequence % 255 + 1  # 1-255, 0 marks unsolicited replies
+                self._sensor_requests[sequence] = now
+                self.last_sensor_request_time = self.clock.time()
+                self.serial.send_sensor_request(sequence)
+                self.sensor_requests_sent += 1
+            await self.clock.sleep(self.sensor_request_interval)
+
+    def _match_sensor_reply(self, sequence: int):
+        """Record the round-trip time of the request answered by a v2 sensor packet."""
+        sent_time = self._sensor_requests.pop(sequence, None)
+        if sent_time is None:
+            self.unmatched_sensor_replies += 1  # Unsolicited (sequence 0) or already timed out
+            return
+        self.sensor_rtt.observe(self.clock.monotonic() - sent_time)
+
+    def sensor_request_stats(self) -> dict:
+        return {
+            "protocol_version": self.protocol_version,
+            "sent": self.sensor_requests_sent,
+            "in_flight": len(self._sensor_requests),
+            "lost": self.sensor_requests_lost,
+            "unmatched_replies": self.unmatched_sensor_replies,
+            "rtt": self.sensor_rtt.snapshot(),
+        }
 
-        await self.send_safe_command(Command.from_joystick(-0.5, 0), wait_after=self.backup_time)
-        await self.send_safe_command(Command.stop())  # Stop after backing up
-        
     def bytes_to_sensor_data(self, data: bytes):
         """Convert bytes to SensorData model."""
 
-        # Look for start byte (0xAA)
-        start_byte = data[0]
-        if start_byte != 0xAA:
-            self._logger.error(f"Invalid start byte: {hex(start_byte[0])}, searching for 0xAA")
-            raise ValueError("Invalid start byte")
-
-        # Unpack the data according to the Arduino's sendSensorData format
-        # <B    - start byte (0xAA)
-        # B     - distance (uint8_t)
-        # h     - ax (int16_t)
-        # h     - ay (int16_t)
-        # h     - az (int16_t)
-        # h     - gx (int16_t)
-        # h     - gy (int16_t)
-        # h     - gz (int16_t)
-        # f     - tempC (float)
-        # B     - ir_flags (uint8_t)
-        # B     - battery percentage (uint8_t)
-        # B     - checksum (uint8_t)
-        
-        fields = struct.unpack('<BfhhhhhhfBBB', data)
-        start, distance, ax, ay, az, gx, gy, gz, temp, ir_flags, battery, received_checksum = fields
+        # Unpack according to the Arduino's sendSensorData format (see PacketCodec and docs/SerialPackets.md)
+        try:
+            return SensorRecord.from_packet(data).to_model()
+        except ValueError as e:
+            self._logger.error(str(e))
+            raise
 
-        # Calculate checksum (sum of all bytes except start byte and checksum byte)
-        calculated_checksum = sum(data[1:-1]) & 0xFF
-        valid = calculated_checksum == received_checksum
+    def filter_distance(self, distance: float) -> float:
+        """Replace out of range ultrasonic readings (-1 too far, -2 too close) with the windowed median."""
+        if distance >= 0:
+            return distance
+        recent = self.sensor_stats.distance
+        if len(recent):
+            return recent.median  # Ignores one-off spikes
+        return 300 if distance == -1 else 0
 
-        if not valid:
-            self._logger.error(f"Invalid checksum: calculated={calculated_checksum}, received={received_checksum}")
-            raise ValueError("Invalid checksum")
-        
-        # Extract IR flags
-        ir_front = not bool(ir_flags & 0b00000001)
-        ir_back = not bool(ir_flags & 0b00000010)
-        
-        return SensorData(
-            ultrasonic={
-                "distance": distance
-            },
-            imu={
-                "acceleration_x": ax/16384,  # Convert to g's
-                "acceleration_y": ay/16384,  # Convert to g's
-                "acceleration_z": az/16384,  # Convert to g's
-                "gyroscope_x": gx/131,  # Convert to degrees per second
-                "gyroscope_y": gy/131,  # Convert to degrees per second
-                "gyroscope_z": gz/131,  # Convert to degrees per second
-                "temperature": temp
-            },
-            ir_front=ir_front,
-            ir_back=ir_back,
-            battery=battery
-        )
-
-    async def handle_obstacle(self, sensor_data: SensorData, current_time: float) -> float:
-        """Detect obstacles and trigger backup if needed. Returns processed distance."""
-        if not sensor_data.is_obstacle_detected(self.obstacle_threshold) or not self.obstacle_clear.is_set():
-            return sensor_data.ultrasonic.distance
-    
-        distance = sensor_data.ultrasonic.distance
-        low = distance / self.obstacle_threshold
-    
-        if distance == -1:  # too far
-            avg_distance = sum(self.distance_history) / len(self.distance_history) if self.distance_history else 300
-            return avg_distance
-        elif distance == -2:  # too close
-            avg_distance = sum(self.distance_history) / len(self.distance_history) if self.distance_history else 0
-            low = avg_distance / self.obstacle_threshold
+    async def notify_reflex(self, reflex: str, distance: float, current_time: float):
+        """Tell the controller about a reflex that already fired (runs after the reaction was written)."""
+        if self.socketio is None or current_time - self.last_rumble_time <= self.rumble_cooldown:
+            return
+        self.last_rumble_time = current_time
+        if reflex == SafetyReflex.CLIFF:
+            await self.socketio.emit('rumble', {"low": 0.5, "high": 0.5, "duration": 1000})
         else:
-            avg_distance = distance
-    
-        low = max(0.0, min(low, 1.0))
-        high = 1 - low
-    
-        if current_time - self.last_rumble_time > self.rumble_cooldown:
-            await self.socketio.emit('rumble', {"low": low, "high": high, "duration": 1000})
-            self.last_rumble_time = current_time
-    
-        asyncio.create_task(self.backup())
-        self.obstacle_clear.clear()
-        asyncio.create_task(self._reset_obstacle_clear())
-    
-        return avg_distance
-    
-    
-    async def handle_cliff(self, sensor_data: SensorData, current_time: float):
-        """Handle cliff detection and stop motors if cliff is detected."""
-        
-        if not sensor_data.check_cliff() or not self.cliff_clear.is_set():
-            return 
-        
-        self.cliff_clear.clear()
-        asyncio.create_task(self.backup())
-        asyncio.create_task(self._reset_cliff_detected())  # Reset cliff detection after 0.5 seconds, basically halting commands
-
-        await self.send_safe_command(Command.stop())  # Stop motors if cliff is detected
+            # Stronger high-frequency rumble the closer the obstacle
+            low = max(0.0, min(distance / self.safety.obstacle_threshold, 1.0))
+            await self.socketio.emit('rumble', {"low": low, "high": 1 - low, "duration": 1000})
 
-        if current_time - self.last_rumble_time > self.rumble_cooldown:
-            await self.socketio.emit('rumble', {"low": 0.5, "high": 0.5, "duration": 1000})
-            self.last_rumble_time = current_time
-                
-            
     async def process_sensor_data(self, data: bytes):
-        self.waiting_for_sensor.set()
+        pipeline = self.serial.pipeline
+        arrival = pipeline.current_enqueued if pipeline else None
+        if self.protocol_version == 2:
+            self._match_sensor_reply(data[1])
         try:
-            sensor_data = self.bytes_to_sensor_data(data)
+            # Packets from SerialManager were already checksummed by the framer. The record is only
+            # converted to a pydantic SensorData when it is emitted.
+            sensor_data = SensorRecord.from_packet(data, verify=False)
         except Exception as e:
             self._logger.error(f"Error processing sensor data: {e}")
             return
 
-        current_time = time.time()
-        sensor_data.ultrasonic.distance = await self.handle_obstacle(sensor_data, current_time)
-        self.distance_history.append(sensor_data.ultrasonic.distance)  # Store the distance for history
-        
-        if len(self.distance_history) >= 10:
-            self.distance_history.pop(0)
-            
-        # Check for cliff 
-        await self.handle_cliff(sensor_data, current_time)
+        raw_distance = sensor_data.distance
+        sensor_data.distance = self.filter_distance(raw_distance)
+        self.sensor_stats.update(sensor_data, raw_distance)  # Store the processed sample for filtering and telemetry
+
+        # Reflexes write their reaction synchronously; everything below may await
+        reflex = self.safety.on_sample(self.sensor_stats.obstacle_distance(), self.sensor_stats.cliff_confirmed(), arrival)
+        if reflex is not None:
+            asyncio.create_task(self.notify_reflex(reflex, sensor_data.distance, self.clock.time()))
            
-        # Emit sensor data at a fixed interval
-        if current_time - self.last_emit_time >= self.emit_interval:
-            self.last_emit_time = current_time
-            await self.socketio.emit(
-                'sensor_data',
-                sensor_data.model_dump(),
-            )
+        # Emit sensor data to subscribers, each at its own rate
+        extra = {"stats": self.sensor_stats.snapshot()} if self.emit_sensor_stats else None
+        await self.telemetry.publish_sensor_data(sensor_data, extra)
 
 
     async def handle_joystick_input(self, data):
@@ -232,48 +223,67 @@ class Robot:
         left_y = data.get('left_y', 0)
         right_x = data.get('right_x', 0)
 
-        if self.cliff_clear.is_set() and self.waiting_for_sensor.is_set() and self.obstacle_clear.is_set():
-            await self.send_safe_command(Command.from_joystick(left_y, right_x))
+        # Straight from stick values to the motor packet, no Command model in between. The scheduler
+        # drops it while a safety reflex is running.
+        left_motor, right_motor = Command.joystick_to_motor(left_y, right_x)
+        self.scheduler.joystick(left_motor, right_motor)
             
 
-    async def _run_command_sequence(self, commands):
-        """Run a sequence of commands."""
+    async def _run_command_sequence(self, commands, action=None) -> bool:
+        """
+        Run a sequence of commands. Joystick input, reflexes and STOP preempt it.
+
+        :param commands: AICommand, or what ``action`` takes instead
+        :param action: SEQUENCE action run with ``commands``, defaults to ``_command_sequence``
+        :return: True if it completed, False if it was preempted, None if it failed
+        """
         try:
-            for command in commands.commands:
-                await self.socketio.emit('active_command', command.model_dump())
-                await self.send_safe_command(command, wait_after=command.duration)
-                    
-                if command.pause_duration and command.command_type == CommandType.MOTOR:
-                    await self.send_safe_command(Command.stop(), wait_after=command.pause_duration)
-                    
-            await self.send_safe_command(Command.stop())  # Ensure we stop the robot after the command sequence
-            await self.socketio.emit('active_command', {
+            completed = await self.scheduler.run(CommandPriority.SEQUENCE, action or self._command_sequence, commands)
+            await self.telemetry.publish_active_command({
                 "ID": ""
+            } if completed else {
+                "ID": "",
+                "error": "Interrupted"
             })  # Clear active command
+            return completed
         except Exception as e:
             self._logger.error(f"Error running command sequence: {e}")
-            await self.socketio.emit('active_command', {
+            await self.telemetry.publish_active_command({
                 "ID": "",
                 "error": str(e)
             })
-            
+            return None
 
-    async def handle_query(self, query):
-        await self.send_safe_command(
-            Command(
-                ID="",
-                command_type=CommandType.LCD,
-                command=LCDCommand(
-                    line_1="Thinking...",
-                    line_2=""
-                ),
-                pause_duration=0,
-                duration=0
-            )
-        )
-        
-        commands = await text_to_command(query)
-        command_task = asyncio.create_task(self._run_command_sequence(commands))
-        return command_task
-    
+    async def _command_sequence(self, send, commands):
+        # Ends with STOP, to ensure we stop the robot after the command sequence
+        timeline = CommandTimeline.compile(commands.commands, self.serial.encode, self.clock, self.step_lateness)
+        await timeline.run(send, self._publish_step)
 
+    async def _command_stream(self, send, queue: asyncio.Queue):
+        """Run commands as the plan stream produces them, until None (end of plan) or an exception arrives."""
+        timeline = CommandTimeline(self.serial.encode, self.clock, self.step_lateness)
+        command = None
+        while True:
+            ran_dry = command is not None and queue.empty()
+            if ran_dry:
+                send(PacketCodec.STOP_PACKET)  # Don't keep driving while the next step is generated
+            command = await queue.get()
+            if command is None:
+                break
+            if isinstance(command, Exception):
+                raise command
+            timeline.add(command)
+            if ran_dry:
+                timeline.rebase()  # Start it now rather than skipping the time spent waiting
+            await timeline.run(send, self._publish_step)
+        send(PacketCodec.STOP_PACKET)
+
+    async def _publish_step(self, command: Command, timing: dict):
+        command.assign_id()  # Only commands shown in the UI need an ID
+        payload = command.model_dump()
+        payload["timing"] = timing  # Planned and actual start, seconds from the start of the plan
+        await self.telemetry.publish_active_command(payload)
+
+    async def handle_query(self, query):
+        """Plan and run an AI query; a newer query or STOP cancels it (see QueryManager)."""
+        return self.queries.submit(query)
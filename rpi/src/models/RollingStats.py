@@ -0,0 +1,173 @@
+import bisect
+import math
+from array import array
+
+
+class RollingWindow:
+    """
+    Fixed-size rolling window over a single channel.
+
+    Samples live in a preallocated ``array`` ring, so pushing a sample allocates nothing. Mean and
+    variance are updated in O(1) per sample; a sorted copy of the window gives the median, min and max.
+    """
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+        self.size = size
+        self._values = array("d", bytes(8 * size))  # Ring buffer of the last `size` samples
+        self._sorted = array("d")  # Same samples, kept sorted for order statistics
+        self._index = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0  # Sum of squared differences from the mean
+        self._updates = 0
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._sorted = array("d")
+        self._index = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value: float):
+        value = float(value)
+        if self._count < self.size:
+            self._count += 1
+            delta = value - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (value - self._mean)
+        else:
+            old = self._values[self._index]
+            old_mean = self._mean
+            self._mean += (value - old) / self.size
+            self._m2 += (value - old) * (value - self._mean + old - old_mean)
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self.size
+        bisect.insort(self._sorted, value)
+
+        # Recompute from the window now and then so rounding errors can't accumulate
+        self._updates += 1
+        if self._updates >= self.size * 64:
+            self._updates = 0
+            self._recompute()
+
+    def _recompute(self):
+        values = self._sorted
+        mean = math.fsum(values) / len(values)
+        self._mean = mean
+        self._m2 = math.fsum((v - mean) ** 2 for v in values)
+
+    @property
+    def last(self) -> float:
+        return self._values[self._index - 1] if self._count else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        """Population variance of the window."""
+        return max(0.0, self._m2 / self._count) if self._count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def median(self) -> float:
+        count = self._count
+        if not count:
+            return 0.0
+        middle = count // 2
+        if count % 2:
+            return self._sorted[middle]
+        return (self._sorted[middle - 1] + self._sorted[middle]) / 2
+
+    @property
+    def min(self) -> float:
+        return self._sorted[0] if self._count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._sorted[-1] if self._count else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "mean": self.mean,
+            "std": self.std,
+            "median": self.median,
+            "min": self.min,
+            "max": self.max,
+            "count": self._count,
+        }
+
+
+class SensorStats:
+    """
+    Rolling statistics for every ``SensorRecord`` channel, plus two short channels for the safety
+    reflexes: cliff (1 = cliff seen) to debounce cliff detection, and the raw ultrasonic distance,
+    whose median filters single-sample echoes out of obstacle detection.
+
+    :param window: Number of samples per channel
+    :param cliff_window: Number of consecutive cliff samples required to confirm a cliff
+    :param obstacle_window: Number of raw distance samples the obstacle distance is the median of
+    """
+
+    CHANNELS = (
+        "distance", "acceleration_x", "acceleration_y", "acceleration_z",
+        "gyroscope_x", "gyroscope_y", "gyroscope_z", "temperature", "battery",
+    )
+    OUT_OF_RANGE = 300.0  # Obstacle channel value for -1 (nothing in range), same as Robot.filter_distance
+
+    def __init__(self, window: int = 10, cliff_window: int = 1, obstacle_window: int = 1):
+        self.window = window
+        self.distance = RollingWindow(window)
+        self.acceleration_x = RollingWindow(window)
+        self.acceleration_y = RollingWindow(window)
+        self.acceleration_z = RollingWindow(window)
+        self.gyroscope_x = RollingWindow(window)
+        self.gyroscope_y = RollingWindow(window)
+        self.gyroscope_z = RollingWindow(window)
+        self.temperature = RollingWindow(window)
+        self.battery = RollingWindow(window)
+        self.cliff = RollingWindow(cliff_window)
+        self.obstacle = RollingWindow(obstacle_window)
+
+    def update(self, sensor_data, raw_distance: float = None):
+        """
+        Push one ``SensorRecord`` sample into every channel.
+
+        :param raw_distance: Ultrasonic reading before out of range values were replaced, for the
+            obstacle channel (-1 = nothing in range, -2 = too close); defaults to ``sensor_data.distance``
+        """
+        self.distance.push(sensor_data.distance)
+        self.acceleration_x.push(sensor_data.acceleration_x)
+        self.acceleration_y.push(sensor_data.acceleration_y)
+        self.acceleration_z.push(sensor_data.acceleration_z)
+        self.gyroscope_x.push(sensor_data.gyroscope_x)
+        self.gyroscope_y.push(sensor_data.gyroscope_y)
+        self.gyroscope_z.push(sensor_data.gyroscope_z)
+        self.temperature.push(sensor_data.temperature)
+        self.battery.push(sensor_data.battery)
+        self.cliff.push(1.0 if sensor_data.check_cliff() else 0.0)
+        if raw_distance is None:
+            raw_distance = sensor_data.distance
+        self.obstacle.push(raw_distance if raw_distance >= 0 else self.OUT_OF_RANGE if raw_distance == -1 else 0.0)
+
+    def cliff_confirmed(self) -> bool:
+        """True when every sample in the cliff window saw a cliff."""
+        return len(self.cliff) == self.cliff.size and self.cliff.min == 1.0
+
+    def obstacle_distance(self) -> float:
+        """Median of the last ``obstacle_window`` raw distances, nothing in range counting as far away."""
+        return self.obstacle.median
+
+    def snapshot(self) -> dict:
+        return {channel: getattr(self, channel).snapshot() for channel in self.CHANNELS}
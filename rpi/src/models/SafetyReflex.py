@@ -0,0 +1,101 @@
+import time
+
+from .Clock import Clock
+from .CommandScheduler import CommandPriority
+from .LatencyHistogram import LatencyHistogram
+from .PacketCodec import PacketCodec
+
+
+class SafetyReflex:
+    """
+    Cliff and obstacle reflexes, run synchronously on the sensor packet path.
+
+    ``on_sample`` decides and writes the first reaction packet (STOP for a cliff, reverse for an
+    obstacle) before returning, so reaction time doesn't depend on socket emits or other tasks. The
+    rest of the reaction (backing off, then stopping) runs as a SAFETY action on the scheduler. UI
+    notifications are the caller's job, after this returns.
+
+    States: ``clear`` -> ``cliff`` / ``obstacle`` while the reaction runs -> ``clear``. A reflex that
+    fired can't fire again for ``rearm_time`` seconds; a cliff can interrupt an obstacle reaction.
+
+    :param scheduler: CommandScheduler used for the reaction
+    :param backup_packet: Motor packet used to back off
+    :param backup_time: Seconds to back off before stopping
+    :param obstacle_threshold: Distance in cm below which an obstacle triggers the reflex
+    :param rearm_time: Seconds before the same reflex can trigger again
+    :param clock: Clock for rearming and the backoff
+    """
+
+    CLEAR = "clear"
+    CLIFF = "cliff"
+    OBSTACLE = "obstacle"
+
+    def __init__(self, scheduler, backup_packet: bytes, backup_time: float = 2, obstacle_threshold: float = 20,
+                 rearm_time: float = 0.5, clock: Clock = None):
+        self.scheduler = scheduler
+        self.clock = clock or Clock()
+        self.backup_packet = backup_packet
+        self.backup_time = backup_time
+        self.obstacle_threshold = obstacle_threshold
+        self.rearm_time = rearm_time
+        self.state = self.CLEAR
+        self.reaction_latency = LatencyHistogram()  # Packet arrival to reaction packet written, in seconds
+        self.triggered = {self.CLIFF: 0, self.OBSTACLE: 0}
+        self._rearm_at = {self.CLIFF: 0.0, self.OBSTACLE: 0.0}
+        self._pending = None  # (reaction packet, arrival time) until the writer reports it written
+
+    def on_sample(self, distance: float, cliff: bool, arrival: float = None) -> str:
+        """
+        Run the reflexes for one sensor sample.
+
+        :param distance: Ultrasonic distance, filtered by the caller (-1 = nothing in range)
+        :param cliff: Whether a cliff is confirmed
+        :param arrival: ``time.perf_counter()`` when the packet arrived, for the latency histogram
+        :return: The reflex that fired (CLIFF or OBSTACLE), or None
+        """
+        now = self.clock.monotonic()
+        if cliff and now >= self._rearm_at[self.CLIFF] and self.state != self.CLIFF:
+            self._fire(self.CLIFF, PacketCodec.STOP_PACKET, self._cliff_reaction, now, arrival)
+            return self.CLIFF
+
+        if (distance != -1 and distance < self.obstacle_threshold and now >= self._rearm_at[self.OBSTACLE]
+                and self.state == self.CLEAR):
+            self._fire(self.OBSTACLE, self.backup_packet, self._obstacle_reaction, now, arrival)
+            return self.OBSTACLE
+        return None
+
+    def _fire(self, reflex: str, packet: bytes, reaction, now: float, arrival: float):
+        self.state = reflex
+        self.triggered[reflex] += 1
+        self._rearm_at[reflex] = now + self.rearm_time
+        self._pending = (packet, arrival if arrival is not None else time.perf_counter())
+        task = self.scheduler.schedule(CommandPriority.SAFETY, reaction, first_packet=packet)
+        task.add_done_callback(lambda done: self._reaction_done(reflex))
+
+    def _reaction_done(self, reflex: str):
+        if self.state == reflex:  # A newer reflex may have taken over
+            self.state = self.CLEAR
+
+    async def _cliff_reaction(self, send):
+        # STOP was already written, back away from the edge
+        send(self.backup_packet)
+        await self._obstacle_reaction(send)
+
+    async def _obstacle_reaction(self, send):
+        # The backup packet was already written
+        await self.clock.sleep(self.backup_time)
+        send(PacketCodec.STOP_PACKET)
+
+    def packet_written(self, packet: bytes, written: float):
+        """SerialWriter.on_written hook (writer thread): record the reaction latency."""
+        pending = self._pending
+        if pending is not None and packet == pending[0]:
+            self._pending = None
+            self.reaction_latency.observe(written - pending[1])
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "triggered": dict(self.triggered),
+            "reaction_latency": self.reaction_latency.snapshot(),
+        }
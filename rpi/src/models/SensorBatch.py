@@ -0,0 +1,115 @@
+import numpy as np
+
+# Packed little-endian layout of the Arduino's sendSensorData packet (24 bytes, see docs/SerialPackets.md)
+SENSOR_PACKET_DTYPE = np.dtype([
+    ("start", "u1"),
+    ("distance", "<f4"),
+    ("ax", "<i2"),
+    ("ay", "<i2"),
+    ("az", "<i2"),
+    ("gx", "<i2"),
+    ("gy", "<i2"),
+    ("gz", "<i2"),
+    ("temperature", "<f4"),
+    ("ir_flags", "u1"),
+    ("battery", "u1"),
+    ("checksum", "u1"),
+])
+
+
+class SensorBatch:
+    """
+    Column-oriented sensor data decoded from N concatenated sensor packets in one vectorized pass.
+
+    Every attribute is a NumPy array with one entry per valid packet, using the same units as ``SensorData``.
+    """
+
+    ACCEL_SCALE = 16384  # Raw accelerometer counts per g
+    GYRO_SCALE = 131  # Raw gyroscope counts per degree/second
+
+    def __init__(self, distance, acceleration_x, acceleration_y, acceleration_z, gyroscope_x, gyroscope_y,
+                 gyroscope_z, temperature, ir_front, ir_back, battery, invalid_count=0):
+        self.distance = distance
+        self.acceleration_x = acceleration_x
+        self.acceleration_y = acceleration_y
+        self.acceleration_z = acceleration_z
+        self.gyroscope_x = gyroscope_x
+        self.gyroscope_y = gyroscope_y
+        self.gyroscope_z = gyroscope_z
+        self.temperature = temperature
+        self.ir_front = ir_front
+        self.ir_back = ir_back
+        self.battery = battery
+        self.invalid_count = invalid_count  # Packets dropped for a bad start byte or checksum
+
+    def __len__(self):
+        return len(self.distance)
+
+    @staticmethod
+    def packet_view(data) -> np.ndarray:
+        """
+        View a buffer of concatenated packets as a structured array without copying.
+
+        :param data: bytes-like object whose length is a multiple of the packet size
+        """
+        if len(data) % SENSOR_PACKET_DTYPE.itemsize:
+            raise ValueError(f"Buffer length {len(data)} is not a multiple of {SENSOR_PACKET_DTYPE.itemsize}")
+        return np.frombuffer(data, dtype=SENSOR_PACKET_DTYPE)
+
+    @staticmethod
+    def valid_mask(packets: np.ndarray) -> np.ndarray:
+        """Return a boolean mask of packets with a valid start byte and checksum."""
+        raw = packets.view(np.uint8).reshape(-1, SENSOR_PACKET_DTYPE.itemsize)
+        # Checksum is the sum of every byte between the start byte and the checksum byte
+        calculated = raw[:, 1:-1].sum(axis=1, dtype=np.uint32) & 0xFF
+        return (raw[:, 0] == 0xAA) & (calculated == raw[:, -1])
+
+    @classmethod
+    def from_bytes(cls, data, drop_invalid: bool = True) -> "SensorBatch":
+        """
+        Decode concatenated sensor packets.
+
+        :param data: bytes-like object holding N back-to-back 24 byte packets
+        :param drop_invalid: Drop packets that fail validation, otherwise raise ValueError
+        :return: SensorBatch with one row per valid packet
+        """
+        packets = cls.packet_view(data)
+        valid = cls.valid_mask(packets)
+        invalid_count = int(len(packets) - np.count_nonzero(valid))
+
+        if invalid_count:
+            if not drop_invalid:
+                raise ValueError(f"{invalid_count} packets failed validation")
+            packets = packets[valid]
+
+        ir_flags = packets["ir_flags"]
+        return cls(
+            distance=packets["distance"].astype(np.float64),
+            acceleration_x=packets["ax"] / cls.ACCEL_SCALE,  # Convert to g's
+            acceleration_y=packets["ay"] / cls.ACCEL_SCALE,
+            acceleration_z=packets["az"] / cls.ACCEL_SCALE,
+            gyroscope_x=packets["gx"] / cls.GYRO_SCALE,  # Convert to degrees per second
+            gyroscope_y=packets["gy"] / cls.GYRO_SCALE,
+            gyroscope_z=packets["gz"] / cls.GYRO_SCALE,
+            temperature=packets["temperature"].astype(np.float64),
+            ir_front=(ir_flags & 0b00000001) == 0,  # Same inverted flag semantics as Robot.bytes_to_sensor_data
+            ir_back=(ir_flags & 0b00000010) == 0,
+            battery=packets["battery"].astype(np.int64),
+            invalid_count=invalid_count,
+        )
+
+    def columns(self) -> dict:
+        """Return the decoded columns keyed by their ``SensorData`` field names."""
+        return {
+            "distance": self.distance,
+            "acceleration_x": self.acceleration_x,
+            "acceleration_y": self.acceleration_y,
+            "acceleration_z": self.acceleration_z,
+            "gyroscope_x": self.gyroscope_x,
+            "gyroscope_y": self.gyroscope_y,
+            "gyroscope_z": self.gyroscope_z,
+            "temperature": self.temperature,
+            "ir_front": self.ir_front,
+            "ir_back": self.ir_back,
+            "battery": self.battery,
+        }
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from .LatencyHistogram import LatencyHistogram
+
+
+class SensorPipeline:
+    """
+    Bounded, strictly ordered queue in front of a single consumer coroutine.
+
+    Replaces one task per packet: the serial reader submits items without awaiting, and one
+    consumer task processes them in arrival order. When the queue is full the overflow policy
+    decides what is lost, so memory stays flat when the event loop falls behind:
+
+    - ``drop_oldest``: discard the oldest queued item to make room for the new one
+    - ``latest``: discard everything queued and keep only the newest item
+    """
+
+    POLICIES = ("drop_oldest", "latest")
+
+    def __init__(self, consumer, maxsize: int = 32, policy: str = "drop_oldest"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+
+        self.consumer = consumer  # Coroutine function called with each item
+        self.maxsize = maxsize
+        self.policy = policy
+        self.latency = LatencyHistogram()  # Submit to end of processing, in seconds
+        self.process_time = LatencyHistogram()  # Time spent in the consumer, in seconds
+        self._queue = deque()
+        self._ready = asyncio.Event()
+        self._task = None
+        self.current_enqueued = None  # perf_counter() submit time of the item being processed
+        self._logger = logging.getLogger("SensorPipeline")
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+
+    def submit(self, item):
+        """Queue an item for processing. Must be called from the event loop thread."""
+        queue = self._queue
+        if len(queue) >= self.maxsize:
+            if self.policy == "latest":
+                self.dropped += len(queue)
+                queue.clear()
+            else:
+                queue.popleft()
+                self.dropped += 1
+
+        queue.append((time.perf_counter(), item))
+        self.submitted += 1
+        if len(queue) > self.max_depth:
+            self.max_depth = len(queue)
+        self._ready.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            if not queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            enqueued, item = queue.popleft()
+            self.current_enqueued = enqueued
+            started = time.perf_counter()
+            try:
+                await self.consumer(item)
+            except Exception as e:
+                self.errors += 1
+                self._logger.exception(f"Error processing item: {e}")
+            finished = time.perf_counter()
+            self.processed += 1
+            self.process_time.observe(finished - started)
+            self.latency.observe(finished - enqueued)
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self._queue),
+            "max_depth": self.max_depth,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "latency": self.latency.snapshot(),
+            "process_time": self.process_time.snapshot(),
+        }
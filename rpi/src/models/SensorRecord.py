@@ -0,0 +1,95 @@
+from .PacketCodec import PacketCodec
+from .SensorData import SensorData
+
+
+class SensorRecord:
+    """
+    Flat, slotted sensor sample for the packet hot path.
+
+    Holds the same values as ``SensorData`` (same units, same IR semantics) without building nested
+    pydantic models, so obstacle and cliff checks don't pay for validation. Call ``to_model()`` (or
+    ``model_dump()``) only when the sample is actually serialized.
+    """
+
+    __slots__ = (
+        "sequence", "distance",
+        "acceleration_x", "acceleration_y", "acceleration_z",
+        "gyroscope_x", "gyroscope_y", "gyroscope_z",
+        "temperature", "ir_front", "ir_back", "battery",
+    )
+
+    def __init__(self, distance: float, acceleration_x: float, acceleration_y: float, acceleration_z: float,
+                 gyroscope_x: float, gyroscope_y: float, gyroscope_z: float, temperature: float,
+                 ir_front: bool, ir_back: bool, battery: int, sequence: int = None):
+        self.sequence = sequence
+        self.distance = distance
+        self.acceleration_x = acceleration_x
+        self.acceleration_y = acceleration_y
+        self.acceleration_z = acceleration_z
+        self.gyroscope_x = gyroscope_x
+        self.gyroscope_y = gyroscope_y
+        self.gyroscope_z = gyroscope_z
+        self.temperature = temperature
+        self.ir_front = ir_front
+        self.ir_back = ir_back
+        self.battery = battery
+
+    @classmethod
+    def from_packet(cls, data, verify: bool = True) -> "SensorRecord":
+        """
+        Decode a 0xAA or 0xAB sensor packet.
+
+        :param data: bytes-like packet
+        :param verify: Check the checksum (PacketFramer has already done so for packets from SerialManager)
+        :raises ValueError: On an invalid start byte or checksum
+        """
+        sequence, distance, ax, ay, az, gx, gy, gz, temp, ir_flags, battery = PacketCodec.decode_sensor(data, verify)
+        return cls(
+            distance,
+            ax / 16384,  # Convert to g's
+            ay / 16384,
+            az / 16384,
+            gx / 131,  # Convert to degrees per second
+            gy / 131,
+            gz / 131,
+            temp,
+            not ir_flags & 0b00000001,  # A set bit means no floor under the sensor
+            not ir_flags & 0b00000010,
+            battery,
+            sequence,
+        )
+
+    def is_obstacle_detected(self, threshold: float = 10.0) -> bool:
+        """Same as ``SensorData.is_obstacle_detected``."""
+        return self.distance < threshold
+
+    def check_cliff(self) -> bool:
+        """Same as ``SensorData.check_cliff``: True unless both IR sensors see the floor."""
+        return not (self.ir_front and self.ir_back)
+
+    def to_model(self) -> SensorData:
+        """Build the equivalent pydantic ``SensorData``."""
+        return SensorData(
+            ultrasonic={
+                "distance": self.distance
+            },
+            imu={
+                "acceleration_x": self.acceleration_x,
+                "acceleration_y": self.acceleration_y,
+                "acceleration_z": self.acceleration_z,
+                "gyroscope_x": self.gyroscope_x,
+                "gyroscope_y": self.gyroscope_y,
+                "gyroscope_z": self.gyroscope_z,
+                "temperature": self.temperature
+            },
+            ir_front=self.ir_front,
+            ir_back=self.ir_back,
+            battery=self.battery
+        )
+
+    def model_dump(self) -> dict:
+        """Serialize like ``SensorData.model_dump()``, so a record can be emitted where a model was."""
+        return self.to_model().model_dump()
+
+    def __repr__(self):
+        return f"SensorRecord(distance={self.distance}, ir_front={self.ir_front}, ir_back={self.ir_back}, battery={self.battery})"
@@ -1,24 +1,62 @@
 import asyncio
+import os
 import threading
 import serial
 import time
 import logging
-import struct
 import serial.tools.list_ports
+from .Clock import Clock
 from .Command import Command
 from .CommandTypeEnum import CommandType
+from .PacketCodec import PacketCodec
+from .PacketFramer import PacketFramer
+from .SensorPipeline import SensorPipeline
+from .SerialWriter import SerialWriter
 
 class SerialManager:
-    def __init__(self, port='/dev/ttyUSB0', baudrate=115200):
-        self.serial = serial.Serial(port, baudrate)
-        time.sleep(1)  # Allow time for the serial connection to stabilize
+    TRANSPORTS = ("async", "thread", "feed")
+    PORT_TRANSPORTS = ("async", "thread")  # Transports that read the port; "feed" is pushed bytes in-process
+    PROTOCOL_VERSIONS = (1, 2)
+
+    def __init__(self, port='/dev/ttyUSB0', baudrate=115200, transport="async", queue_size=32, overflow_policy="drop_oldest", protocol_version=1,
+                 clock: Clock = None, connection=None):
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"Unknown serial transport: {transport}")
+        if protocol_version not in self.PROTOCOL_VERSIONS:
+            raise ValueError(f"Unknown protocol version: {protocol_version}")
+
+        self.clock = clock or Clock()  # Shared with the Robot, see VirtualClock for simulations
+        if connection is not None:
+            self.serial = connection  # Already open serial-like object, e.g. a SimulatedArduino
+        else:
+            # Opening the port resets the Arduino; instead of waiting a fixed time for it to boot, the
+            # robot polls for sensor data until the first packet arrives (see ``ready``)
+            self.serial = serial.Serial(port, baudrate)
+        # "async" reads on the event loop, "thread" polls from a background thread, "feed" means the
+        # connection pushes received bytes with feed() and writes are made inline
+        self.transport = transport
+        self.protocol_version = protocol_version  # 2 = sequence-numbered sensor requests and replies
         self.running = False
+        self.queue_size = queue_size  # Max sensor packets waiting for Robot.process_sensor_data
+        self.overflow_policy = overflow_policy  # "drop_oldest" or "latest", see SensorPipeline
+        self.pipeline = None  # Single consumer stage feeding the robot
         self.robot = None  # Reference to the robot instance
         self.loop = None   # Event loop to use for coroutine execution
-        self._buffer = bytearray()  # Buffer to store incoming data
         self._logger = logging.getLogger("SerialManager")
-        self._START_BYTE = 0xAA
-        self._PACKET_LENGTH = 24
+        if protocol_version == 2:
+            self._START_BYTE = 0xAB
+            self._PACKET_LENGTH = 25  # Sensor packet with a sequence number after the start byte
+        else:
+            self._START_BYTE = 0xAA
+            self._PACKET_LENGTH = 24
+        self._framer = PacketFramer(self._PACKET_LENGTH, self._START_BYTE)  # Ring buffer for incoming data
+        self._READ_CHUNK = 512  # Max bytes read per readiness callback
+        self._fd = None  # File descriptor registered with the event loop in async mode
+        self.recorder = None  # Optional TelemetryRecorder, see attach_recorder
+        self.ready = asyncio.Event()  # Set when the first valid sensor packet arrives: the Arduino is up
+        # Owns all writes so the event loop never blocks on the UART
+        self.writer = SerialWriter(self.serial, clock=self.clock, inline=transport == "feed")
+        self.writer.start()
         
     @staticmethod
     def find_port():
@@ -37,70 +75,138 @@ class SerialManager:
         self.robot = robot
         self.loop = loop
         self.running = True
-        thread = threading.Thread(target=self.read_loop, daemon=True)
-        thread.start()
-        self._logger.info(f"SerialManager started on {self.serial.portstr} at {self.serial.baudrate} baud")
+        self.pipeline = SensorPipeline(robot.process_sensor_data, self.queue_size, self.overflow_policy)
+        self.pipeline.start()
+
+        if self.transport == "async" and not self._start_async_reader():
+            self._logger.warning("Event loop cannot watch the serial port, falling back to the thread transport")
+            self.transport = "thread"
+
+        if self.transport == "thread":
+            thread = threading.Thread(target=self.read_loop, daemon=True)
+            thread.start()
+
+        self._logger.info(f"SerialManager started on {self.serial.portstr} at {self.serial.baudrate} baud ({self.transport} transport)")
         asyncio.create_task(robot.start())
 
     def stop(self):
         self.running = False
+        if self._fd is not None:
+            self.loop.remove_reader(self._fd)
+            self._fd = None
+        if self.pipeline:
+            self.pipeline.stop()
+        self.writer.stop()
+        if self.recorder is not None:
+            self.recorder.stop()
         self._logger.info("SerialManager stopping...")
 
+    def attach_recorder(self, recorder):
+        """Capture every sensor packet read and every command packet written with a started TelemetryRecorder."""
+        self.recorder = recorder
+        self.writer.recorder = recorder
+
+    def _start_async_reader(self) -> bool:
+        """Register the serial file descriptor with the event loop. Returns False if that is not supported."""
+        try:
+            fd = self.serial.fileno()
+            self.loop.add_reader(fd, self._on_readable)
+        except (AttributeError, NotImplementedError, OSError):
+            # Windows serial ports and the proactor event loop have no pollable descriptor
+            return False
+
+        self._fd = fd
+        return True
+
+    def _on_readable(self):
+        """Event loop callback: read whatever is available straight into the framer and deliver packets."""
+        try:
+            size = os.readv(self._fd, [self._framer.writable(self._READ_CHUNK)])
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._logger.error(f"Serial read failed: {e}")
+            self.stop()
+            return
+
+        if size == 0:
+            self._logger.error("Serial port closed")
+            self.stop()
+            return
+
+        self._framer.commit(size)
+        self._deliver_packets()
+
+    def feed(self, data: bytes):
+        """Deliver bytes received by the connection ("feed" transport). Must be called from the event loop thread."""
+        self._framer.feed(data)
+        self._deliver_packets()
+
+    def _deliver_packets(self):
+        for packet in self._framer.packets_available():
+            packet = bytes(packet)
+            if self.recorder is not None:
+                self.recorder.record_sensor(packet)
+            self.pipeline.submit(packet)
+            self.ready.set()
+
     def read_loop(self):
         try:
             while self.running:
-                if self.serial.in_waiting:
-                    data = self.serial.read(self.serial.in_waiting)
-                    self._buffer.extend(data)
-
-                    while len(self._buffer) >= self._PACKET_LENGTH:
-                        start_index = self._buffer.find(bytes([self._START_BYTE]))
-                        if start_index == -1:
-                            self._logger.warning("Start byte not found, clearing buffer")
-                            self._buffer.clear()
-                            break
-                        elif start_index > 0:
-                            self._logger.warning(f"Discarding {start_index} bytes before start byte")
-                            del self._buffer[:start_index]
-
-                        if len(self._buffer) < self._PACKET_LENGTH:
-                            break
-
-                        packet = self._buffer[:self._PACKET_LENGTH]
-                        del self._buffer[:self._PACKET_LENGTH]
-
-                        self.loop.call_soon_threadsafe(
-                            lambda p=packet: asyncio.create_task(self.robot.process_sensor_data(p))
-                        )
+                waiting = self.serial.in_waiting
+                if waiting:
+                    size = self.serial.readinto(self._framer.writable(waiting)[:waiting])
+                    self._framer.commit(size)
+
+                    for packet in self._framer.packets_available():
+                        # The view is reused by the next read, so copy once to hand it to the loop thread
+                        packet = bytes(packet)
+                        if self.recorder is not None:
+                            self.recorder.record_sensor(packet)
+                        self.loop.call_soon_threadsafe(self.pipeline.submit, packet)
+                        if not self.ready.is_set():
+                            self.loop.call_soon_threadsafe(self.ready.set)
                 else:
                     time.sleep(0.001)
         except Exception as e:
             self._logger.exception(f"Exception in read_loop: {e}")
             self.running = False
 
+    def framing_stats(self) -> dict:
+        """Return the packet framer counters (packets/sec, discarded bytes, resyncs, checksum errors)."""
+        return self._framer.stats()
+
+    def pipeline_stats(self) -> dict:
+        """Return the sensor pipeline counters (queue depth, drops, processing latency)."""
+        return self.pipeline.stats() if self.pipeline else {}
+
+    def writer_stats(self) -> dict:
+        """Return the serial writer counters (write latency, bytes/sec, coalesced and suppressed motor packets)."""
+        return self.writer.stats()
+
+    def encode(self, data: Command) -> bytes:
+        """Encode a command into its serial packet, or None for command types without one."""
+        if data.command_type == CommandType.SENSOR:
+            return PacketCodec.encode_sensor_request(0 if self.protocol_version == 2 else None)
+        return PacketCodec.encode_command(data)
+
     def send(self, data: Command):
-        # Check if data is a string or pydantic model
-        if data.command_type == CommandType.MOTOR:
-            packet = struct.pack("<Bhh", 0x01, data.command.left_motor, data.command.right_motor)
-            checksum = sum(packet) & 0xFF
-            self.serial.write(packet + bytes([checksum]))
-        elif data.command_type == CommandType.LCD:
-            if len(data.command.line_1) > 16:
-                data.command.line_1 = data.command.line_1[:16]
-            if len(data.command.line_2) > 16:
-                data.command.line_2 = data.command.line_2[:16]
-
-            l1 = data.command.line_1.ljust(16)[:16].encode('utf-8')
-            l2 = data.command.line_2.ljust(16)[:16].encode('utf-8')
-
-            packet = struct.pack("<B16s16s", 0x02, l1, l2)
-            checksum = sum(packet) & 0xFF
-            self.serial.write(packet + bytes([checksum]))
-        elif data.command_type == CommandType.SENSOR:
-            packet = struct.pack("<B", 0x03)
-            checksum = sum(packet) & 0xFF
-            self.serial.write(packet + bytes([checksum]))
-        elif data.command_type == CommandType.STOP:
-            packet = struct.pack("<B", 0x04)
-            checksum = sum(packet) & 0xFF
-            self.serial.write(packet + bytes([checksum]))
+        """Encode a command and queue it on the serial writer. Never blocks on the serial port."""
+        packet = self.encode(data)
+        if packet is not None:
+            self.writer.submit(packet)
+
+    def send_packet(self, packet: bytes):
+        """Queue an already encoded packet (see PacketCodec) on the serial writer."""
+        self.writer.submit(packet)
+
+    def send_sensor_request(self, sequence: int = 0):
+        """
+        Request one sensor packet. Protocol v2 sends a sequenced request (0x05) whose reply echoes ``sequence``.
+
+        :param sequence: Sequence number 1-255 (v2 only, 0 is reserved for unsolicited replies)
+        """
+        if self.protocol_version == 2:
+            self.writer.submit(PacketCodec.encode_sensor_request(sequence))
+        else:
+            self.writer.submit(PacketCodec.SENSOR_REQUEST_PACKET)
@@ -0,0 +1,202 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from .Clock import Clock
+from .LatencyHistogram import LatencyHistogram
+
+
+class SerialWriter:
+    """
+    Background thread that owns all writes to the serial port, so coroutines never block on the UART.
+
+    Packets are written in priority order, by packet type:
+
+    1. STOP (0x04) jumps the queue and discards any motor packet that has not been sent yet
+    2. Sensor requests (0x03 / 0x05)
+    3. MOTOR (0x01) is a single latest-wins slot: a newer packet replaces an unsent older one, and a
+       packet identical to the last one written is skipped unless ``keepalive_interval`` seconds passed
+    4. LCD (0x02) and anything else
+
+    Keepalive: while no motor packet was written for ``keepalive_interval`` seconds, the last one is
+    written again, so a command held for seconds (a long CommandTimeline step) is refreshed and a
+    corrupted packet doesn't leave the motors in the wrong state. A STOP ends the keepalive until the
+    next motor packet.
+
+    With ``inline=True`` there is no thread and ``submit`` writes straight away, for in-process
+    connections that never block, such as a ``SimulatedArduino`` driven by a ``VirtualClock``; the
+    keepalive then runs as a ``clock.call_later`` timer.
+    """
+
+    def __init__(self, serial_port, keepalive_interval: float = 0.5, clock: Clock = None, inline: bool = False):
+        self.serial = serial_port
+        self.keepalive_interval = keepalive_interval
+        self.clock = clock or Clock()  # Paces the motor keepalive (on the event loop when inline)
+        self.inline = inline
+        self.write_latency = LatencyHistogram()  # Submit to write complete, in seconds
+        self.write_time = LatencyHistogram()  # Duration of serial.write() alone, in seconds
+        self._condition = threading.Condition()
+        self._stop_pending = None  # (submit time, packet)
+        self._sensor_queue = deque()
+        self._motor_pending = None  # (submit time, packet), replaced by newer motor packets
+        self._low_queue = deque()
+        self._last_motor = None  # Last motor packet written, for duplicate suppression
+        self._last_motor_time = 0.0
+        self._keepalive_timer = None  # Inline mode only, clock.call_later handle
+        self._thread = None
+        self.on_written = None  # Optional callback(packet, perf_counter time), called from the writer thread
+        self.recorder = None  # Optional TelemetryRecorder capturing every written packet
+        self._logger = logging.getLogger("SerialWriter")
+        self.running = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.packets_written = 0
+        self.bytes_written = 0
+        self.motor_coalesced = 0  # Motor packets replaced before being written
+        self.motor_suppressed = 0  # Motor packets skipped as duplicates of the last write
+        self.motor_cancelled = 0  # Motor packets discarded by a STOP
+        self.motor_keepalives = 0  # Motor packets resent because none was written for keepalive_interval
+        self.write_errors = 0
+        self.write_latency.reset()
+        self.write_time.reset()
+        self._stats_since = time.monotonic()
+
+    def start(self):
+        self.running = True
+        if self.inline:
+            return
+        self._thread = threading.Thread(target=self._run, name="SerialWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop the thread once already queued packets are written."""
+        with self._condition:
+            self.running = False
+            self._condition.notify()
+        if self._keepalive_timer is not None:
+            self._keepalive_timer.cancel()
+            self._keepalive_timer = None
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def submit(self, packet: bytes):
+        """Queue a complete packet (including checksum) for writing. Safe to call from any thread."""
+        now = time.perf_counter()
+        packet_type = packet[0]
+        with self._condition:
+            if packet_type == 0x04:
+                if self._motor_pending is not None:
+                    self._motor_pending = None
+                    self.motor_cancelled += 1
+                self._stop_pending = (now, packet)
+            elif packet_type == 0x01:
+                if self._motor_pending is not None:
+                    self.motor_coalesced += 1
+                self._motor_pending = (now, packet)
+            elif packet_type in (0x03, 0x05):
+                self._sensor_queue.append((now, packet))
+            else:
+                self._low_queue.append((now, packet))
+            self._condition.notify()
+
+        if self.inline:
+            while True:
+                with self._condition:
+                    item = self._next_packet()
+                if item is None:
+                    return
+                self._write(*item)
+
+    def _next_packet(self):
+        """Pop the highest priority pending packet. Must hold the condition lock."""
+        if self._stop_pending is not None:
+            item, self._stop_pending = self._stop_pending, None
+            self._last_motor = None  # The next motor packet must go out even if it repeats the last one
+            return item
+        if self._sensor_queue:
+            return self._sensor_queue.popleft()
+        if self._motor_pending is not None:
+            item, self._motor_pending = self._motor_pending, None
+            return item
+        if self._low_queue:
+            return self._low_queue.popleft()
+        return None
+
+    def _keepalive_due(self) -> float:
+        """Seconds until the last motor packet must be resent, or None without one (writer thread only)."""
+        if self._last_motor is None:
+            return None
+        return max(0.0, self._last_motor_time + self.keepalive_interval - self.clock.monotonic())
+
+    def _run(self):
+        while True:
+            with self._condition:
+                item = self._next_packet()
+                while item is None and self.running:
+                    due = self._keepalive_due()
+                    if due == 0.0:
+                        self.motor_keepalives += 1
+                        item = (time.perf_counter(), self._last_motor)
+                        break
+                    self._condition.wait(due)
+                    item = self._next_packet()
+                if item is None:
+                    return
+            self._write(*item)
+
+    def _keepalive(self):
+        """Inline mode: resend the last motor packet if nothing newer was written meanwhile."""
+        self._keepalive_timer = None
+        if self.running and self._keepalive_due() == 0.0:
+            self.motor_keepalives += 1
+            self._write(time.perf_counter(), self._last_motor)
+
+    def _write(self, submitted: float, packet: bytes):
+        if packet[0] == 0x01:
+            now = self.clock.monotonic()
+            if packet == self._last_motor and now - self._last_motor_time < self.keepalive_interval:
+                self.motor_suppressed += 1
+                return
+            self._last_motor = packet
+            self._last_motor_time = now
+            if self.inline:
+                if self._keepalive_timer is not None:
+                    self._keepalive_timer.cancel()
+                self._keepalive_timer = self.clock.call_later(self.keepalive_interval, self._keepalive)
+
+        started = time.perf_counter()
+        try:
+            self.serial.write(packet)
+        except Exception as e:
+            self.write_errors += 1
+            self._logger.error(f"Serial write failed: {e}")
+            return
+
+        written = time.perf_counter()
+        self.packets_written += 1
+        self.bytes_written += len(packet)
+        self.write_latency.observe(written - submitted)
+        self.write_time.observe(written - started)
+        if self.recorder is not None:
+            self.recorder.record_command(packet)
+        if self.on_written is not None:
+            self.on_written(packet, written)
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._stats_since
+        return {
+            "packets_written": self.packets_written,
+            "bytes_written": self.bytes_written,
+            "bytes_per_sec": self.bytes_written / elapsed if elapsed > 0 else 0.0,
+            "motor_coalesced": self.motor_coalesced,
+            "motor_suppressed": self.motor_suppressed,
+            "motor_cancelled": self.motor_cancelled,
+            "motor_keepalives": self.motor_keepalives,
+            "write_errors": self.write_errors,
+            "pending": len(self._sensor_queue) + len(self._low_queue)
+                       + (self._motor_pending is not None) + (self._stop_pending is not None),
+            "write_latency": self.write_latency.snapshot(),
+            "write_time": self.write_time.snapshot(),
+        }
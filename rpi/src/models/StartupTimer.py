@@ -0,0 +1,61 @@
+import contextlib
+import logging
+import time
+
+
+class StartupTimer:
+    """
+    When each startup phase began and ended, in seconds since the process started. Phases may overlap:
+    the web server and AI stack load in a worker thread while the serial link comes up.
+
+    :param started: ``time.perf_counter()`` at process start, defaults to now
+    """
+
+    def __init__(self, started: float = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = {}  # name -> [began, ended or None], in order of beginning
+        self._logger = logging.getLogger("Startup")
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def mark(self, name: str):
+        """Record a phase that began with the process and ended now, e.g. the imports."""
+        self.phases[name] = [0.0, None]
+        self.end(name)
+
+    def begin(self, name: str):
+        self.phases[name] = [self.elapsed(), None]
+
+    def end(self, name: str):
+        self.phases[name][1] = self.elapsed()
+        self._logger.info(f"{name} ready at {self.phases[name][1]:.3f} s")
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time the block as phase ``name``; works around awaits too."""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    async def timed(self, name: str, awaitable):
+        """Await ``awaitable`` as phase ``name``, e.g. in a task running in parallel with other phases."""
+        with self.phase(name):
+            return await awaitable
+
+    def duration(self, name: str) -> float:
+        began, ended = self.phases[name]
+        return (ended if ended is not None else self.elapsed()) - began
+
+    def report(self) -> str:
+        lines = ["Startup phases (seconds since process start):"]
+        for name, (began, ended) in self.phases.items():
+            ready = f"{ended:7.3f}" if ended is not None else "   ... "
+            lines.append(f"  {name:<12} {began:7.3f} -> {ready}  ({self.duration(name):.3f} s)")
+        return "\n".join(lines)
+
+    def stats(self) -> dict:
+        return {name: {"began": began, "ended": ended, "duration": self.duration(name)}
+                for name, (began, ended) in self.phases.items()}
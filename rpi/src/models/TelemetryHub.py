@@ -0,0 +1,286 @@
+import logging
+import math
+
+from .Clock import Clock
+
+
+class TelemetryHub:
+    """
+    Per-client telemetry subscriptions for the Socket.IO server.
+
+    Clients subscribe to topics at their own rate. Clients that asked for the same topic at the same
+    rate share a Socket.IO room, so each payload is built and serialized once per (topic, rate) pair,
+    not once per client. Sensor samples are aggregated between emits (min/max/mean/last per field), so
+    a slow subscriber still sees spikes that happened between its updates.
+
+    Clients without subscriptions (never subscribed, or unsubscribed from everything) keep the original
+    behaviour: the full ``sensor_data`` payload every
+    ``legacy_interval`` seconds and every ``active_command`` event. The ``sensor_data`` payload is only
+    built while at least one such client is connected.
+
+    Topic payloads are emitted as ``telemetry`` events::
+
+        {"topic": "battery", "interval": 1.0, "count": 10, "time": 1700000000.0,
+         "fields": {"battery": {"min": 86, "max": 87, "mean": 86.5, "last": 86}}}
+
+    :param socketio: socketio.AsyncServer used to emit, may be None until clients can connect
+    :param legacy_interval: Seconds between full sensor_data emits to legacy clients
+    :param clock: Clock for emit scheduling and payload timestamps
+    """
+
+    LEGACY_ROOM = "legacy"
+
+    # Sensor topics and the SensorRecord fields they aggregate
+    SENSOR_TOPICS = {
+        "ultrasonic": ("distance",),
+        "imu": ("acceleration_x", "acceleration_y", "acceleration_z",
+                "gyroscope_x", "gyroscope_y", "gyroscope_z", "temperature"),
+        "ir": ("ir_front", "ir_back", "cliff"),
+        "battery": ("battery",),
+    }
+    TOPICS = tuple(SENSOR_TOPICS) + ("active_command",)
+
+    MIN_INTERVAL = 0.05  # Fastest rate a client can negotiate (20 Hz)
+    MAX_INTERVAL = 60.0
+
+    def __init__(self, socketio, legacy_interval: float = 0.1, clock: Clock = None):
+        self.socketio = socketio
+        self.clock = clock or Clock()
+        self.legacy_interval = legacy_interval
+        self._legacy = set()  # sids without subscriptions
+        self._subscriptions = {}  # sid -> {topic: interval}
+        self._groups = {}  # (topic, interval) -> _TopicGroup
+        self._last_legacy_emit = 0.0
+        self._logger = logging.getLogger("TelemetryHub")
+        self.emits = 0
+
+    # ---- Client management ----
+
+    async def connect(self, sid):
+        self._legacy.add(sid)
+        await self.socketio.enter_room(sid, self.LEGACY_ROOM)
+
+    async def disconnect(self, sid):
+        # Socket.IO already removed the sid from its rooms, only the bookkeeping is left
+        self._legacy.discard(sid)
+        for topic, interval in self._subscriptions.pop(sid, {}).items():
+            self._leave_group(sid, topic, interval)
+
+    async def subscribe(self, sid, topics) -> dict:
+        """
+        Subscribe a client to topics. The client leaves the legacy broadcast while it has at least one
+        subscription.
+
+        :param topics: {topic: rate in Hz} or a list of topics (subscribed at 10 Hz). A rate of 0
+                       unsubscribes the topic.
+        :return: The client's subscriptions after negotiation, {topic: rate in Hz}
+        :raises ValueError: On a malformed request or an unknown topic, before anything changed
+        """
+        topics = self.parse_topics(topics)
+
+        subscriptions = self._subscriptions.setdefault(sid, {})
+        for topic, rate in topics.items():
+            if topic in subscriptions:
+                await self._unsubscribe_topic(sid, topic)
+            if not rate or rate <= 0:
+                continue
+
+            interval = self.negotiate_interval(rate)
+            subscriptions[topic] = interval
+            group = self._groups.get((topic, interval))
+            if group is None:
+                group = self._groups[(topic, interval)] = _TopicGroup(topic, interval, self.SENSOR_TOPICS.get(topic, ()))
+            group.members.add(sid)
+            await self.socketio.enter_room(sid, group.room)
+
+        await self._update_legacy(sid)
+        return self.subscriptions(sid)
+
+    @classmethod
+    def parse_topics(cls, topics) -> dict:
+        """Validate a subscribe request's topics, see ``subscribe``. Returns {topic: rate in Hz}."""
+        if isinstance(topics, (list, tuple)):
+            if not all(isinstance(topic, str) for topic in topics):
+                raise ValueError("topics must be a list of topic names")
+            topics = {topic: 10 for topic in topics}
+        if not isinstance(topics, dict):
+            raise ValueError("topics must be an object of {topic: rate in Hz} or a list of topics")
+        for topic, rate in topics.items():
+            if not isinstance(topic, str):
+                raise ValueError(f"Invalid topic: {topic!r}")
+            if rate is not None and (isinstance(rate, bool) or not isinstance(rate, (int, float)) or not math.isfinite(rate)):
+                raise ValueError(f"Invalid rate for {topic}: {rate!r}")
+        unknown = [topic for topic in topics if topic not in cls.TOPICS]
+        if unknown:
+            raise ValueError(f"Unknown topics {', '.join(unknown)}, expected some of {', '.join(cls.TOPICS)}")
+        return topics
+
+    async def unsubscribe(self, sid, topics=None) -> dict:
+        """Unsubscribe from the given topics, or from all of them when topics is None."""
+        subscriptions = self._subscriptions.get(sid, {})
+        for topic in list(subscriptions if topics is None else topics):
+            if topic in subscriptions:
+                await self._unsubscribe_topic(sid, topic)
+        await self._update_legacy(sid)
+        return self.subscriptions(sid)
+
+    async def _update_legacy(self, sid):
+        """Put a client without subscriptions (back) in the legacy broadcast, so it never ends up without sensor data."""
+        if self._subscriptions.get(sid):
+            if sid in self._legacy:
+                self._legacy.discard(sid)
+                await self.socketio.leave_room(sid, self.LEGACY_ROOM)
+        else:
+            self._subscriptions.pop(sid, None)
+            if sid not in self._legacy:
+                self._legacy.add(sid)
+                await self.socketio.enter_room(sid, self.LEGACY_ROOM)
+
+    async def _unsubscribe_topic(self, sid, topic):
+        interval = self._subscriptions[sid].pop(topic)
+        group = self._groups.get((topic, interval))
+        if group is not None:
+            await self.socketio.leave_room(sid, group.room)
+        self._leave_group(sid, topic, interval)
+
+    def _leave_group(self, sid, topic, interval):
+        group = self._groups.get((topic, interval))
+        if group is None:
+            return
+        group.members.discard(sid)
+        if not group.members:
+            del self._groups[(topic, interval)]  # Nobody listens, stop aggregating
+
+    def subscriptions(self, sid) -> dict:
+        return {topic: 1 / interval for topic, interval in self._subscriptions.get(sid, {}).items()}
+
+    @classmethod
+    def negotiate_interval(cls, rate: float) -> float:
+        """Clamp a requested rate to the supported range and return it as an interval in seconds (ms precision)."""
+        interval = min(cls.MAX_INTERVAL, max(cls.MIN_INTERVAL, 1 / float(rate)))
+        return round(interval, 3)
+
+    # ---- Publishing ----
+
+    async def publish_sensor_data(self, sensor_data, extra: dict = None):
+        """
+        Fold a sample into every subscribed window and emit the windows that are due.
+
+        :param sensor_data: SensorRecord sample, only converted to a SensorData for legacy clients
+        :param extra: Additional keys for the legacy sensor_data payload (e.g. rolling stats)
+        """
+        now = self.clock.monotonic()
+        if self._groups:
+            values = None
+            for group in list(self._groups.values()):
+                if group.fields:
+                    if values is None:
+                        values = self._sensor_values(sensor_data)
+                    group.add(values)
+                    if now >= group.next_due:
+                        await self._emit_group(group, now)
+
+        if self._legacy and now - self._last_legacy_emit >= self.legacy_interval:
+            self._last_legacy_emit = now
+            payload = sensor_data.model_dump()
+            if extra:
+                payload.update(extra)
+            await self.socketio.emit('sensor_data', payload, room=self.LEGACY_ROOM)
+            self.emits += 1
+
+    async def publish_active_command(self, payload: dict):
+        """Send an active_command event to legacy clients and active_command subscribers."""
+        rooms = [group.room for group in self._groups.values() if group.topic == "active_command"]
+        if self._legacy:
+            rooms.append(self.LEGACY_ROOM)
+        if rooms:
+            await self.socketio.emit('active_command', payload, room=rooms)
+            self.emits += 1
+
+    async def _emit_group(self, group, now: float):
+        group.next_due = now + group.interval
+        if not group.count:
+            return
+        payload = group.flush()
+        payload["time"] = self.clock.time()
+        await self.socketio.emit('telemetry', payload, room=group.room)
+        self.emits += 1
+
+    @staticmethod
+    def _sensor_values(sensor_data) -> dict:
+        return {
+            "distance": sensor_data.distance,
+            "acceleration_x": sensor_data.acceleration_x,
+            "acceleration_y": sensor_data.acceleration_y,
+            "acceleration_z": sensor_data.acceleration_z,
+            "gyroscope_x": sensor_data.gyroscope_x,
+            "gyroscope_y": sensor_data.gyroscope_y,
+            "gyroscope_z": sensor_data.gyroscope_z,
+            "temperature": sensor_data.temperature,
+            "ir_front": int(sensor_data.ir_front),
+            "ir_back": int(sensor_data.ir_back),
+            "cliff": int(sensor_data.check_cliff()),
+            "battery": sensor_data.battery,
+        }
+
+    def client_count(self) -> int:
+        return len(self._legacy) + len(self._subscriptions)
+
+    def stats(self) -> dict:
+        return {
+            "legacy_clients": len(self._legacy),
+            "subscribed_clients": len(self._subscriptions),
+            "groups": {group.room: len(group.members) for group in self._groups.values()},
+            "emits": self.emits,
+        }
+
+
+class _TopicGroup:
+    """Clients subscribed to one topic at one rate, with the aggregation window they share."""
+
+    def __init__(self, topic: str, interval: float, fields: tuple):
+        self.topic = topic
+        self.interval = interval
+        self.fields = fields
+        self.room = f"{topic}@{int(interval * 1000)}ms"
+        self.members = set()
+        self.next_due = 0.0  # Emit the first sample straight away
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self._min = {}
+        self._max = {}
+        self._sum = dict.fromkeys(self.fields, 0.0)
+        self._last = {}
+
+    def add(self, values: dict):
+        self.count += 1
+        first = self.count == 1
+        for field in self.fields:
+            value = values[field]
+            self._sum[field] += value
+            self._last[field] = value
+            if first or value < self._min[field]:
+                self._min[field] = value
+            if first or value > self._max[field]:
+                self._max[field] = value
+
+    def flush(self) -> dict:
+        count = self.count
+        payload = {
+            "topic": self.topic,
+            "interval": self.interval,
+            "count": count,
+            "fields": {
+                field: {
+                    "min": self._min[field],
+                    "max": self._max[field],
+                    "mean": self._sum[field] / count,
+                    "last": self._last[field],
+                }
+                for field in self.fields
+            },
+        }
+        self._reset()
+        return payload
@@ -0,0 +1,119 @@
+import mmap
+import os
+
+import numpy as np
+
+from .SensorBatch import SensorBatch, SENSOR_PACKET_DTYPE
+from .TelemetryRecorder import TelemetryRecorder, PAYLOAD_SIZE, segment_paths, _HEADER, _MAGIC, _VERSION
+
+# TelemetryRecorder's 48 byte record as a structured dtype
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<i8"),  # time.monotonic_ns() when the packet was read or written
+    ("kind", "u1"),  # TelemetryRecorder.SENSOR or TelemetryRecorder.COMMAND
+    ("length", "u1"),  # Bytes of payload that belong to the packet
+    ("payload", "u1", (PAYLOAD_SIZE,)),
+])
+
+
+class TelemetryLog:
+    """
+    Reader for segments written by ``TelemetryRecorder``.
+
+    Each segment is memory-mapped and exposed as a NumPy structured array (``RECORD_DTYPE``) over the
+    mapping, so opening even a large log copies nothing; only selecting records (e.g. ``sensor_batch``)
+    does. Views stay valid until ``close``. A record cut short by a crash at the end of a segment is
+    ignored.
+
+    :param directory: Directory holding the ``telemetry-*.bin`` segments
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._maps = []
+        self.segments = []  # One structured array per segment, in recording order
+        self.start_times = []  # (wall clock ns, monotonic ns) at the start of each segment
+        for path in self.segment_paths(directory):
+            self._open(path)
+
+    segment_paths = staticmethod(segment_paths)
+
+    def _open(self, path: str):
+        size = os.path.getsize(path)
+        if size < RECORD_DTYPE.itemsize:
+            return  # Header not written yet
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, record_size, _, wall_ns, monotonic_ns = _HEADER.unpack_from(mapping, 0)
+        if magic != _MAGIC or record_size != RECORD_DTYPE.itemsize:
+            mapping.close()
+            raise ValueError(f"{path} is not a version {_VERSION} telemetry segment")
+
+        count = size // record_size - 1
+        self._maps.append(mapping)
+        self.segments.append(np.frombuffer(mapping, dtype=RECORD_DTYPE, count=count, offset=record_size))
+        self.start_times.append((wall_ns, monotonic_ns))
+
+    def __len__(self):
+        return sum(len(segment) for segment in self.segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.segments = []
+        for mapping in self._maps:
+            try:
+                mapping.close()
+            except BufferError:
+                pass  # A caller still holds a view; the mapping is released with it
+        self._maps = []
+
+    def records(self, kind: int = None) -> np.ndarray:
+        """
+        All records, optionally only SENSOR or COMMAND records.
+
+        This concatenates the segments into one new array, so it copies every record; iterate
+        ``segments`` for the zero-copy views over each memory-mapped segment.
+        """
+        if not self.segments:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        records = np.concatenate(self.segments)
+        if kind is not None:
+            records = records[records["kind"] == kind]
+        return records
+
+    def wall_time(self, timestamp) -> np.ndarray:
+        """Convert recorded monotonic timestamps to Unix time in seconds, using the first segment's header."""
+        wall_ns, monotonic_ns = self.start_times[0]
+        return (np.asarray(timestamp, dtype=np.int64) - monotonic_ns + wall_ns) / 1e9
+
+    def sensor_packets(self) -> tuple:
+        """
+        Recorded sensor packets as ``SENSOR_PACKET_DTYPE`` rows, in recording order.
+
+        Protocol v2 packets have their sequence number removed (and the checksum adjusted) so both
+        versions decode the same way.
+
+        :return: (timestamps, packets)
+        """
+        records = self.records(TelemetryRecorder.SENSOR)
+        size = SENSOR_PACKET_DTYPE.itemsize
+        records = records[(records["length"] == size) | (records["length"] == size + 1)]
+        payload = records["payload"]
+        packets = np.ascontiguousarray(payload[:, :size])
+
+        v2 = records["length"] == size + 1
+        if v2.any():
+            # Same layout minus the sequence byte, which the checksum also covered
+            packets[v2, 1:] = payload[v2, 2:size + 1]
+            packets[v2, 0] = 0xAA
+            packets[v2, -1] -= payload[v2, 1]
+        return records["timestamp"], packets.view(SENSOR_PACKET_DTYPE).reshape(-1)
+
+    def sensor_batch(self) -> SensorBatch:
+        """Decode every recorded sensor packet in one vectorized pass."""
+        return SensorBatch.from_bytes(self.sensor_packets()[1].tobytes())
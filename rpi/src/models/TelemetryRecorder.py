@@ -0,0 +1,181 @@
+import glob
+import logging
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+# Every record is 48 bytes: monotonic timestamp, kind, packet length and the packet, zero padded.
+# 38 payload bytes fit the largest packet on the link (a 34 byte LCD packet). The reader maps the
+# same layout as a NumPy dtype (RECORD_DTYPE in TelemetryLog.py); the writer only needs struct, so the
+# recorder doesn't import NumPy on the robot's startup path.
+_RECORD = struct.Struct("<qBB")  # timestamp (time.monotonic_ns()), kind, packet length
+RECORD_SIZE = 48
+PAYLOAD_SIZE = RECORD_SIZE - _RECORD.size
+
+# The segment header takes the space of one record, so records stay aligned for np.frombuffer
+_HEADER = struct.Struct("<8sHHI2q")  # magic, version, record size, reserved, wall clock ns, monotonic ns
+_MAGIC = b"TANKLOG\x00"
+_VERSION = 1
+
+
+def segment_paths(directory: str) -> list:
+    """Segment files in ``directory`` in recording order."""
+    return sorted(glob.glob(os.path.join(directory, "telemetry-*.bin")))
+
+
+class TelemetryRecorder:
+    """
+    Append-only capture of every raw sensor packet read and every command packet written.
+
+    ``record`` only appends a tuple to a deque under a short lock, so it is safe to call on the packet path
+    and from the writer thread; a background thread packs the records into fixed-size binary records and appends them
+    to segment files in ``directory``. A segment is closed and a new one started once it reaches
+    ``segment_size`` bytes. If the disk can't keep up, records beyond ``max_pending`` are dropped and
+    counted instead of growing the queue.
+
+    Segments are read back with ``TelemetryLog`` (``src.models.TelemetryLog``, needs NumPy).
+
+    :param directory: Directory for the ``telemetry-*.bin`` segments, created if needed
+    :param segment_size: Bytes per segment before rotating
+    :param max_segments: Keep only the newest segments, None keeps everything
+    :param max_pending: Records waiting for the writer before new ones are dropped
+    """
+
+    SENSOR = 0  # Sensor packet read from the Arduino
+    COMMAND = 1  # Command packet written to the Arduino
+    RECORD_SIZE = RECORD_SIZE
+
+    def __init__(self, directory: str, segment_size: int = 16 * 1024 * 1024, max_segments: int = None,
+                 max_pending: int = 65536):
+        if segment_size < 2 * self.RECORD_SIZE:
+            raise ValueError("Segment size must hold at least one record")
+
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._file = None
+        self._segment_bytes = 0
+        self._segment_index = 0
+        self._logger = logging.getLogger("TelemetryRecorder")
+        self.running = False
+        self.records_written = 0
+        self.bytes_written = 0
+        self.dropped = 0  # Records discarded because the writer fell behind
+        self.segments = 0  # Segments started by this recorder
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        existing = segment_paths(self.directory)
+        if existing:
+            # Continue the numbering of a previous run so segments sort in recording order
+            self._segment_index = int(os.path.basename(existing[-1])[len("telemetry-"):-len(".bin")]) + 1
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="TelemetryRecorder", daemon=True)
+        self._thread.start()
+        self._logger.info(f"Recording telemetry to {self.directory}")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the thread once pending records are written."""
+        with self._condition:
+            self.running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def record(self, kind: int, packet: bytes, timestamp: int = None):
+        """
+        Queue one packet. Safe to call from any thread, never blocks on the disk.
+
+        :param kind: SENSOR or COMMAND
+        :param packet: The raw packet, at most PAYLOAD_SIZE (38) bytes
+        :param timestamp: ``time.monotonic_ns()`` of the read or write, defaults to now
+        """
+        if not self.running:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        record = (timestamp if timestamp is not None else time.monotonic_ns(), kind, packet)
+        # Append and notify under the lock: the event loop and the SerialWriter thread both record, and a
+        # notify sent between the writer's empty check and its wait would be lost
+        with self._condition:
+            self._pending.append(record)
+            self._condition.notify()
+
+    def record_sensor(self, packet: bytes):
+        self.record(self.SENSOR, packet)
+
+    def record_command(self, packet: bytes):
+        """Called by the SerialWriter thread right after a packet is written."""
+        self.record(self.COMMAND, packet)
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while not self._pending and self.running:
+                        self._condition.wait()
+                    if not self._pending and not self.running:
+                        break
+                batch = [self._pending.popleft() for _ in range(len(self._pending))]
+                self._write(batch)
+        except Exception as e:
+            self._logger.exception(f"Telemetry recording failed: {e}")
+            self.running = False
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, batch: list):
+        buffer = bytearray(len(batch) * self.RECORD_SIZE)
+        offset = 0
+        for timestamp, kind, packet in batch:
+            _RECORD.pack_into(buffer, offset, timestamp, kind, len(packet))
+            buffer[offset + _RECORD.size:offset + _RECORD.size + len(packet)] = packet
+            offset += self.RECORD_SIZE
+
+        view = memoryview(buffer)
+        while view:
+            if self._file is None or self._segment_bytes >= self.segment_size:
+                self._rotate()
+            # Split the batch on a record boundary so no segment grows past segment_size
+            room = (self.segment_size - self._segment_bytes) // self.RECORD_SIZE * self.RECORD_SIZE
+            chunk = view[:room]
+            self._file.write(chunk)
+            self._segment_bytes += len(chunk)
+            view = view[room:]
+        self._file.flush()  # Make the records visible to readers of the live segment
+        self.records_written += len(batch)
+        self.bytes_written += len(buffer)
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self.directory, f"telemetry-{self._segment_index:06d}.bin")
+        self._segment_index += 1
+        self._file = open(path, "wb")
+        header = bytearray(self.RECORD_SIZE)
+        _HEADER.pack_into(header, 0, _MAGIC, _VERSION, self.RECORD_SIZE, 0, time.time_ns(), time.monotonic_ns())
+        self._file.write(header)
+        self._segment_bytes = len(header)
+        self.segments += 1
+
+        if self.max_segments is not None:
+            for old in segment_paths(self.directory)[:-self.max_segments]:
+                os.remove(old)
+
+    def stats(self) -> dict:
+        return {
+            "records_written": self.records_written,
+            "bytes_written": self.bytes_written,
+            "dropped": self.dropped,
+            "pending": len(self._pending),
+            "segments": self.segments,
+        }
@@ -1,4 +1,12 @@
+from .Clock import Clock, VirtualClock
 from .LCDCommand import LCDCommand
+from .PacketCodec import PacketCodec
+from .PacketFramer import PacketFramer
+from .LatencyHistogram import LatencyHistogram
+from .Metrics import Metrics, LoopLagMonitor
+from .StartupTimer import StartupTimer
+from .SensorPipeline import SensorPipeline
+from .SerialWriter import SerialWriter
 from .SerialManager import SerialManager
 from .MotorCommand import MotorCommand
 from .CommandTypeEnum import CommandType
@@ -6,5 +14,15 @@ from .Command import Command
 from .UltrasonicSensor import UltrasonicSensor
 from .IMU import IMUData
 from .SensorData import SensorData
+from .SensorRecord import SensorRecord
+# The NumPy tools for offline work (SensorBatch, DriveMixer, TelemetryLog) and the emulator are imported
+# from their own modules, so importing the package stays free of NumPy on the startup path
+from .TelemetryRecorder import TelemetryRecorder
+from .RollingStats import RollingWindow, SensorStats
+from .TelemetryHub import TelemetryHub
+from .CommandScheduler import CommandScheduler, CommandPriority
+from .CommandTimeline import CommandTimeline
+from .SafetyReflex import SafetyReflex
 from .CommandResponse import AICommand
+from .QueryManager import QueryManager
 from .Robot import Robot
\ No newline at end of file
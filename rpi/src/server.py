@@ -1,36 +1,170 @@
+import asyncio
 import logging
 
 import socketio
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 import uvicorn
 
-from .models import Command
+from .models import CommandPriority, Metrics, LoopLagMonitor
+from .ai import plan_cache, intent_compiler
+
 
 sio = socketio.AsyncServer(cors_allowed_origins='*', async_mode='asgi')
-app = FastAPI()
-app = socketio.ASGIApp(sio, other_asgi_app=app)
+api = FastAPI()  # Plain HTTP routes, e.g. /metrics
+app = socketio.ASGIApp(sio, other_asgi_app=api)
 logger = logging.getLogger("SocketServer")
+metrics = Metrics()
+loop_lag = LoopLagMonitor(metrics.histogram("event_loop_lag_seconds", "How late the event loop wakes up a sleeping task"))
 
 def setup_routes(robot):
+    register_robot_metrics(robot)
+    handler_seconds = "socketio_handler_seconds"
+    handler_help = "Time spent in Socket.IO event handlers"
+
     @sio.on('joystick_input')
+    @metrics.timed(handler_seconds, handler_help, labels={"handler": "joystick_input"})
     async def on_joystick(sid, data):
         await robot.handle_joystick_input(data)
 
     @sio.on('query')
+    @metrics.timed(handler_seconds, handler_help, labels={"handler": "query"})
     async def on_query(sid, data):
         await robot.handle_query(data["query"])
         
     @sio.on('stop')
+    @metrics.timed(handler_seconds, handler_help, labels={"handler": "stop"})
     async def on_stop(sid, data):
-        await robot.send_safe_command(Command.stop())
+        robot.emergency_stop()
+
+    @sio.on('subscribe')
+    async def on_subscribe(sid, data=None):
+        # data: {"topics": {"battery": 1, "imu": 10}}, rates in Hz; the ack returns the negotiated rates,
+        # or {"error": ...} for a malformed request
+        if not isinstance(data, dict) or "topics" not in data:
+            return {"error": 'Expected {"topics": {topic: rate in Hz}}'}
+        try:
+            return await robot.telemetry.subscribe(sid, data["topics"])
+        except ValueError as e:
+            logger.warning(f"Rejected subscribe from {sid}: {e}")
+            return {"error": str(e)}
+
+    @sio.on('unsubscribe')
+    async def on_unsubscribe(sid, data=None):
+        topics = data.get("topics") if isinstance(data, dict) else None
+        if topics is not None and not (isinstance(topics, (list, tuple, dict))
+                                       and all(isinstance(topic, str) for topic in topics)):
+            return {"error": "topics must be a list of topic names"}
+        return await robot.telemetry.unsubscribe(sid, topics)
 
     @sio.event
     async def connect(sid, environ):
         logger.info(f"Client connected: {sid}")
+        await robot.telemetry.connect(sid)
+
+    @sio.event
+    async def disconnect(sid, *args):
+        logger.info(f"Client disconnected: {sid}")
+        await robot.telemetry.disconnect(sid)
+
+    @api.get('/metrics')
+    async def get_metrics():
+        return Response(metrics.render(), media_type=Metrics.CONTENT_TYPE)
+
+
+def register_robot_metrics(robot):
+    """Expose the statistics the serial, safety and telemetry components already keep."""
+    serial = robot.serial
+    writer = serial.writer
+
+    metrics.counter("serial_packets_total", "Sensor packets received", lambda: serial.framing_stats()["packets"])
+    metrics.counter("serial_checksum_errors_total", "Sensor packets with a bad checksum", lambda: serial.framing_stats()["checksum_errors"])
+    metrics.counter("serial_resyncs_total", "Times the framer lost packet sync", lambda: serial.framing_stats()["resyncs"])
+    metrics.counter("serial_bytes_discarded_total", "Bytes skipped while resyncing", lambda: serial.framing_stats()["bytes_discarded"])
+    metrics.counter("serial_packets_written_total", "Packets written to the Arduino", lambda: writer.packets_written)
+    metrics.counter("serial_motor_keepalives_total", "Motor packets resent as keepalive", lambda: writer.motor_keepalives)
+    metrics.counter("serial_write_errors_total", "Failed serial writes", lambda: writer.write_errors)
+    metrics.histogram("serial_write_seconds", "Duration of a single serial write", writer.write_time)
+    metrics.histogram("serial_write_latency_seconds", "Packet submit to serial write complete", writer.write_latency)
 
+    pipeline = serial.pipeline  # Created by SerialManager.start()
+    if pipeline is not None:
+        metrics.histogram("process_sensor_data_seconds", "Time spent in Robot.process_sensor_data", pipeline.process_time)
+        metrics.histogram("sensor_pipeline_latency_seconds", "Packet read to processing complete", pipeline.latency)
+    metrics.gauge("sensor_pipeline_depth", "Sensor packets waiting to be processed", lambda: serial.pipeline_stats()["depth"])
 
-async def run_socket_server(robot):
+    metrics.histogram("safety_reaction_seconds", "Sensor packet arrival to reflex packet written", robot.safety.reaction_latency)
+    for reflex in robot.safety.triggered:
+        metrics.counter("safety_reflexes_total", "Safety reflexes triggered", lambda reflex=reflex: robot.safety.triggered[reflex], labels={"reflex": reflex})
+    for priority, histogram in robot.scheduler.queue_delay.items():
+        labels = {"priority": str(priority)}
+        metrics.histogram("command_queue_delay_seconds", "Command submit to first write, by priority class", histogram, labels)
+
+    queries = robot.queries
+    metrics.histogram("ai_first_command_seconds", "AI query to its first command ready to run", queries.first_command)
+    metrics.histogram("ai_full_plan_seconds", "AI query to its complete plan", queries.plan_time)
+    metrics.histogram("ai_execution_seconds", "AI plan start to end of execution", queries.execution_time)
+    metrics.histogram("ai_step_lateness_seconds", "AI plan step start behind its deadline", robot.step_lateness)
+    metrics.gauge("ai_queries_in_flight", "AI queries being planned or executed", queries.in_flight)
+    metrics.counter("ai_queries_total", "AI queries submitted", lambda: queries.submitted)
+    metrics.counter("ai_queries_deduplicated_total", "AI queries that joined an identical query in flight", lambda: queries.deduplicated)
+    metrics.counter("ai_queries_completed_total", "AI plans run to completion", lambda: queries.completed)
+    metrics.counter("ai_queries_failed_total", "AI queries that failed", lambda: queries.failed)
+    for stage in ("plan", "execution"):
+        metrics.counter("ai_query_timeouts_total", "AI queries past their deadline, by stage",
+                        lambda stage=stage: getattr(queries, f"{stage}_timeouts"), {"stage": stage})
+    metrics.counter("intent_hits_total", "AI queries compiled locally by the intent grammar", lambda: intent_compiler.hits)
+    metrics.counter("intent_misses_total", "AI queries the intent grammar did not cover", lambda: intent_compiler.misses)
+    metrics.gauge("intent_latency_saved_seconds", "Estimated model time saved by the intent grammar", intent_compiler.latency_saved)
+    metrics.counter("plan_cache_hits_total", "AI queries answered from the plan cache", lambda: plan_cache.hits)
+    metrics.counter("plan_cache_misses_total", "AI queries sent to the model", lambda: plan_cache.misses)
+    metrics.gauge("plan_cache_entries", "Plans in the plan cache", lambda: len(plan_cache))
+
+    metrics.counter("telemetry_emits_total", "Socket.IO telemetry emits", lambda: robot.telemetry.emits)
+    metrics.gauge("telemetry_clients", "Connected clients", lambda: robot.telemetry.client_count())
+
+    # Work that was dropped or superseded
+    dropped = "dropped_work_total"
+    dropped_help = "Work dropped or superseded before completion"
+    metrics.counter(dropped, dropped_help, lambda: serial.pipeline_stats()["dropped"], {"kind": "sensor_packet"})
+    metrics.counter(dropped, dropped_help, lambda: writer.motor_coalesced, {"kind": "motor_coalesced"})
+    metrics.counter(dropped, dropped_help, lambda: writer.motor_suppressed, {"kind": "motor_suppressed"})
+    metrics.counter(dropped, dropped_help, lambda: writer.motor_cancelled, {"kind": "motor_cancelled"})
+    metrics.counter(dropped, dropped_help, lambda: robot.scheduler.dropped[CommandPriority.JOYSTICK], {"kind": "joystick"})
+    metrics.counter(dropped, dropped_help, lambda: robot.scheduler.preempted[CommandPriority.SEQUENCE], {"kind": "sequence_preempted"})
+    metrics.counter(dropped, dropped_help, lambda: robot.sensor_requests_lost, {"kind": "sensor_request_lost"})
+    metrics.counter(dropped, dropped_help, lambda: queries.superseded, {"kind": "ai_query_superseded"})
+    metrics.counter(dropped, dropped_help, lambda: queries.stopped, {"kind": "ai_query_stopped"})
+    metrics.counter(dropped, dropped_help, lambda: queries.interrupted, {"kind": "ai_plan_interrupted"})
+
+
+def register_startup_metrics(startup):
+    for name in startup.phases:
+        metrics.gauge("startup_phase_seconds", "Duration of each startup phase", lambda name=name: startup.duration(name), {"phase": name})
+        metrics.gauge("startup_ready_seconds", "Process start to the end of each startup phase",
+                      lambda name=name: startup.phases[name][1] or 0.0, {"phase": name})
+
+
+async def run_socket_server(robot, startup=None):
+    """
+    Serve the dashboard and /metrics until shut down.
+
+    :param startup: StartupTimer of the service; its phases are exported and ``web_server`` ends once listening
+    """
     setup_routes(robot)
+    loop_lag.start()
     config = uvicorn.Config(app, host="0.0.0.0", port=8080)
     server = uvicorn.Server(config)
-    await server.serve()
+    try:
+        if startup is None:
+            await server.serve()
+            return
+
+        startup.begin("web_server")
+        register_startup_metrics(startup)
+        serving = asyncio.create_task(server.serve())
+        while not server.started and not serving.done():
+            await asyncio.sleep(0.01)  # uvicorn has no startup event
+        startup.end("web_server")
+        await serving
+    finally:
+        await plan_cache.flush()  # Plans cached since the last background save